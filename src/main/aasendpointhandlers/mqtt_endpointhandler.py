@@ -85,7 +85,7 @@ class AASEndPointHandler(AASEndPointHandler):
         except:
             pass
         try:
-            if (publishTopic in list(self.pyAAS.aasHashDict._getKeys())):
+            if (self.pyAAS.aasHashDict.__isKeyPresent__(publishTopic)):
                 self.msgHandler.putIbMessage(send_Message)
             else:
                 self.client.publish("AASpillarbox", str(json.dumps(send_Message)))                
@@ -25,9 +25,9 @@ except ImportError:
     from src.main.abstract.endpointhandler import AASEndPointHandler
 
 try:
-    from aasendpointhandlers.rstapi_endpointresources import AssetAdministrationShells,AssetAdministrationShellById,AssetAdministrationShell,SubmodelReferences,DeleteSubmodelReference,AssetInformation,Submodel,SubmodelElements,SubmodelElementByPath,FileByPath,ConceptDescriptions,ConceptDescriptionById,Submodels,SubmodelById,Submodel_SRI,SubmodelElements_SRI,SubmodelElementByPath_SRI,FileByPath_SRI,SubmodelElementByPath_history,Submodels_shell, RetrieveMessage,AASWebInterfaceHome,AASWebInterface,AASWebInterfaceSearch,AASWebInterfaceSubmodels,AASWebInterfaceSubmodelElemValue,AASWebInterfaceSKillLog,AASWebInterfaceProductionManagement,AASDocumentationDownload,AASDocumentationDownload,AASDocumentationDownloadSubmodel,AASStaticConfigSource,AASStaticSource,AASWebInterfaceRegister,AASWebInterfaceCFP,AASAssetInterfaceDescription,SkillMaintainer
+    from aasendpointhandlers.rstapi_endpointresources import AssetAdministrationShells,AssetAdministrationShellById,AssetAdministrationShell,SubmodelReferences,DeleteSubmodelReference,AssetInformation,Submodel,SubmodelElements,SubmodelElementByPath,SubmodelElementValueByPath,FileByPath,ConceptDescriptions,ConceptDescriptionById,Submodels,SubmodelById,Submodel_SRI,SubmodelElements_SRI,SubmodelElementByPath_SRI,SubmodelElementValueByPath_SRI,SubmodelElementBatch_SRI,FileByPath_SRI,SubmodelElementByPath_history,Submodels_shell, RetrieveMessage,AASStatistics,AASWebInterfaceHome,AASWebInterface,AASWebInterfaceSearch,AASWebInterfaceSubmodels,AASWebInterfaceSubmodelElemValue,AASWebInterfaceSKillLog,AASWebInterfaceProductionManagement,AASDocumentationDownload,AASDocumentationDownload,AASDocumentationDownloadSubmodel,AASStaticConfigSource,AASStaticSource,AASWebInterfaceRegister,AASWebInterfaceCFP,AASAssetInterfaceDescription,SkillMaintainer
 except ImportError:
-    from main.aasendpointhandlers.rstapi_endpointresources import AssetAdministrationShells,AssetAdministrationShellById,AssetAdministrationShell,SubmodelReferences,DeleteSubmodelReference,AssetInformation,Submodel,SubmodelElements,SubmodelElementByPath,FileByPath,ConceptDescriptions,ConceptDescriptionById,Submodels,SubmodelById,Submodel_SRI,SubmodelElements_SRI,SubmodelElementByPath_SRI,FileByPath_SRI,SubmodelElementByPath_history,Submodels_shell, RetrieveMessage,AASWebInterfaceHome,AASWebInterface,AASWebInterfaceSearch,AASWebInterfaceSubmodels,AASWebInterfaceSubmodelElemValue,AASWebInterfaceSKillLog,AASWebInterfaceProductionManagement,AASDocumentationDownload,AASDocumentationDownload,AASDocumentationDownloadSubmodel,AASStaticConfigSource,AASStaticSource,AASWebInterfaceRegister,AASWebInterfaceCFP,AASAssetInterfaceDescription,SkillMaintainer
+    from main.aasendpointhandlers.rstapi_endpointresources import AssetAdministrationShells,AssetAdministrationShellById,AssetAdministrationShell,SubmodelReferences,DeleteSubmodelReference,AssetInformation,Submodel,SubmodelElements,SubmodelElementByPath,SubmodelElementValueByPath,FileByPath,ConceptDescriptions,ConceptDescriptionById,Submodels,SubmodelById,Submodel_SRI,SubmodelElements_SRI,SubmodelElementByPath_SRI,SubmodelElementValueByPath_SRI,SubmodelElementBatch_SRI,FileByPath_SRI,SubmodelElementByPath_history,Submodels_shell, RetrieveMessage,AASStatistics,AASWebInterfaceHome,AASWebInterface,AASWebInterfaceSearch,AASWebInterfaceSubmodels,AASWebInterfaceSubmodelElemValue,AASWebInterfaceSKillLog,AASWebInterfaceProductionManagement,AASDocumentationDownload,AASDocumentationDownload,AASDocumentationDownloadSubmodel,AASStaticConfigSource,AASStaticSource,AASWebInterfaceRegister,AASWebInterfaceCFP,AASAssetInterfaceDescription,SkillMaintainer
 
   
 drv_rst_app = Flask(__name__)
@@ -87,6 +87,7 @@ class AASEndPointHandler(AASEndPointHandler):
         drv_rst_api.add_resource(SubmodelElements,"/shells/<path:aasIdentifier>/aas/submodels/<path:submodelIdentifier>/submodel/submodel-elements", resource_class_args=tuple([self.pyaas]))
         drv_rst_api.add_resource(SubmodelElementByPath,"/shells/<path:aasIdentifier>/aas/submodels/<path:submodelIdentifier>/submodel/submodel-elements/<path:idShortPath>", resource_class_args=tuple([self.pyaas]))
         drv_rst_api.add_resource(SubmodelElementByPath_history,"/shells/<path:aasIdentifier>/aas/submodels/<path:submodelIdentifier>/submodel/submodel-elements/<path:idShortPath>/history", resource_class_args=tuple([self.pyaas]))
+        drv_rst_api.add_resource(SubmodelElementValueByPath,"/shells/<path:aasIdentifier>/aas/submodels/<path:submodelIdentifier>/submodel/submodel-elements/<path:idShortPath>/$value", resource_class_args=tuple([self.pyaas]))
         drv_rst_api.add_resource(FileByPath,"/shells/<path:aasIdentifier>/aas/submodels/<path:submodelIdentifier>/submodel/submodel-elements/<path:idShortPath>/attachment", resource_class_args=tuple([self.pyaas]))
         
         drv_rst_api.add_resource(ConceptDescriptions, "/concept-descriptions", resource_class_args=tuple([self.pyaas]))
@@ -98,7 +99,9 @@ class AASEndPointHandler(AASEndPointHandler):
 
         drv_rst_api.add_resource(Submodel_SRI,"/submodels/<path:submodelIdentifier>/submodel", resource_class_args=tuple([self.pyaas]))
         drv_rst_api.add_resource(SubmodelElements_SRI,"/submodels/<path:submodelIdentifier>/submodel/submodel-elements", resource_class_args=tuple([self.pyaas]))
+        drv_rst_api.add_resource(SubmodelElementBatch_SRI,"/submodels/<path:submodelIdentifier>/submodel/submodel-elements/$batch", resource_class_args=tuple([self.pyaas]))
         drv_rst_api.add_resource(SubmodelElementByPath_SRI,"/submodels/<path:submodelIdentifier>/submodel/submodel-elements/<path:idShortPath>", resource_class_args=tuple([self.pyaas]))
+        drv_rst_api.add_resource(SubmodelElementValueByPath_SRI,"/submodels/<path:submodelIdentifier>/submodel/submodel-elements/<path:idShortPath>/$value", resource_class_args=tuple([self.pyaas]))
         #drv_rst_api.add_resource(SubmodelElementByPath_SRI_history,"/submodels/<path:submodelIdentifier>/submodel/submodel-elements/<path:idShortPath>/history", resource_class_args=tuple([self.pyaas]))
         drv_rst_api.add_resource(FileByPath_SRI,"/submodels/<path:submodelIdentifier>/submodel/submodel-elements/<path:idShortPath>/attachment", resource_class_args=tuple([self.pyaas]))
         self.pyaas.serviceLogger.info("REST API namespaces are configured")
@@ -108,6 +111,7 @@ class AASEndPointHandler(AASEndPointHandler):
     
     
         drv_rst_api.add_resource(RetrieveMessage, "/i40commu", resource_class_args=tuple([self.pyaas]))
+        drv_rst_api.add_resource(AASStatistics, "/statistics", resource_class_args=tuple([self.pyaas]))
         drv_rst_api.add_resource(SkillMaintainer,"/shells/<path:aasIdentifier>/aas/skills/<path:skillName>/skill", resource_class_args=tuple([self.pyaas]))
     
     
@@ -7,6 +7,7 @@ This source code may use other Open Source software components (see LICENSE.txt)
 from flask_restful import Resource,request
 from flask import render_template,Response,redirect,flash,make_response,send_file,send_from_directory,jsonify
 from urllib.parse import unquote
+from datetime import datetime
 import base64
 import json
 import os
@@ -31,6 +32,95 @@ fileformat = {"txt":"text/plain","xml":"text/xml","html":"text/html","josn":"app
 "png":"image/png","gif":"image/gif","igs":"application/iges",
 "iges":"application/iges","stp":"application/step"}
 
+def notModified(etag):
+    if etag is not None and request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    return None
+
+def tagResponse(response,etag,status):
+    if etag is not None and status:
+        response.set_etag(etag)
+    return response
+
+def getModifiers():
+    """
+        Returns the content and level serialization modifiers of the request, None if one of
+        them is not supported.
+    """
+    content = request.args.get("content","normal")
+    level = request.args.get("level","deep")
+    if content not in ("normal","value","metadata") or level not in ("deep","core"):
+        return None
+    return content,level
+
+def getPaging():
+    """
+        Returns the limit and cursor of the request, None if the limit is not a positive number.
+    """
+    limit = request.args.get("limit")
+    if limit is not None:
+        if not limit.isdigit() or int(limit) == 0:
+            return None
+        limit = int(limit)
+    return limit,request.args.get("cursor")
+
+def getMergePatch():
+    """
+        Returns the RFC 7386 merge patch of the request, None if the body is not a JSON object.
+    """
+    data = request.get_json(force=True,silent=True)
+    return data if isinstance(data,dict) else None
+
+def patchResponse(pyaas,method,data):
+    """
+        Hands the merge patch to the DataManager, JSON Patch (RFC 6902) bodies are rejected.
+    """
+    if request.mimetype == "application/json-patch+json":
+        return make_response("JSON Patch is not supported, send a merge patch as application/merge-patch+json",415)
+    patch = getMergePatch()
+    if patch is None:
+        return make_response("The merge patch has to be a JSON object",400)
+    data["patch"] = patch
+    edm = ExecuteDBModifier(pyaas)
+    data,status,statuscode = edm.execute({"data":data,"method":method,"instanceId" : str(uuid.uuid1())})
+    return make_response(data,statuscode)
+
+def getHistoryQuery():
+    """
+        Returns the from/to range in epoch seconds, the aggregation interval in seconds and the
+        number of points of the request, None if a parameter is invalid. from and to are epoch
+        seconds or ISO 8601 date times.
+    """
+    query = dict()
+    try:
+        for name in ("from","to"):
+            value = request.args.get(name)
+            if value is not None:
+                try:
+                    query[name] = float(value)
+                except ValueError:
+                    query[name] = datetime.fromisoformat(value.replace("Z","+00:00")).timestamp()
+        if "interval" in request.args:
+            query["interval"] = float(request.args["interval"])
+            if not query["interval"] > 0:
+                return None
+        if "points" in request.args:
+            query["points"] = int(request.args["points"])
+            if query["points"] < 3:
+                return None
+    except ValueError:
+        return None
+    if ("interval" in query and "points" in query) or query.get("from",0) > query.get("to",float("inf")):
+        return None
+    return query
+
+def serializedResponse(data,status,statuscode,etag):
+    if status:
+        return tagResponse(Response(data,status=statuscode,mimetype="application/json"),etag,status)
+    return make_response(data,statuscode)
+
 ##################################################
 '''
 Shell Repository Interface Start
@@ -58,7 +148,12 @@ class AssetAdministrationShells(Resource):
                 except:
                     pass           
             else:
-                data, status,statuscode = self.pyaas.dba.GetAllAssetAdministrationShells()            
+                paging = getPaging()
+                if paging is None:
+                    return make_response("The limit has to be a positive number",400)
+                data, status,statuscode = self.pyaas.dba.getSnapshot().GetAllAssetAdministrationShells(paging[0],paging[1])
+                if not status:
+                    return make_response(data,statuscode)
                 return make_response(jsonify(data),statuscode)
         except Exception as E:
             self.pyaas.serviceLogger.info("Error at getAssetAdministrationShells Rest" + str(E))
@@ -92,8 +187,13 @@ class AssetAdministrationShellById(Resource):
     def get(self,aasIdentifier):
         try:
             aasIdentifier = (base64.decodebytes(aasIdentifier.encode())).decode()
-            data,status,statuscode = self.pyaas.dba.GetAssetAdministrationShellById(aasIdentifier)            
-            return make_response(jsonify(data),statuscode)
+            snapshot = self.pyaas.dba.getSnapshot()
+            etag = snapshot.getETag(aasIdentifier)
+            response = notModified(etag)
+            if response is not None:
+                return response
+            data,status,statuscode = snapshot.GetAssetAdministrationShellById(aasIdentifier)            
+            return tagResponse(make_response(jsonify(data),statuscode),etag,status)
         except Exception as E:
             self.pyaas.serviceLogger.info("Error at getAssetAdministrationShellById  REST API" + str(E))
             return make_response("Internal Server Error",500)
@@ -148,8 +248,13 @@ class AssetAdministrationShell(Resource):
     def get(self,aasIdentifier):
         try:
             aasIdentifier = (base64.decodebytes(aasIdentifier.encode())).decode()
-            data,status,statuscode = self.pyaas.dba.GetAssetAdministrationShell(aasIdentifier)            
-            return make_response(jsonify(data),statuscode)
+            snapshot = self.pyaas.dba.getSnapshot()
+            etag = snapshot.getETag(aasIdentifier)
+            response = notModified(etag)
+            if response is not None:
+                return response
+            data,status,statuscode = snapshot.GetAssetAdministrationShell(aasIdentifier)            
+            return tagResponse(make_response(jsonify(data),statuscode),etag,status)
         except Exception as E:
             self.pyaas.serviceLogger.info("Error at GetAssetAdministrationShell  REST API" + str(E))
             return make_response("Internal Server Error",500)
@@ -184,7 +289,7 @@ class SubmodelReferences(Resource):
     def get(self,aasIdentifier):
         try:
             aasIdentifier = (base64.decodebytes(aasIdentifier.encode())).decode()
-            data,status,statuscode = self.pyaas.dba.GetAllSubmodelReferences(aasIdentifier)            
+            data,status,statuscode = self.pyaas.dba.getSnapshot().GetAllSubmodelReferences(aasIdentifier)            
             return make_response(jsonify(data),statuscode)
         except Exception as E:
             self.pyaas.serviceLogger.info("Error at GetAllSubmodelReferences Rest" + str(E))
@@ -233,7 +338,7 @@ class AssetInformation(Resource):
     def get(self,aasIdentifier):
         try:
             aasIdentifier = (base64.decodebytes(aasIdentifier.encode())).decode()
-            data,status,statuscode = self.pyaas.dba.GetAssetInformation(aasIdentifier)            
+            data,status,statuscode = self.pyaas.dba.getSnapshot().GetAssetInformation(aasIdentifier)            
             return make_response(data,statuscode)     
         except Exception as E:
             self.pyaas.serviceLogger.info("Error at GetAssetInformation REST API" + str(E))
@@ -276,7 +381,7 @@ class Submodels_shell(Resource):
     def get(self,aasIdentifier): 
         try:
             aasIdentifier = (base64.decodebytes(aasIdentifier.encode())).decode()
-            data,status,statuscode = self.pyaas.dba.GetSubmodels_shell(aasIdentifier)  
+            data,status,statuscode = self.pyaas.dba.getSnapshot().GetSubmodels_shell(aasIdentifier)  
             return make_response(data,statuscode)
         except Exception as E:
             self.pyaas.serviceLogger.info("Error at GetSubmodel Rest" + str(E))
@@ -291,8 +396,17 @@ class Submodel(Resource):
         try:
             aasIdentifier = (base64.decodebytes(aasIdentifier.encode())).decode()
             submodelIdentifier = (base64.decodebytes(submodelIdentifier.encode())).decode()
-            data,status,statuscode = self.pyaas.dba.GetSubmodel(aasIdentifier,submodelIdentifier)  
-            return make_response(data,statuscode)
+            modifiers = getModifiers()
+            if modifiers is None:
+                return make_response("The content or level modifier is not supported",400)
+            snapshot = self.pyaas.dba.getSnapshot()
+            etag = snapshot.getETag(aasIdentifier,submodelIdentifier)
+            response = notModified(etag)
+            if response is not None:
+                return response
+            data,status,statuscode = snapshot.GetSubmodel(aasIdentifier,submodelIdentifier,serialized=True,
+                                                          content=modifiers[0],level=modifiers[1])
+            return serializedResponse(data,status,statuscode,etag)
         except Exception as E:
             self.pyaas.serviceLogger.info("Error at GetSubmodel Rest" + str(E))
             return make_response("Internal Server Error",500)
@@ -319,6 +433,15 @@ class Submodel(Resource):
             self.pyaas.serviceLogger.info("Error at PutSubmodel Rest" + str(E))
             return make_response("Internal Server Error",500)
 
+    def patch(self,aasIdentifier,submodelIdentifier):
+        try:
+            aasIdentifier = (base64.decodebytes(aasIdentifier.encode())).decode()
+            submodelIdentifier = (base64.decodebytes(submodelIdentifier.encode())).decode()
+            return patchResponse(self.pyaas,"PatchSubmodel",{"_shellId":aasIdentifier,"submodelIdentifier":submodelIdentifier})
+        except Exception as E:
+            self.pyaas.serviceLogger.info("Error at PatchSubmodel Rest" + str(E))
+            return make_response("Internal Server Error",500)
+
 class SubmodelElements(Resource):
     def __init__(self,pyaas):
         self.pyaas = pyaas
@@ -327,8 +450,24 @@ class SubmodelElements(Resource):
         try:
             aasIdentifier = (base64.decodebytes(aasIdentifier.encode())).decode()
             submodelIdentifier = (base64.decodebytes(submodelIdentifier.encode())).decode()
-            data,status,statuscode = self.pyaas.dba.GetAllSubmodelElements(aasIdentifier,submodelIdentifier)            
-            return make_response(jsonify(data),statuscode)
+            paging = getPaging()
+            modifiers = getModifiers()
+            if paging is None or modifiers is None:
+                return make_response("The limit, content or level parameter is not supported",400)
+            snapshot = self.pyaas.dba.getSnapshot()
+            etag = snapshot.getETag(aasIdentifier,submodelIdentifier)
+            response = notModified(etag)
+            if response is not None:
+                return response
+            if "prefix" in request.args:
+                data,status,statuscode = snapshot.GetSubmodelElementsByPrefix(aasIdentifier,submodelIdentifier,
+                                                                              request.args["prefix"],serialized=True,
+                                                                              content=modifiers[0],level=modifiers[1])
+                return serializedResponse(data,status,statuscode,etag)
+            data,status,statuscode = snapshot.GetAllSubmodelElements(aasIdentifier,submodelIdentifier,serialized=True,
+                                                                     content=modifiers[0],level=modifiers[1],
+                                                                     limit=paging[0],cursor=paging[1])
+            return serializedResponse(data,status,statuscode,etag)
         except Exception as E:
             self.pyaas.serviceLogger.info("Error at GetAllSubmodelElements Rest" + str(E))
             return make_response("Internal Server Error",500)
@@ -365,8 +504,17 @@ class SubmodelElementByPath(Resource):
             aasIdentifier = (base64.decodebytes(aasIdentifier.encode())).decode()
             submodelIdentifier = (base64.decodebytes(submodelIdentifier.encode())).decode()
             idShortPath = unquote(idShortPath)
-            data,status,statuscode = self.pyaas.dba.GetSubmodelElementByPath(aasIdentifier,submodelIdentifier,idShortPath)            
-            return make_response(data,statuscode)
+            modifiers = getModifiers()
+            if modifiers is None:
+                return make_response("The content or level modifier is not supported",400)
+            snapshot = self.pyaas.dba.getSnapshot()
+            etag = snapshot.getETag(aasIdentifier,submodelIdentifier + "." + idShortPath)
+            response = notModified(etag)
+            if response is not None:
+                return response
+            data,status,statuscode = snapshot.GetSubmodelElementByPath(aasIdentifier,submodelIdentifier,idShortPath,serialized=True,
+                                                                       content=modifiers[0],level=modifiers[1])
+            return serializedResponse(data,status,statuscode,etag)
         except Exception as E:
             self.pyaas.serviceLogger.info("Error at GetSubmodelElementByPath Rest" + str(E))
             return make_response("Internal Server Error",500)
@@ -426,7 +574,55 @@ class SubmodelElementByPath(Resource):
             return make_response(data,statuscode)
         except Exception as E:
             self.pyaas.serviceLogger.info("Error at DeleteSubmodelElementByPath Rest" + str(E))
-            return make_response("Internal Server Error",500)   
+            return make_response("Internal Server Error",500)
+
+    def patch(self,aasIdentifier,submodelIdentifier,idShortPath):
+        try:
+            aasIdentifier = (base64.decodebytes(aasIdentifier.encode())).decode()
+            submodelIdentifier = (base64.decodebytes(submodelIdentifier.encode())).decode()
+            idShortPath = unquote(idShortPath)
+            return patchResponse(self.pyaas,"PatchSubmodelElementByPath",{"_shellId":aasIdentifier,"submodelIdentifier":submodelIdentifier,
+                                                                          "idShortPath":idShortPath})
+        except Exception as E:
+            self.pyaas.serviceLogger.info("Error at PatchSubmodelElementByPath Rest" + str(E))
+            return make_response("Internal Server Error",500)
+
+class SubmodelElementValueByPath(Resource):
+    def __init__(self,pyaas):
+        self.pyaas = pyaas
+
+    def get(self,aasIdentifier,submodelIdentifier,idShortPath):
+        try:
+            aasIdentifier = (base64.decodebytes(aasIdentifier.encode())).decode()
+            submodelIdentifier = (base64.decodebytes(submodelIdentifier.encode())).decode()
+            idShortPath = unquote(idShortPath)
+            snapshot = self.pyaas.dba.getSnapshot()
+            etag = snapshot.getETag(aasIdentifier,submodelIdentifier + "." + idShortPath)
+            response = notModified(etag)
+            if response is not None:
+                return response
+            data,status,statuscode = snapshot.GetSubmodelElementByPath(aasIdentifier,submodelIdentifier,idShortPath,serialized=True,
+                                                                       content="value")
+            return serializedResponse(data,status,statuscode,etag)
+        except Exception as E:
+            self.pyaas.serviceLogger.info("Error at GetSubmodelElementValueByPath Rest" + str(E))
+            return make_response("Internal Server Error",500)
+
+    def put(self,aasIdentifier,submodelIdentifier,idShortPath):
+        try:
+            data = request.get_json(silent=True)
+            aasIdentifier = (base64.decodebytes(aasIdentifier.encode())).decode()
+            submodelIdentifier = (base64.decodebytes(submodelIdentifier.encode())).decode()
+            idShortPath = unquote(idShortPath)
+            if data is None:
+                return make_response("The value is missing or malformed",400)
+            edm = ExecuteDBModifier(self.pyaas)
+            data,status,statuscode = edm.execute({"data":{"_shellId":aasIdentifier, "submodelIdentifier":submodelIdentifier,
+                                               "idShortPath":idShortPath,"value":data},"method":"PutSubmodelElementValueByPath","instanceId" : str(uuid.uuid1())})
+            return make_response(data,statuscode)
+        except Exception as E:
+            self.pyaas.serviceLogger.info("Error at PutSubmodelElementValueByPath Rest" + str(E))
+            return make_response("Internal Server Error",500)
 
 #SubmodelElementByPath_history,SubmodelElementByPath_SRI_history
 class SubmodelElementByPath_history(Resource):
@@ -438,8 +634,14 @@ class SubmodelElementByPath_history(Resource):
             aasIdentifier = (base64.decodebytes(aasIdentifier.encode())).decode()
             submodelIdentifier = (base64.decodebytes(submodelIdentifier.encode())).decode()
             idShortPath = unquote(idShortPath)
-            data,status,statuscode = self.pyaas.dba.GetSubmodelElementByPath_History(aasIdentifier,submodelIdentifier,idShortPath)
-            return make_response(data,statuscode)
+            query = getHistoryQuery()
+            if query is None:
+                return make_response("Invalid history query, from and to are epoch seconds or ISO 8601 date times,"
+                                     " interval is positive and points at least 3, they can not be combined",400)
+            data,status,statuscode = self.pyaas.dba.GetSubmodelElementByPath_History(aasIdentifier,submodelIdentifier,idShortPath,query)
+            if not status:
+                return make_response(data,statuscode)
+            return make_response(jsonify(data),statuscode)
         except Exception as E:
             self.pyaas.serviceLogger.info("Error at GetSubmodelElementByPath_histtory Rest" + str(E))
             return make_response("Internal Server Error",500)
@@ -524,23 +726,22 @@ class ConceptDescriptions(Resource):
     def get(self):
         try:
             args = request.args
-            if len(args) > 0:
-                try:
-                    if (args.get('idShort')):
-                        data, status,statuscode = self.pyaas.dba.GetAllConceptDescriptionsByIdShort(args.get('idShort'))            
-                        return make_response(jsonify(data),statuscode)
-                    elif (args.get('isCaseOf')):
-                        data, status,statuscode = self.pyaas.dba.GetAllConceptDescriptionsByIsCaseOf(args.get('isCaseOf'))            
-                        return make_response(jsonify(data),statuscode)
-                    elif (args.get('dataSpecificationRef')):
-                        data, status,statuscode = self.pyaas.dba.GetAllConceptDescriptionsByDataSpecificationReference(args.get('dataSpecificationRef'))            
-                        return make_response(jsonify(data),statuscode)
-                    else:
-                        return ("Bad Request",500)
-                except:
-                    pass           
+            if (args.get('idShort')):
+                data, status,statuscode = self.pyaas.dba.GetAllConceptDescriptionsByIdShort(args.get('idShort'))            
+                return make_response(jsonify(data),statuscode)
+            elif (args.get('isCaseOf')):
+                data, status,statuscode = self.pyaas.dba.GetAllConceptDescriptionsByIsCaseOf(args.get('isCaseOf'))            
+                return make_response(jsonify(data),statuscode)
+            elif (args.get('dataSpecificationRef')):
+                data, status,statuscode = self.pyaas.dba.GetAllConceptDescriptionsByDataSpecificationReference(args.get('dataSpecificationRef'))            
+                return make_response(jsonify(data),statuscode)
             else:
-                data, status,statuscode = self.pyaas.dba.GetAllConceptDescriptions()            
+                paging = getPaging()
+                if paging is None:
+                    return make_response("The limit has to be a positive number",400)
+                data, status,statuscode = self.pyaas.dba.getSnapshot().GetAllConceptDescriptions(paging[0],paging[1])
+                if not status:
+                    return make_response(data,statuscode)
                 return make_response(jsonify(data),statuscode)
         except Exception as E:
             self.pyaas.serviceLogger.info("Error at GetConceptDescriptions Rest" + str(E))
@@ -571,7 +772,7 @@ class ConceptDescriptionById(Resource):
     def get(self,cdIdentifier):
         try:
             cdIdentifier = (base64.decodebytes(cdIdentifier.encode())).decode()
-            data,status,statuscode = self.pyaas.dba.GetConceptDescriptionById(cdIdentifier)  
+            data,status,statuscode = self.pyaas.dba.getSnapshot().GetConceptDescriptionById(cdIdentifier)  
             return make_response(data,statuscode)
         except Exception as E:
             self.pyaas.serviceLogger.info("Error at GetConceptDescriptionById Rest" + str(E))
@@ -621,21 +822,20 @@ class Submodels(Resource):
     def get(self):
         try:
             args = request.args
-            if len(args) > 0:
-                try:
-                    if (args.get('idShort')):
-                        data, status,statuscode = self.pyaas.dba.GetAllSubmodelsByIdShort(args.get('idShort'))            
-                        return make_response(jsonify(data),statuscode)
-                    elif (args.get('semanticId')):
-                        data, status,statuscode = self.pyaas.dba.GetAllSubmodelsBySemanticId(args.get('semanticId'))            
-                        return make_response(jsonify(data),statuscode)
-                    else:
-                        return make_response("Internal Server Error",500)
-                except:
-                    pass           
-            else:
-                data, status,statuscode = self.pyaas.dba.GetAllSubmodels()            
+            if (args.get('idShort')):
+                data, status,statuscode = self.pyaas.dba.GetAllSubmodelsByIdShort(args.get('idShort'))            
+                return make_response(jsonify(data),statuscode)
+            elif (args.get('semanticId')):
+                data, status,statuscode = self.pyaas.dba.GetAllSubmodelsBySemanticId(args.get('semanticId'))            
                 return make_response(jsonify(data),statuscode)
+            else:
+                paging = getPaging()
+                modifiers = getModifiers()
+                if paging is None or modifiers is None:
+                    return make_response("The limit, content or level parameter is not supported",400)
+                data, status,statuscode = self.pyaas.dba.getSnapshot().GetAllSubmodels(paging[0],paging[1],serialized=True,
+                                                                                      content=modifiers[0],level=modifiers[1])
+                return serializedResponse(data,status,statuscode,None)
         except Exception as E:
             self.pyaas.serviceLogger.info("Error at GetSubmodels Rest" + str(E))
             return make_response("Internal Server Error",500)
@@ -665,8 +865,17 @@ class SubmodelById(Resource):
     def get(self,submodelIdentifier):
         try:
             submodelIdentifier = (base64.decodebytes(submodelIdentifier.encode())).decode()
-            data,status,statuscode = self.pyaas.dba.GetSubmodelById(submodelIdentifier)  
-            return make_response(data,statuscode)
+            modifiers = getModifiers()
+            if modifiers is None:
+                return make_response("The content or level modifier is not supported",400)
+            snapshot = self.pyaas.dba.getSnapshot()
+            etag = snapshot.getETag(submodelIdentifier)
+            response = notModified(etag)
+            if response is not None:
+                return response
+            data,status,statuscode = snapshot.GetSubmodelById(submodelIdentifier,serialized=True,
+                                                              content=modifiers[0],level=modifiers[1])
+            return serializedResponse(data,status,statuscode,etag)
         except Exception as E:
             self.pyaas.serviceLogger.info("Error at GetSubmodelById Rest" + str(E))
             return make_response("Internal Server Error",500)
@@ -702,6 +911,14 @@ class SubmodelById(Resource):
             self.pyaas.serviceLogger.info("Error at DeleteSubmodelById Rest" + str(E))
             return make_response("Internal Server Error",500)
 
+    def patch(self,submodelIdentifier):
+        try:
+            submodelIdentifier = (base64.decodebytes(submodelIdentifier.encode())).decode()
+            return patchResponse(self.pyaas,"PatchSubmodel_SRI",{"submodelIdentifier":submodelIdentifier})
+        except Exception as E:
+            self.pyaas.serviceLogger.info("Error at PatchSubmodelById Rest" + str(E))
+            return make_response("Internal Server Error",500)
+
 class Submodel_SRI(Resource):
     def __init__(self,pyaas):
         self.pyaas = pyaas
@@ -709,8 +926,17 @@ class Submodel_SRI(Resource):
     def get(self,submodelIdentifier): 
         try:
             submodelIdentifier = (base64.decodebytes(submodelIdentifier.encode())).decode()
-            data,status,statuscode = self.pyaas.dba.GetSubmodel_SRI(submodelIdentifier)  
-            return make_response(data,statuscode)
+            modifiers = getModifiers()
+            if modifiers is None:
+                return make_response("The content or level modifier is not supported",400)
+            snapshot = self.pyaas.dba.getSnapshot()
+            etag = snapshot.getETag(submodelIdentifier)
+            response = notModified(etag)
+            if response is not None:
+                return response
+            data,status,statuscode = snapshot.GetSubmodel_SRI(submodelIdentifier,serialized=True,
+                                                              content=modifiers[0],level=modifiers[1])
+            return serializedResponse(data,status,statuscode,etag)
         except Exception as E:
             self.pyaas.serviceLogger.info("Error at GetSubmodel_SRI Rest" + str(E))
             return make_response("Internal Server Error",500)
@@ -735,6 +961,14 @@ class Submodel_SRI(Resource):
             self.pyaas.serviceLogger.info("Error at PutSubmodel_SRI Rest" + str(E))
             return make_response("Internal Server Error",500)
 
+    def patch(self,submodelIdentifier):
+        try:
+            submodelIdentifier = (base64.decodebytes(submodelIdentifier.encode())).decode()
+            return patchResponse(self.pyaas,"PatchSubmodel_SRI",{"submodelIdentifier":submodelIdentifier})
+        except Exception as E:
+            self.pyaas.serviceLogger.info("Error at PatchSubmodel_SRI Rest" + str(E))
+            return make_response("Internal Server Error",500)
+
 class SubmodelElements_SRI(Resource):
     def __init__(self,pyaas):
         self.pyaas = pyaas
@@ -742,8 +976,24 @@ class SubmodelElements_SRI(Resource):
     def get(self,submodelIdentifier):
         try:
             submodelIdentifier = (base64.decodebytes(submodelIdentifier.encode())).decode()
-            data,status,statuscode = self.pyaas.dba.GetAllSubmodelElements_SRI(submodelIdentifier)            
-            return make_response(jsonify(data),statuscode)
+            paging = getPaging()
+            modifiers = getModifiers()
+            if paging is None or modifiers is None:
+                return make_response("The limit, content or level parameter is not supported",400)
+            snapshot = self.pyaas.dba.getSnapshot()
+            etag = snapshot.getETag(submodelIdentifier)
+            response = notModified(etag)
+            if response is not None:
+                return response
+            if "prefix" in request.args:
+                data,status,statuscode = snapshot.GetSubmodelElementsByPrefix_SRI(submodelIdentifier,request.args["prefix"],
+                                                                                  serialized=True,content=modifiers[0],
+                                                                                  level=modifiers[1])
+                return serializedResponse(data,status,statuscode,etag)
+            data,status,statuscode = snapshot.GetAllSubmodelElements_SRI(submodelIdentifier,serialized=True,
+                                                                         content=modifiers[0],level=modifiers[1],
+                                                                         limit=paging[0],cursor=paging[1])
+            return serializedResponse(data,status,statuscode,etag)
         except Exception as E:
             self.pyaas.serviceLogger.info("Error at GetAllSubmodelElements_SRI Rest" + str(E))
             return make_response("Internal Server Error",500)
@@ -777,8 +1027,17 @@ class SubmodelElementByPath_SRI(Resource):
         try:
             submodelIdentifier = (base64.decodebytes(submodelIdentifier.encode())).decode()
             idShortPath = unquote(idShortPath)
-            data,status,statuscode = self.pyaas.dba.GetSubmodelElementByPath_SRI(submodelIdentifier,idShortPath)          
-            return make_response(data,statuscode)
+            modifiers = getModifiers()
+            if modifiers is None:
+                return make_response("The content or level modifier is not supported",400)
+            snapshot = self.pyaas.dba.getSnapshot()
+            etag = snapshot.getETag(submodelIdentifier + "." + idShortPath)
+            response = notModified(etag)
+            if response is not None:
+                return response
+            data,status,statuscode = snapshot.GetSubmodelElementByPath_SRI(submodelIdentifier,idShortPath,serialized=True,
+                                                                           content=modifiers[0],level=modifiers[1])
+            return serializedResponse(data,status,statuscode,etag)
         except Exception as E:
             self.pyaas.serviceLogger.info("Error at GetSubmodelElementByPath_SRI Rest" + str(E))
             return make_response("Internal Server Error",500)
@@ -835,7 +1094,94 @@ class SubmodelElementByPath_SRI(Resource):
             return make_response(data,statuscode)
         except Exception as E:
             self.pyaas.serviceLogger.info("Error at DeleteSubmodelElementByPath_SRI Rest" + str(E))
-            return make_response("Internal Server Error",500)   
+            return make_response("Internal Server Error",500)
+
+    def patch(self,submodelIdentifier,idShortPath):
+        try:
+            submodelIdentifier = (base64.decodebytes(submodelIdentifier.encode())).decode()
+            idShortPath = unquote(idShortPath)
+            return patchResponse(self.pyaas,"PatchSubmodelElementByPath_SRI",{"submodelIdentifier":submodelIdentifier,
+                                                                              "idShortPath":idShortPath})
+        except Exception as E:
+            self.pyaas.serviceLogger.info("Error at PatchSubmodelElementByPath_SRI Rest" + str(E))
+            return make_response("Internal Server Error",500)
+
+class SubmodelElementValueByPath_SRI(Resource):
+    def __init__(self,pyaas):
+        self.pyaas = pyaas
+
+    def get(self,submodelIdentifier,idShortPath):
+        try:
+            submodelIdentifier = (base64.decodebytes(submodelIdentifier.encode())).decode()
+            idShortPath = unquote(idShortPath)
+            snapshot = self.pyaas.dba.getSnapshot()
+            etag = snapshot.getETag(submodelIdentifier + "." + idShortPath)
+            response = notModified(etag)
+            if response is not None:
+                return response
+            data,status,statuscode = snapshot.GetSubmodelElementByPath_SRI(submodelIdentifier,idShortPath,serialized=True,
+                                                                           content="value")
+            return serializedResponse(data,status,statuscode,etag)
+        except Exception as E:
+            self.pyaas.serviceLogger.info("Error at GetSubmodelElementValueByPath_SRI Rest" + str(E))
+            return make_response("Internal Server Error",500)
+
+    def put(self,submodelIdentifier,idShortPath):
+        try:
+            data = request.get_json(silent=True)
+            submodelIdentifier = (base64.decodebytes(submodelIdentifier.encode())).decode()
+            idShortPath = unquote(idShortPath)
+            if data is None:
+                return make_response("The value is missing or malformed",400)
+            edm = ExecuteDBModifier(self.pyaas)
+            data,status,statuscode = edm.execute({"data":{"submodelIdentifier":submodelIdentifier,
+                                               "idShortPath":idShortPath,"value":data},"method":"PutSubmodelElementValueByPath_SRI","instanceId" : str(uuid.uuid1())})
+            return make_response(data,statuscode)
+        except Exception as E:
+            self.pyaas.serviceLogger.info("Error at PutSubmodelElementValueByPath_SRI Rest" + str(E))
+            return make_response("Internal Server Error",500)
+
+class SubmodelElementBatch_SRI(Resource):
+    def __init__(self,pyaas):
+        self.pyaas = pyaas
+
+    def post(self,submodelIdentifier):
+        """
+            Applies a list of {"method": "PUT"|"POST"|"DELETE", "idShortPath": ..., "element": ...}
+            operations as one transaction and returns the status of every operation.
+        """
+        try:
+            operations = request.json
+            submodelIdentifier = (base64.decodebytes(submodelIdentifier.encode())).decode()
+            if not isinstance(operations,list):
+                return make_response("The batch has to be a list of operations",400)
+            aasValid = AASMetaModelValidator(self.pyaas)
+            results = []
+            for operation in operations:
+                message = None
+                if not isinstance(operation,dict) or operation.get("method") not in ("PUT","POST","DELETE"):
+                    message = "The method of the operation has to be PUT, POST or DELETE"
+                elif not isinstance(operation.get("idShortPath",""),str) or (operation["method"] != "POST" and
+                                                                             operation.get("idShortPath","") == ""):
+                    message = "The idShortPath of the operation is missing or malformed"
+                elif operation["method"] != "DELETE" and not (isinstance(operation.get("element"),dict) and
+                                                              aasValid.validateSubmodelElement(operation["element"])):
+                    message = "The syntax of the passed Submodel ELement is not valid or malformed request"
+                results.append({"method":operation.get("method") if isinstance(operation,dict) else None,
+                                "idShortPath":operation.get("idShortPath","") if isinstance(operation,dict) else None,
+                                "statusCode":400 if message else 424,
+                                "message":message or "Not executed, the batch contains invalid operations"})
+            if any([result["statusCode"] == 400 for result in results]):
+                return make_response(jsonify(results),400)
+            edm = ExecuteDBModifier(self.pyaas)
+            data,status,statuscode = edm.execute({"data":{"submodelIdentifier":submodelIdentifier,"operations":operations},
+                                                  "method":"PostSubmodelElementBatch_SRI","instanceId" : str(uuid.uuid1())})
+            if isinstance(data,list):
+                return make_response(jsonify(data),statuscode)
+            return make_response(data,statuscode)
+        except Exception as E:
+            self.pyaas.serviceLogger.info("Error at PostSubmodelElementBatch_SRI Rest" + str(E))
+            return make_response("Internal Server Error",500)
 
 class FileByPath_SRI(Resource):
     def __init__(self,pyaas):
@@ -1078,6 +1424,20 @@ class AASsubmodelRefsIndentifier(Resource):
             self.pyaas.serviceLogger.info("Error at deleteAASsubmodelRefsIndentifier Rest" + str(E))
             return make_response("Unexpected Internal Server Error",500)
 
+class AASStatistics(Resource):
+    def __init__(self,pyaas):
+        self.pyaas = pyaas
+
+    def get(self):
+        try:
+            data = {"dataManager": self.pyaas.dataManager.getStatistics(),
+                    "snapshots": self.pyaas.utilsServer.getStatistics(),
+                    "submodelCache": self.pyaas.dba.submodelCache.getStatistics()}
+            return make_response(jsonify(data),200)
+        except Exception as E:
+            self.pyaas.serviceLogger.info("Error at AASStatistics Rest" + str(E))
+            return make_response("Internal Server Error",500)
+
 class RetrieveMessage(Resource):    
     def __init__(self, pyaas):
         self.pyaas = pyaas
@@ -1768,6 +2128,7 @@ class AASWebInterfaceSubmodelElemValue(Resource):
                                        "instanceId" : str(uuid.uuid1())})            
             
             if status:
+                msg = copy.deepcopy(msg)
                 elemType = msg["modelType"]
                 if (elemType == "Property"):
                     msg["value"] = updateValue
@@ -1969,8 +2330,9 @@ class AASAssetInterfaceDescription(Resource):
                 aas_shell_uuid = self.pyaas.aasHashDict.__getHashEntry__(aasIdentifier1)._id
                 aasHashObject = self.pyaas.aasShellHashDict.__getHashEntry__(aas_shell_uuid)
                 elemObject = aasHashObject.asset_interface_description.get_property(property_Name).elemObject
-                aasHashObject.asset_interface_description.get_property(property_Name).elemObject.history[0].timestamp
-                returnData[property_Name] = {'label': [(str(dt.timestamp)).split(" ")[1] for dt in elemObject.history][-19:], 'value': [dt.aasElementValue for dt in elemObject.history][-19:]}
+                history = elemObject.getHistory()
+                timestamps, values = history.window(19)
+                returnData[property_Name] = {'label': [datetime.fromtimestamp(timestamp).strftime("%H:%M:%S.%f") for timestamp in timestamps], 'value': history.getValues(values)}
                 return returnData
             except Exception as E:
                 print(str(E))
@@ -0,0 +1,45 @@
+'''
+Copyright (c) 2021-2022 OVGU LIA
+Author: Harish Kumar Pakala
+This source code is licensed under the Apache License 2.0 (see LICENSE.txt).
+This source code may use other Open Source software components (see LICENSE.txt).
+'''
+
+import abc
+
+
+class AASStorageEngine(object):
+    '''
+        Persistent storage of the environment. The database server keeps serving from the
+        in-memory HashDicts, the storage engine receives the snapshots written at compaction
+        and provides the environment at startup. The mutations after the last snapshot are
+        recovered from the mutation log.
+    '''
+    __metaclass__ = abc.ABCMeta
+
+    def __init__(self, pyAAS):
+        self.pyAAS = pyAAS
+        self.lastSnapshotSize = 0
+
+    @abc.abstractmethod
+    def configure(self):
+        pass
+
+    @abc.abstractmethod
+    def loadEnvironment(self):
+        """Returns the stored environment or None if the engine holds no data yet."""
+        pass
+
+    @abc.abstractmethod
+    def getCoveredSegment(self):
+        """Returns the last mutation log segment contained in the stored environment."""
+        pass
+
+    @abc.abstractmethod
+    def saveSnapshot(self, shells, submodels, conceptDescriptions, coveredSegment):
+        """Stores the shells, the assembled submodel cache entries and the concept descriptions."""
+        pass
+
+    @abc.abstractmethod
+    def stop(self):
+        pass
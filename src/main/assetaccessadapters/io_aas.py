@@ -51,12 +51,14 @@ class PyAASSubscriptionHandler(object):
 
     def on_message(self, i40Message):
         new_value = i40Message["interactionElements"][0]
-        dataElement = self.params["dataElement"]
-        dataElement["value"] = new_value
+        _submodelIdentifier, idShortPath = self.pyAAS.dba.getSnapshot().splitIdShortPath(self.params["_referenceId"])
+        if _submodelIdentifier is None:
+            return
         edm = ExecuteDBModifier(self.pyAAS)
-        msg, status = edm.execute({"data": {"elemData": dataElement,
-                                            "_idShortpath": self.params["_referenceId"],
-                                            }, "method": "putSubmodelElem", "instanceId": str(uuid.uuid1())})
+        msg, status, statuscode = edm.execute({"data": {"submodelIdentifier": _submodelIdentifier,
+                                                        "idShortPath": idShortPath,
+                                                        "value": new_value,
+                                                        }, "method": "PutSubmodelElementValueByPath_SRI", "instanceId": str(uuid.uuid1())})
 
     def handle(self):
         accessURI = self.params["href"]
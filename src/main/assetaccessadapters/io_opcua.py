@@ -1,12 +1,11 @@
-from datetime import datetime
 from asyncua import Client, ua, Node
 import time
 import asyncio
-
+import uuid
 try:
-    from utils.utils import HistoryObject
+    from utils.utils import ExecuteDBModifier
 except ImportError:
-    from main.utils.utils import HistoryObject
+    from main.utils.utils import ExecuteDBModifier
 
 class OPCUAEndPointHandler:
 
@@ -89,22 +88,20 @@ class OPCUASubscriptionHandler:
     This class is just a sample class. Whatever class having these methods can be used
     """
     
-    def set_property(self,td_property):
-        self.td_property = td_property        
-    
+    def set_property(self,td_property,pyaas):
+        self.td_property = td_property
+        self.edm = ExecuteDBModifier(pyaas)
+
     def datachange_notification(self, node: Node, val, data):
         """
-        called for every datachange notification from server
+        called for every datachange notification from server, the value is queued for the
+        DataManager as a value only update without waiting for it in the event loop
         """
-        while not self.td_property.elem_lock:
-            self.td_property.elem_lock = True
-            _dt = datetime.now()
-            _ho = HistoryObject(self.td_property.aasELement["value"], _dt)
-            self.td_property.addhistoryElement(_ho)
-            self.td_property.aasELement["value"] = val
-            self.td_property.elem_lock = False
-            break        
-        
+        self.edm.submit({"data": {"submodelIdentifier": self.td_property.submodelIdentifier,
+                                  "idShortPath": self.td_property.idshort_path,
+                                  "value": val},
+                         "method": "PutSubmodelElementValueByPath_SRI", "instanceId": str(uuid.uuid1())})
+
     def event_notification(self, event: ua.EventNotificationList):
         """
         called for every event notification from server
@@ -248,12 +248,12 @@ class ConfigParser:
                 _submodelid  = submodel["keys"][0]["value"]
                 if self.pyaas.aasHashDict.__isKeyPresent__(_submodelid):
                     _id = self.pyaas.aasHashDict.__getHashEntry__(_submodelid)._id
-                    data,status, code = self.pyaas.dba.GetSubmodelById(_submodelid)
-                    if status:
-                        if type(data) == dict:
-                            if "semanticId" in data.keys():
-                                if data["semanticId"]["keys"][0]["value"] == _semanticId:
-                                    return data,True
+                    if self.pyaas.semanticIdIndex.__isEntryPresent__(_semanticId,_id):
+                        _submodel = self.pyaas.submodelHashDict.__getHashEntry__(_id).getElement()
+                        if _submodel["semanticId"]["keys"][0]["value"] == _semanticId:
+                            data,status, code = self.pyaas.dba.GetSubmodelById(_submodelid)
+                            if status:
+                                return data,True
             return "NO Data", False
         except Exception as e:
             return "NO Data", False
\ No newline at end of file
@@ -0,0 +1,132 @@
+'''
+Copyright (c) 2021-2022 Otto-von-Guericke-Universiat Magdeburg, Lehrstuhl Integrierte Automation
+Author: Harish Kumar Pakala
+This source code is licensed under the Apache License 2.0 (see LICENSE.txt).
+This source code may use other Open Source software components (see LICENSE.txt).
+'''
+from collections import OrderedDict
+import json
+import threading
+
+try:
+    from utils.utils import freeze
+except ImportError:
+    from src.main.utils.utils import freeze
+
+
+def serialize(element) -> bytes:
+    """
+        Serializes the element the same way as flask.jsonify does.
+    """
+    return (json.dumps(element, sort_keys=True, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+class CacheEntry(object):
+    def __init__(self, version, element, serialized, cache=None, key=None):
+        self.version = version
+        self.element = element
+        self.serialized = serialized
+        self.size = len(serialized)
+        self.views = dict()
+        self.cache = cache
+        self.key = key
+
+    def getView(self, key, buildView) -> bytes:
+        """
+            Returns the serialized projection of the element stored under the key, it is built
+            once per version of the entry and counted in its size. None if the projection does
+            not exist.
+        """
+        view = self.views.get(key)
+        if view is None:
+            element = buildView(self.element)
+            if element is None:
+                return None
+            if self.cache is None:
+                return self.views.setdefault(key, serialize(element))
+            view = self.cache.putView(self, key, serialize(element))
+        return view
+
+
+class AAS_Database_Cache(object):
+    '''
+        Memory bounded LRU cache of assembled submodels and their serialized JSON.
+        An entry is only valid for the version it was built from, a modified element
+        bumps the version of its ancestors so the other entries stay valid.
+    '''
+    def __init__(self, maxSize=64 * 1024 * 1024):
+        self.maxSize = maxSize
+        self.currentSize = 0
+        self.entries = OrderedDict()
+        self.cache_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def getEntry(self, key, version) -> CacheEntry:
+        """
+        """
+        with self.cache_lock:
+            entry = self.entries.get(key)
+            if entry is None or entry.version != version:
+                self.misses = self.misses + 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits = self.hits + 1
+            return entry
+
+    def putEntry(self, key, version, element) -> CacheEntry:
+        """
+        """
+        element = freeze(element)
+        entry = CacheEntry(version, element, serialize(element), self, key)
+        with self.cache_lock:
+            self.__removeEntry__(key)
+            if entry.size <= self.maxSize:
+                self.entries[key] = entry
+                self.currentSize = self.currentSize + entry.size
+                self.__evict__()
+        return entry
+
+    def putView(self, entry, viewKey, view) -> bytes:
+        """
+            Adds a serialized projection to the entry. Its bytes count against the size of the
+            cache while the entry is cached, the least recently used entries are evicted for it.
+        """
+        with self.cache_lock:
+            if viewKey in entry.views:
+                return entry.views[viewKey]
+            entry.views[viewKey] = view
+            entry.size = entry.size + len(view)
+            if self.entries.get(entry.key) is entry:
+                self.currentSize = self.currentSize + len(view)
+                self.__evict__()
+        return view
+
+    def invalidate(self, key) -> None:
+        """
+        """
+        with self.cache_lock:
+            self.__removeEntry__(key)
+
+    def __evict__(self) -> None:
+        """
+        """
+        while self.currentSize > self.maxSize:
+            _key, _entry = self.entries.popitem(last=False)
+            self.currentSize = self.currentSize - _entry.size
+            self.evictions = self.evictions + 1
+
+    def __removeEntry__(self, key) -> None:
+        """
+        """
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.currentSize = self.currentSize - entry.size
+
+    def getStatistics(self) -> dict:
+        """
+        """
+        with self.cache_lock:
+            return {"entries": len(self.entries), "size": self.currentSize, "maxSize": self.maxSize,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
@@ -0,0 +1,287 @@
+'''
+Copyright (c) 2021-2022 Otto-von-Guericke-Universiat Magdeburg, Lehrstuhl Integrierte Automation
+Author: Harish Kumar Pakala
+This source code is licensed under the Apache License 2.0 (see LICENSE.txt).
+This source code may use other Open Source software components (see LICENSE.txt).
+'''
+import hashlib
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+try:
+    from utils.utils import AASElementObject,HistoryBuffer
+except ImportError:
+    from src.main.utils.utils import AASElementObject,HistoryBuffer
+
+
+class AAS_Database_History(object):
+    '''
+        Columnar on-disk tier of the element histories. The numeric points of the history ring
+        buffers are rolled into segments under data/history, a directory per element with a
+        timestamps and a values .npy file (float64) per segment. The last segment of an element
+        is appended in place and its header rewritten, it is sealed at segmentPoints points.
+        The valueType file of the directory keeps the type the values were given as.
+        Queries read the segments through numpy memory maps and span the ring buffer.
+    '''
+    headerSize = 128
+    latestPoints = 25
+
+    def __init__(self, pyaas, segmentPoints=1024 * 1024, rollInterval=1):
+        self.pyaas = pyaas
+        self.historyRepository = os.path.join(self.pyaas.dataRepository, "history")
+        self.segmentPoints = segmentPoints
+        self.rollInterval = rollInterval
+        self.history_lock = threading.Lock()
+        self.segments = dict()
+        self.valueTypes = dict()
+        self.POLL = False
+
+    def getDirectory(self, key) -> str:
+        return os.path.join(self.historyRepository, hashlib.sha1(key.encode("utf-8")).hexdigest())
+
+    def getColumnPath(self, key, segment, column) -> str:
+        return os.path.join(self.getDirectory(key), str(segment).zfill(8) + "." + column + ".npy")
+
+    def getHeader(self, count) -> bytes:
+        header = "{'descr': '<f8', 'fortran_order': False, 'shape': (" + str(count) + ",), }"
+        return (b"\x93NUMPY\x01\x00" + struct.pack("<H", self.headerSize - 10) +
+                (header.ljust(self.headerSize - 11) + "\n").encode("latin1"))
+
+    def readCount(self, _path) -> int:
+        """
+            The points of a column, a tail written after the last header update is ignored.
+        """
+        with open(_path, "rb") as columnFile:
+            np.lib.format.read_magic(columnFile)
+            shape, fortranOrder, dtype = np.lib.format.read_array_header_1_0(columnFile)
+        return min(shape[0], (os.path.getsize(_path) - self.headerSize) // 8)
+
+    def mapColumn(self, key, segment, column, count) -> np.ndarray:
+        return np.memmap(self.getColumnPath(key, segment, column), dtype="<f8", mode="r",
+                         offset=self.headerSize, shape=(count,))
+
+    def loadSegments(self, key) -> list:
+        """
+            Returns [segment, first timestamp, last timestamp, points] of the segments of the element on disk.
+        """
+        segments = []
+        directory = self.getDirectory(key)
+        if os.path.isdir(directory):
+            for _fileName in sorted(os.listdir(directory)):
+                _parts = _fileName.split(".")
+                if len(_parts) == 3 and _parts[1] == "timestamps" and _parts[0].isdigit():
+                    segment = int(_parts[0])
+                    if not os.path.exists(self.getColumnPath(key, segment, "values")):
+                        continue
+                    count = min(self.readCount(self.getColumnPath(key, segment, "timestamps")),
+                                self.readCount(self.getColumnPath(key, segment, "values")))
+                    if count > 0:
+                        timestamps = self.mapColumn(key, segment, "timestamps", count)
+                        segments.append([segment, float(timestamps[0]), float(timestamps[-1]), count])
+        return segments
+
+    def getValueType(self, key, history) -> str:
+        """
+            The type the numeric values of the element were appended with, the one of the ring
+            buffer or else the one stored with the segments.
+        """
+        if history is not None and history.valueType is not None:
+            return history.valueType
+        if key not in self.valueTypes:
+            _path = os.path.join(self.getDirectory(key), "valueType")
+            valueType = None
+            if os.path.exists(_path):
+                with open(_path, "r", encoding="utf-8") as valueTypeFile:
+                    valueType = valueTypeFile.read().strip()
+            self.valueTypes[key] = valueType
+        return self.valueTypes[key]
+
+    def getSegments(self, key) -> list:
+        if key not in self.segments:
+            self.segments[key] = self.loadSegments(key)
+        return self.segments[key]
+
+    def writeColumn(self, _path, count, data) -> None:
+        with open(_path, "r+b" if os.path.exists(_path) else "w+b") as columnFile:
+            columnFile.seek(self.headerSize + count * 8)
+            columnFile.write(data.astype("<f8").tobytes())
+            columnFile.truncate()
+            columnFile.seek(0)
+            columnFile.write(self.getHeader(count + len(data)))
+
+    def appendPoints(self, key, timestamps, values, valueType="float") -> None:
+        """
+            Points older than the last persisted point are dropped, the segments stay sorted.
+        """
+        with self.history_lock:
+            segments = self.getSegments(key)
+            if len(segments) != 0:
+                newer = timestamps >= segments[-1][2]
+                timestamps = timestamps[newer]
+                values = values[newer]
+            if len(timestamps) == 0:
+                return
+            if len(segments) == 0 or segments[-1][3] >= self.segmentPoints:
+                if len(segments) == 0:
+                    os.makedirs(self.getDirectory(key), exist_ok=True)
+                    with open(os.path.join(self.getDirectory(key), "key"), "w", encoding="utf-8") as keyFile:
+                        keyFile.write(key)
+                segments.append([(segments[-1][0] if segments else 0) + 1, float(timestamps[0]), 0.0, 0])
+            if self.getValueType(key, None) != valueType:
+                with open(os.path.join(self.getDirectory(key), "valueType"), "w", encoding="utf-8") as valueTypeFile:
+                    valueTypeFile.write(valueType)
+                self.valueTypes[key] = valueType
+            segment = segments[-1]
+            self.writeColumn(self.getColumnPath(key, segment[0], "timestamps"), segment[3], timestamps)
+            self.writeColumn(self.getColumnPath(key, segment[0], "values"), segment[3], values)
+            segment[2] = float(timestamps[-1])
+            segment[3] = segment[3] + len(timestamps)
+
+    def roll(self) -> None:
+        """
+            Appends the numeric points added to the ring buffers since the last roll to the segments.
+        """
+        with AASElementObject.history_lock:
+            buffers = list(HistoryBuffer.registry.items())
+        for key, history in buffers:
+            if history.unpersisted == 0 or not isinstance(history.values, np.ndarray):
+                continue
+            valueType = history.valueType
+            timestamps, values = history.drain()
+            if isinstance(values, np.ndarray):
+                try:
+                    self.appendPoints(key, timestamps, values, valueType)
+                except Exception as E:
+                    self.pyaas.serviceLogger.info("Error at roll history " + key + " " + str(E))
+
+    def start(self) -> None:
+        self.POLL = True
+        while self.POLL:
+            time.sleep(self.rollInterval)
+            self.roll()
+
+    def stop(self) -> None:
+        self.POLL = False
+        self.roll()
+
+    def getRange(self, key, history, start=None, end=None, limit=None) -> tuple:
+        """
+            Returns the timestamps and values between start and end, the last limit of them if
+            limit is given. The points not yet rolled come from the ring buffer, the older ones
+            are sliced from the memory mapped segments.
+        """
+        start = -np.inf if start is None else start
+        end = np.inf if end is None else end
+        with self.history_lock:
+            segments = [list(segment) for segment in self.getSegments(key)]
+        parts = []
+        found = 0
+        if history is not None:
+            timestamps, values = history.window()
+            if not isinstance(values, np.ndarray):
+                values = np.array(values, dtype=object)
+            persisted = segments[-1][2] if len(segments) != 0 else -np.inf
+            selected = (timestamps > persisted) & (timestamps >= start) & (timestamps <= end)
+            parts.append((timestamps[selected], values[selected]))
+            found = found + int(selected.sum())
+        for segment, first, last, count in reversed(segments):
+            if limit is not None and found >= limit:
+                break
+            if last < start or first > end:
+                continue
+            timestamps = self.mapColumn(key, segment, "timestamps", count)
+            lower = int(np.searchsorted(timestamps, start, side="left"))
+            upper = int(np.searchsorted(timestamps, end, side="right"))
+            if limit is not None:
+                lower = max(lower, upper - (limit - found))
+            parts.append((timestamps[lower:upper], self.mapColumn(key, segment, "values", count)[lower:upper]))
+            found = found + upper - lower
+        parts.reverse()
+        if any([part[1].dtype == object for part in parts]):
+            valueType = self.getValueType(key, history)
+            parts = [part if part[1].dtype == object else
+                     (part[0], np.array(HistoryBuffer.toValues(part[1], valueType), dtype=object))
+                     for part in parts]
+        timestamps = np.concatenate([part[0] for part in parts]) if parts else np.empty(0)
+        values = np.concatenate([part[1] for part in parts]) if parts else np.empty(0)
+        if limit is not None:
+            return timestamps[-limit:], values[-limit:]
+        return timestamps, values
+
+    def aggregate(self, timestamps, values, interval, start=None) -> dict:
+        """
+            Min, max, mean and count per interval, the buckets are aligned to start or to
+            multiples of the interval. Empty buckets are omitted.
+        """
+        if len(timestamps) == 0:
+            return {"timestamps": [], "min": [], "max": [], "mean": [], "count": []}
+        origin = start if start is not None else np.floor(timestamps[0] / interval) * interval
+        buckets = np.floor((timestamps - origin) / interval).astype(np.int64)
+        starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+        counts = np.diff(np.append(starts, len(timestamps)))
+        return {"timestamps": (origin + buckets[starts] * interval).tolist(),
+                "min": np.minimum.reduceat(values, starts).tolist(),
+                "max": np.maximum.reduceat(values, starts).tolist(),
+                "mean": (np.add.reduceat(values, starts) / counts).tolist(),
+                "count": counts.tolist()}
+
+    def downsample(self, timestamps, values, points) -> tuple:
+        """
+            Largest-Triangle-Three-Buckets downsampling to points points. The bucket averages are
+            computed at once from cumulative sums, the selection walks the buckets.
+        """
+        n = len(timestamps)
+        if points >= n or points < 3:
+            return timestamps, values
+        edges = np.floor(np.arange(points - 1) * ((n - 2) / (points - 2))).astype(np.int64) + 1
+        timestampSums = np.concatenate(([0.0], np.cumsum(timestamps - timestamps[0])))
+        valueSums = np.concatenate(([0.0], np.cumsum(values)))
+        nextEdges = np.append(edges[2:], n)
+        nextStarts = edges[1:]
+        nextCounts = nextEdges - nextStarts
+        averageTimestamps = (timestampSums[nextEdges] - timestampSums[nextStarts]) / nextCounts + timestamps[0]
+        averageValues = (valueSums[nextEdges] - valueSums[nextStarts]) / nextCounts
+        selected = np.empty(points, dtype=np.int64)
+        selected[0] = 0
+        selected[-1] = n - 1
+        a = 0
+        for i in range(points - 2):
+            lower, upper = edges[i], edges[i + 1]
+            areas = np.abs((timestamps[a] - averageTimestamps[i]) * (values[lower:upper] - values[a]) -
+                           (timestamps[a] - timestamps[lower:upper]) * (averageValues[i] - values[a]))
+            a = lower + int(np.argmax(areas))
+            selected[i + 1] = a
+        return timestamps[selected], values[selected]
+
+    def getHistoryData(self, key, history, query=None) -> dict:
+        """
+            Without a query the last points with the label offsets of the web interface chart,
+            otherwise the points between from and to, aggregated per interval or downsampled to
+            points. None if the history can not be aggregated as it is not numeric.
+        """
+        if not query:
+            timestamps, values = self.getRange(key, history, limit=self.latestPoints)
+            differences = np.concatenate(([0], np.diff(timestamps).astype(np.int64)))
+            return {"values": self.serializeValues(key, history, values),
+                    "label": np.concatenate(([0], differences[:-1] + differences[1:])).tolist() if len(values) != 0 else []}
+        timestamps, values = self.getRange(key, history, query.get("from"), query.get("to"))
+        if ("interval" in query or "points" in query) and values.dtype == object:
+            return None
+        if "interval" in query:
+            return self.aggregate(timestamps, values, query["interval"], query.get("from"))
+        if "points" in query:
+            timestamps, values = self.downsample(timestamps, values, query["points"])
+        return {"timestamps": timestamps.tolist(), "values": self.serializeValues(key, history, values)}
+
+    def serializeValues(self, key, history, values) -> list:
+        """
+            The numeric values in the representation they were appended with, "21" stays a string.
+        """
+        valueType = self.getValueType(key, history)
+        if values.dtype == object or valueType in (None, "float"):
+            return values.tolist()
+        return HistoryBuffer.toValues(values, valueType)
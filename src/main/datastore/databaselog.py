@@ -0,0 +1,224 @@
+'''
+Copyright (c) 2021-2022 Otto-von-Guericke-Universiat Magdeburg, Lehrstuhl Integrierte Automation
+Author: Harish Kumar Pakala
+This source code is licensed under the Apache License 2.0 (see LICENSE.txt).
+This source code may use other Open Source software components (see LICENSE.txt).
+'''
+import json
+import os
+import threading
+import time
+
+
+class AAS_Database_Log(object):
+    '''
+        Append-only log of the database mutations applied by the DataManager.
+        Records are written by a flusher thread which fsyncs every batch once (group commit)
+        and only then completes the callers. Compaction rotates the log to a new segment,
+        after the snapshot covering the older segments is written they are removed.
+    '''
+    def __init__(self, pyaas, compactSize=4 * 1024 * 1024, compactInterval=60):
+        self.pyaas = pyaas
+        self.logRepository = os.path.join(self.pyaas.dataRepository, "wal")
+        self.compactSize = compactSize
+        self.compactInterval = compactInterval
+        self.applyLock = threading.RLock()
+        self.write_lock = threading.Lock()
+        self.pending_condition = threading.Condition()
+        self.pending = []
+        self.seq = 0
+        self.segmentSize = 0
+        self.lastCompaction = time.time()
+        self.logFile = None
+        self.segment = 0
+        self.POLL = False
+
+    def isMutation(self, method) -> bool:
+        return method.lower().startswith(("post", "put", "delete", "patch"))
+
+    def getSegments(self) -> list:
+        """
+            Returns the log segment numbers present on disk in ascending order.
+        """
+        segments = []
+        if os.path.isdir(self.logRepository):
+            for _fileName in os.listdir(self.logRepository):
+                _parts = _fileName.split(".")
+                if len(_parts) == 3 and _parts[0] == "mutations" and _parts[2] == "log" and _parts[1].isdigit():
+                    segments.append(int(_parts[1]))
+        return sorted(segments)
+
+    def getSegmentPath(self, segment) -> str:
+        return os.path.join(self.logRepository, "mutations." + str(segment).zfill(8) + ".log")
+
+    def syncDirectory(self, _path) -> None:
+        try:
+            _fd = os.open(_path, os.O_RDONLY)
+            try:
+                os.fsync(_fd)
+            finally:
+                os.close(_fd)
+        except OSError:
+            pass
+
+    def replay(self, coveredSegment) -> int:
+        """
+            Applies the log segments not yet covered by the snapshot the database was loaded from,
+            then opens a new segment for appending. Returns the number of replayed records.
+        """
+        os.makedirs(self.logRepository, exist_ok=True)
+        segments = self.getSegments()
+        replayed = 0
+        for segment in segments:
+            if segment <= coveredSegment:
+                continue
+            if os.path.getsize(self.getSegmentPath(segment)) == 0:
+                os.remove(self.getSegmentPath(segment))
+            else:
+                replayed = replayed + self.replaySegment(self.getSegmentPath(segment))
+        self.segment = (segments[-1] if segments else 0) + 1
+        self.logFile = open(self.getSegmentPath(self.segment), "ab")
+        self.segmentSize = 0
+        self.syncDirectory(self.logRepository)
+        if replayed != 0:
+            self.pyaas.serviceLogger.info("Replayed " + str(replayed) + " mutations from the log")
+        return replayed
+
+    def replaySegment(self, _path) -> int:
+        replayed = 0
+        validSize = 0
+        with open(_path, "rb") as segmentFile:
+            for line in segmentFile:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                validSize = validSize + len(line)
+                self.seq = max(self.seq, record["seq"])
+                _dba_method = getattr(self.pyaas.dba, record["method"])
+                if record["data"] is not None:
+                    _dba_method(record["data"])
+                else:
+                    _dba_method()
+                replayed = replayed + 1
+        if validSize != os.path.getsize(_path):
+            # torn write of the last record before a crash
+            with open(_path, "r+b") as segmentFile:
+                segmentFile.truncate(validSize)
+        return replayed
+
+    def serializeRecord(self, method, data) -> str:
+        """
+            Serializes the mutation before it is applied, the database methods may modify their arguments.
+        """
+        return json.dumps({"method": method, "data": data}, ensure_ascii=False, separators=(",", ":"))
+
+    def append(self, record, callback=None) -> None:
+        """
+            Queues the serialized record for the next group commit, the callback is called with
+            None once the record is durable or with the error of the failed write.
+        """
+        self.appendBatch([(record, callback)])
+
+    def appendBatch(self, records) -> None:
+        """
+            Queues the serialized records and callbacks of a batch, they are written with one fsync.
+        """
+        with self.pending_condition:
+            for record, callback in records:
+                self.seq = self.seq + 1
+                line = ('{"seq":' + str(self.seq) + "," + record[1:] + "\n").encode("utf-8")
+                self.pending.append((line, callback))
+            self.pending_condition.notify()
+
+    def start(self) -> None:
+        self.POLL = True
+        while self.POLL:
+            with self.pending_condition:
+                while self.POLL and len(self.pending) == 0:
+                    self.pending_condition.wait(1)
+            try:
+                self.commit()
+            except Exception as E:
+                self.pyaas.serviceLogger.info("Error at AAS_Database_Log flusher " + str(E))
+
+    def stop(self) -> None:
+        self.POLL = False
+        with self.pending_condition:
+            self.pending_condition.notify()
+        self.commit()
+
+    def commit(self) -> None:
+        """
+            Writes all pending records with a single fsync and completes their callers. If the
+            write fails the callers of the batch get the error and the segment is cut back to
+            its last durable record.
+        """
+        error = None
+        with self.write_lock:
+            with self.pending_condition:
+                batch = self.pending
+                self.pending = []
+            if len(batch) == 0:
+                return
+            data = b"".join([line for line, callback in batch])
+            try:
+                self.logFile.write(data)
+                self.logFile.flush()
+                os.fsync(self.logFile.fileno())
+                self.segmentSize = self.segmentSize + len(data)
+            except Exception as E:
+                error = E
+                self.pyaas.serviceLogger.info("Error at AAS_Database_Log commit " + str(E))
+                self.reopenSegment()
+        for line, callback in batch:
+            if callback is not None:
+                try:
+                    callback(error)
+                except Exception as E:
+                    self.pyaas.serviceLogger.info("Error at AAS_Database_Log callback " + str(E))
+
+    def reopenSegment(self) -> None:
+        """
+            Drops the buffered and torn bytes of a failed write, the next commit appends to
+            the last durable record of the segment.
+        """
+        try:
+            self.logFile.close()
+        except Exception:
+            pass
+        try:
+            with open(self.getSegmentPath(self.segment), "r+b") as segmentFile:
+                segmentFile.truncate(self.segmentSize)
+            self.logFile = open(self.getSegmentPath(self.segment), "ab")
+        except Exception as E:
+            self.pyaas.serviceLogger.info("Error at AAS_Database_Log reopenSegment " + str(E))
+
+    def needsCompaction(self) -> bool:
+        if self.segmentSize == 0 and len(self.pending) == 0:
+            return False
+        return self.segmentSize >= self.compactSize or (time.time() - self.lastCompaction) >= self.compactInterval
+
+    def rotate(self) -> int:
+        """
+            Commits the pending records and continues the log in a new segment. Returns the
+            last segment covered by a snapshot taken at this point.
+        """
+        self.commit()
+        with self.write_lock:
+            self.logFile.close()
+            coveredSegment = self.segment
+            self.segment = self.segment + 1
+            self.logFile = open(self.getSegmentPath(self.segment), "ab")
+            self.segmentSize = 0
+            self.syncDirectory(self.logRepository)
+        self.lastCompaction = time.time()
+        return coveredSegment
+
+    def truncate(self, coveredSegment) -> None:
+        """
+            Removes the segments contained in a stored snapshot.
+        """
+        for segment in self.getSegments():
+            if segment <= coveredSegment:
+                os.remove(self.getSegmentPath(segment))
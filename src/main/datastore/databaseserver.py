@@ -5,48 +5,91 @@ This source code is licensed under the Apache License 2.0 (see LICENSE.txt).
 This source code may use other Open Source software components (see LICENSE.txt).
 '''
 import base64
+import json
 import os
+import threading
 import uuid
 from datetime import datetime
 try:
-    from utils.utils import AASHashObject,UUIDGenerator,AASElementObject,ConversationObject,HistoryObject,SubscriptionMessage,ShellObject,CarbonFootPrintObject
+    from datastore.databasecache import AAS_Database_Cache
 except ImportError:
-    from src.main.utils.utils import AASHashObject,UUIDGenerator,AASElementObject,ConversationObject,HistoryObject,SubscriptionMessage,ShellObject,CarbonFootPrintObject
+    from src.main.datastore.databasecache import AAS_Database_Cache
+try:
+    from datastore.databasesnapshot import AAS_Database_Snapshot
+except ImportError:
+    from src.main.datastore.databasesnapshot import AAS_Database_Snapshot
+try:
+    from utils.utils import AASHashObject,UUIDGenerator,AASElementObject,ConversationObject,SubscriptionMessage,ShellObject,CarbonFootPrintObject,sharedSubtrees,FrozenList,AASMetaModelValidator
+except ImportError:
+    from src.main.utils.utils import AASHashObject,UUIDGenerator,AASElementObject,ConversationObject,SubscriptionMessage,ShellObject,CarbonFootPrintObject,sharedSubtrees,FrozenList,AASMetaModelValidator
 
 base_dir = os.path.dirname(os.path.realpath(__file__))
 
     
 class AASSubmodelParser(object):
-    def __init__(self,aasHashDict,submodelHashDict):
+    """
+        The parsed elements are hash-consed, identical subtrees are shared between elements.
+        Their idShortPaths are entered into the path trie. With _update the elements already
+        present are updated in place and keep their uuid, the parsed idShortPaths are collected
+        in parsedIds.
+    """
+    def __init__(self,aasHashDict,submodelHashDict,semanticIdIndex,idShortPathTrie):
         self.aasHashDict = aasHashDict
         self.submodelHashDict = submodelHashDict
+        self.semanticIdIndex = semanticIdIndex
+        self.idShortPathTrie = idShortPathTrie
         self.uuidG = UUIDGenerator()
+        self.parsedIds = set()
     
+    def getSemanticIds(self,_element):
+        try:
+            return [key["value"] for key in _element["semanticId"]["keys"]]
+        except (KeyError,TypeError):
+            return []
+
     def registerElement(self,_newId,_element):
         _uuid = self.uuidG.getnewUUID()
         aasHashObj = AASHashObject(_uuid)
         self.aasHashDict.__insertHashEntry__(_newId, aasHashObj)
-        _aasElementObject = AASElementObject(_element,_newId)
-        _aasElementObject.modelType = _element["modelType"]
+        _aasElementObject = AASElementObject(sharedSubtrees.share(_element),_newId)
+        _aasElementObject.modelType = _aasElementObject.getElement()["modelType"]
         _aasElementObject.idShort = _element["idShort"]
         self.submodelHashDict.__insertHashEntry__(_uuid, _aasElementObject)
+        self.semanticIdIndex.__insertEntry__(_uuid,self.getSemanticIds(_element))
+        self.idShortPathTrie.__insertEntry__(_newId,_uuid)
         return _uuid
     
     def updatePropertyElement(self,_submodelElement,_newId):
+        """
+            An unchanged element keeps its version, the old value of a changed Property is
+            appended to its history.
+        """
+        if not self.aasHashDict.__isKeyPresent__(_newId):
+            return self.registerElement(_newId,_submodelElement)
         hashObject = self.aasHashDict.__getHashEntry__(_newId)
         _uuid = hashObject.__getId__()
         aasElementObject = self.submodelHashDict.__getHashEntry__(_uuid)
         _history = aasElementObject.getElement()
-        aasElementObject.aasELement = _submodelElement
-        aasElementObject.modelType = _submodelElement["modelType"]
-        if (_submodelElement["modelType"] == "Property"):
-            hobject = HistoryObject(str(datetime.now().strftime("%d/%m/%Y %H:%M:%S")),_history["value"])
-            aasElementObject.history.append(hobject)
+        _element = sharedSubtrees.share(_submodelElement)
+        if _element is _history or _element == _history:
+            return _uuid
+        aasElementObject.setElement(_element)
+        aasElementObject.modelType = aasElementObject.getElement()["modelType"]
+        self.semanticIdIndex.__insertEntry__(_uuid,self.getSemanticIds(_submodelElement))
+        if (_submodelElement["modelType"] == "Property" and _history["modelType"] == "Property"
+                and _history.get("value") != _element.get("value")):
+            aasElementObject.addHistory(_history.get("value"),datetime.now())
         hashObject.newUpdate = True
-        return _uuid        
+        return _uuid
     
+    def adoptChildElements(self,_uuid,childIds):
+        _parentObject = self.submodelHashDict.__getHashEntry__(_uuid)
+        for _childId in childIds:
+            self.submodelHashDict.__getHashEntry__(_childId).parentObject = _parentObject
+
     def parseDataElement(self,_submodelElement,_parentId,_update=False):
         _newId = _parentId +"."+ _submodelElement["idShort"]
+        self.parsedIds.add(_newId)
         if (_update):
             return  self.updatePropertyElement(_submodelElement,_newId)
         else:
@@ -54,49 +97,89 @@ class AASSubmodelParser(object):
 
     def parseSubmodelCollection(self,submodelColl,_parentId,_update=False):
         _newId =_parentId +"."+ submodelColl["idShort"]
+        self.parsedIds.add(_newId)
         collectionElemIds =  []
+        submodelColl = dict(submodelColl)
         if "value" in list(submodelColl.keys()):
             for _submodelElement in submodelColl["value"]:
                 if (_submodelElement["modelType"] != "SubmodelElementCollection"):
                     collectionElemIds.append(self.parseDataElement(_submodelElement, _newId,_update))
                 else:
                     collectionElemIds.append(self.parseSubmodelCollection(_submodelElement,_newId,_update))
-            submodelColl["value"].clear()
-            for _uid in collectionElemIds:
-                submodelColl["value"].append(_uid)
+            submodelColl["value"] = collectionElemIds
         if (_update):
-            return  self.updatePropertyElement(_submodelElement,_newId)
+            _uuid = self.updatePropertyElement(submodelColl,_newId)
         else:
-            return self.registerElement(_newId,submodelColl)
+            _uuid = self.registerElement(_newId,submodelColl)
+        self.adoptChildElements(_uuid,collectionElemIds)
+        return _uuid
     
-    def parse(self,submodel):
+    def parse(self,submodel,_update=False):
         submodelId = submodel["id"]
+        self.parsedIds.add(submodelId)
         submodelElements = []
+        submodel = dict(submodel)
+        self.idShortPathTrie.__insertRoot__(submodelId)
         if "submodelElements" in submodel.keys():
             for _submodelElement in submodel["submodelElements"]:
                 if (_submodelElement["modelType"] != "SubmodelElementCollection"):
-                    submodelElements.append(self.parseDataElement(_submodelElement,submodelId))                    
+                    submodelElements.append(self.parseDataElement(_submodelElement,submodelId,_update))
                 else:
-                    submodelElements.append(self.parseSubmodelCollection(_submodelElement,submodelId))
-            submodel["submodelElements"].clear()
-            for _uuid in submodelElements:
-                submodel["submodelElements"].append(_uuid)
-        
-        return self.registerElement(submodelId, submodel)
+                    submodelElements.append(self.parseSubmodelCollection(_submodelElement,submodelId,_update))
+            submodel["submodelElements"] = submodelElements
+        if (_update):
+            _uuid = self.updatePropertyElement(submodel,submodelId)
+        else:
+            _uuid = self.registerElement(submodelId, submodel)
+        self.adoptChildElements(_uuid,submodelElements)
+        return _uuid
         
         
 class ConceptionDescriptionParser(object):
-    def __init__(self,aasHashDict,cdHashDict):
+    """
+        The parsed concept descriptions are hash-consed like the submodel elements.
+    """
+    def __init__(self,aasHashDict,cdHashDict,cdIdShortIndex,cdIsCaseOfIndex,cdDataSpecificationIndex):
         self.aasHashDict = aasHashDict
         self.cdHashDict = cdHashDict
+        self.cdIdShortIndex = cdIdShortIndex
+        self.cdIsCaseOfIndex = cdIsCaseOfIndex
+        self.cdDataSpecificationIndex = cdDataSpecificationIndex
         self.uuidG = UUIDGenerator()    
 
+    def getReferenceKeys(self,_references):
+        keys = []
+        for _ref in _references:
+            keys.extend([key["value"] for key in _ref["keys"]])
+        return keys
+
+    def getDataSpecificationKeys(self,_cD):
+        _references = list(_cD.get("dataSpecifications",[]))
+        for _embeddedDataSpecification in _cD.get("embeddedDataSpecifications",[]):
+            if "dataSpecification" in _embeddedDataSpecification:
+                _references.append(_embeddedDataSpecification["dataSpecification"])
+        return self.getReferenceKeys(_references)
+
+    def indexElement(self,_uuid,_cD):
+        self.cdIdShortIndex.__insertEntry__(_uuid,[_cD["idShort"]] if "idShort" in _cD else [])
+        self.cdIsCaseOfIndex.__insertEntry__(_uuid,self.getReferenceKeys(_cD.get("isCaseOf",[])))
+        self.cdDataSpecificationIndex.__insertEntry__(_uuid,self.getDataSpecificationKeys(_cD))
+
+    def unregisterElement(self,_newId):
+        _uuid = self.aasHashDict.__getHashEntry__(_newId).__getId__()
+        self.cdHashDict.__deleteHashEntry__(_uuid)
+        self.aasHashDict.__deleteHashEntry__(_newId)
+        self.cdIdShortIndex.__removeEntry__(_uuid)
+        self.cdIsCaseOfIndex.__removeEntry__(_uuid)
+        self.cdDataSpecificationIndex.__removeEntry__(_uuid)
+
     def registerElement(self,_newId,_element):
         _uuid = self.uuidG.getnewUUID()
         aasHashObj = AASHashObject(_uuid)
         self.aasHashDict.__insertHashEntry__(_newId, aasHashObj)
-        _aasElementObject = AASElementObject(_element,_newId)
+        _aasElementObject = AASElementObject(sharedSubtrees.share(_element),_newId)
         self.cdHashDict.__insertHashEntry__(_uuid, _aasElementObject)
+        self.indexElement(_uuid,_element)
         return _uuid
 
     def parse(self,_cD):
@@ -124,6 +207,8 @@ class AASShellParser(object):
         return self.register(_assShell["id"],_assShell)
 
 class AAS_Database_Server(object):
+    childMembers = {"Submodel":"submodelElements","SubmodelElementCollection":"value"}
+
     def __init__(self,pyAAS):
         self.pyAAS = pyAAS
         self.jsonData = self.pyAAS.aasConfigurer.jsonData
@@ -134,6 +219,16 @@ class AAS_Database_Server(object):
         self.conversHashDict = self.pyAAS.converseHashDict
         self.cfpHashDict = self.pyAAS.cfpHashDict
         self.aasShellHashDict = self.pyAAS.aasShellHashDict
+        self.semanticIdIndex = self.pyAAS.semanticIdIndex
+        self.idShortPathTrie = self.pyAAS.idShortPathTrie
+        self.cdIdShortIndex = self.pyAAS.cdIdShortIndex
+        self.cdIsCaseOfIndex = self.pyAAS.cdIsCaseOfIndex
+        self.cdDataSpecificationIndex = self.pyAAS.cdDataSpecificationIndex
+        self.submodelCache = AAS_Database_Cache()
+        self.etagPrefix = uuid.uuid4().hex[:8]
+        self.snapshot = None
+        self.snapshot_lock = threading.Lock()
+        self.latestSnapshot = None
         self.dbServerStatus = self.__initAASPackage__()
         
     def __initAASPackage__(self):
@@ -148,12 +243,12 @@ class AAS_Database_Server(object):
         
     def parseSubmodels(self,_submodels):
         for _submodel in _submodels:
-            aasSmParser = AASSubmodelParser(self.aasHashDict,self.submodelHashDict)
+            aasSmParser = AASSubmodelParser(self.aasHashDict,self.submodelHashDict,self.semanticIdIndex,self.idShortPathTrie)
             aasSmParser.parse(_submodel)
 
     def parseConceptDescription(self,conceptDescriptions):
         for _conceptDescription in conceptDescriptions:
-            cdParse = ConceptionDescriptionParser(self.aasHashDict,self.cdHashDict)
+            cdParse = ConceptionDescriptionParser(self.aasHashDict,self.cdHashDict,self.cdIdShortIndex,self.cdIsCaseOfIndex,self.cdDataSpecificationIndex)
             cdParse.parse(_conceptDescription)
     
     def parseAssetAdministrationShells(self,assetAdministrationShells):
@@ -162,6 +257,7 @@ class AAS_Database_Server(object):
             aasShellObject.parse(_aasShell)
             
     def processCollectionElements(self,collectionElem):
+        collectionElem = dict(collectionElem)
         if "value" in list(collectionElem.keys()):
             values = []
             for _subid in collectionElem["value"]:
@@ -173,25 +269,102 @@ class AAS_Database_Server(object):
             collectionElem["value"] = values
         return collectionElem
         
-    def deleteCollectionElems(self,collectionElem):
-        if "value" in list(collectionElem.keys()): 
-            for _subid in collectionElem["value"]:
-                _aasElementObject = (self.submodelHashDict.__getHashEntry__(_subid))
-                subelem = _aasElementObject.getElement()
-                if (subelem["modelType"] == "SubmodelElementCollection"):
-                    self.deleteCollectionElems(subelem)
-                self.submodelHashDict.__deleteHashEntry__(_subid)
-                self.aasHashDict.__deleteHashEntry__(_aasElementObject.getIdShortPath())
+    def appendChildElem(self,_parentuuid,_key,_childuuid):
+        _parentObject = self.submodelHashDict.__getHashEntry__(_parentuuid)
+        self.submodelHashDict.__getHashEntry__(_childuuid).parentObject = _parentObject
+        _children = list(_parentObject.getElement().get(_key,[]))
+        _children.append(_childuuid)
+        _parentObject.updateElement(_key,_children)
+
+    def removeChildElem(self,_parentuuid,_key,_childuuid):
+        _parentObject = self.submodelHashDict.__getHashEntry__(_parentuuid)
+        _children = list(_parentObject.getElement()[_key])
+        _children.remove(_childuuid)
+        _parentObject.updateElement(_key,_children)
+
+    def buildSnapshot(self,_identifiers=None):
+        """
+            Builds the next snapshot root from the last built one, only the given shell, submodel
+            and concept description identifiers are looked up again. Without identifiers or a
+            previous root the whole environment is captured.
+        """
+        previous = self.latestSnapshot
+        if _identifiers is None or previous is None:
+            shells,submodels,conceptDescriptions = dict(),dict(),dict()
+            _identifiers = [self.aasHashDict.__getkey__(_uuid) for _uuid in self.aasShellHashDict._getKeys()]
+            _identifiers.extend([self.aasHashDict.__getkey__(_uuid) for _uuid in self.submodelHashDict._getKeys()
+                                 if self.submodelHashDict.__getHashEntry__(_uuid).modelType == "Submodel"])
+            _identifiers.extend([self.aasHashDict.__getkey__(_uuid) for _uuid in self.cdHashDict._getKeys()])
+            generation = 1 if previous is None else previous.generation + 1
+        else:
+            shells = dict(previous.shells)
+            submodels = dict(previous.submodels)
+            conceptDescriptions = dict(previous.conceptDescriptions)
+            generation = previous.generation + 1
+        for _identifier in _identifiers:
+            target,value = None,None
+            if _identifier is not None and self.aasHashDict.__isKeyPresent__(_identifier):
+                _uuid = self.aasHashDict.__getHashEntry__(_identifier).__getId__()
+                if self.aasShellHashDict.__isKeyPresent__(_uuid):
+                    _shellObject = self.aasShellHashDict.__getHashEntry__(_uuid)
+                    target,value = shells,(_shellObject.version,_shellObject.getElement())
+                elif self.submodelHashDict.__isKeyPresent__(_uuid):
+                    value,status = submodels.get(_identifier),True
+                    if value is None or value.version != self.submodelHashDict.__getHashEntry__(_uuid).version:
+                        value,status,statuscode = self.assembleSubmodel(_uuid)
+                    target = submodels if status else None
+                elif self.cdHashDict.__isKeyPresent__(_uuid):
+                    target,value = conceptDescriptions,self.cdHashDict.__getHashEntry__(_uuid).getElement()
+            for _elements in (shells,submodels,conceptDescriptions):
+                if _elements is target:
+                    _elements[_identifier] = value
+                else:
+                    _elements.pop(_identifier,None)
+        self.latestSnapshot = AAS_Database_Snapshot(generation,self.etagPrefix,shells,submodels,conceptDescriptions)
+        return self.latestSnapshot
+
+    def publishSnapshot(self,snapshot):
+        """
+            The commit callbacks of the log run on more than one thread, an older root never
+            replaces a newer one.
+        """
+        with self.snapshot_lock:
+            if self.snapshot is None or snapshot.generation > self.snapshot.generation:
+                self.snapshot = snapshot
+
+    def getSnapshot(self):
+        """
+            Returns the root of the last committed batch, readers keep using the returned root.
+        """
+        snapshot = self.snapshot
+        if snapshot is None:
+            snapshot = self.buildSnapshot()
+            self.publishSnapshot(snapshot)
+        return snapshot
+
+    def deleteElemTree(self,_idShortPath):
+        """
+            Deletes the element and all elements below it, the subtree is detached from the
+            path trie. The parent keeps the uuid in its children.
+        """
+        entries = self.idShortPathTrie.__removeSubtree__(_idShortPath)
+        _uuids = [_uuid for _key,_uuid in entries]
+        self.submodelHashDict.__deleteHashEntries__(_uuids)
+        self.semanticIdIndex.__removeEntries__(_uuids)
+        for _uuid in _uuids:
+            self.submodelCache.invalidate(_uuid)
+        self.aasHashDict.__deleteHashEntries__([_key for _key,_uuid in entries])
         
     def postSubmodelElem(self,data):
         try:
             _idShortpath = data["_idShortpath"]
             elemData = data["elemData"]
-            aasSmParser = AASSubmodelParser(self.aasHashDict,self.submodelHashDict)
-            _parentId = (_idShortpath.split("."))
-            del _parentId[-1]
+            aasSmParser = AASSubmodelParser(self.aasHashDict,self.submodelHashDict,self.semanticIdIndex,self.idShortPathTrie)
+            _parentId = _idShortpath.rsplit(".",1)[0]
+            if self.idShortPathTrie.__getEntry__(_parentId) is None:
+                return "The parent element does not exist",False,400
             if (elemData["modelType"] == "SubmodelElementCollection"):
-                aasSmParser.parseSubmodelCollection(elemData, ".".join(_parentId))
+                aasSmParser.parseSubmodelCollection(elemData, _parentId)
             else:
                 aasSmParser.parseDataElement(elemData, _parentId)
             return "Submodel element created successfully", True,201
@@ -219,16 +392,87 @@ class AAS_Database_Server(object):
             self.pyAAS.serviceLogger.info("Error at putSubmodelElem DB" + str(E))
             return  "Internal Server Error", False,500
     
+    def putSubmodelElemValue(self,_idShortPath,value):
+        """
+            Replaces the value of a Property, MultiLanguageProperty or Range in place. The element
+            keeps its uuid and index entries, the old value of a Property is appended to its history.
+            An unchanged value neither adds a history point nor bumps the version.
+        """
+        try:
+            if not self.aasHashDict.__isKeyPresent__(_idShortPath):
+                return "The submodel element not found", False, 404
+            _sid = self.aasHashDict.__getHashEntry__(_idShortPath).__getId__()
+            aasElementObject = self.submodelHashDict.__getHashEntry__(_sid)
+            submodelElem = aasElementObject.getElement()
+            if isinstance(value,dict) and list(value.keys()) == [submodelElem["idShort"]]:
+                value = value[submodelElem["idShort"]]
+            modelType = submodelElem["modelType"]
+            if modelType == "Property":
+                if isinstance(value,(dict,list)):
+                    return "The value of a Property has to be a primitive value", False, 400
+                if not isinstance(value,str):
+                    value = json.dumps(value)
+                if value == submodelElem.get("value"):
+                    return "Submodel element value updated successfully", True, 204
+                aasElementObject.addHistory(submodelElem.get("value"),datetime.now())
+                aasElementObject.updateElement("value",value)
+            elif modelType == "MultiLanguageProperty":
+                value = self.toLangStrings(value)
+                if value is None:
+                    return "The value of a MultiLanguageProperty has to be a list of language strings", False, 400
+                if value == submodelElem.get("value"):
+                    return "Submodel element value updated successfully", True, 204
+                if not AASMetaModelValidator(self.pyAAS).validateSubmodelElement(submodelElem.set("value",value)):
+                    return "The value of the MultiLanguageProperty is not valid", False, 400
+                aasElementObject.updateElement("value",value)
+            elif modelType == "Range":
+                if not isinstance(value,dict) or len(value) == 0 or not set(value.keys()) <= {"min","max"}:
+                    return "The value of a Range has to be an object with min and max", False, 400
+                if any([isinstance(value[key],(dict,list)) for key in value.keys()]):
+                    return "The min and max of a Range have to be primitive values", False, 400
+                value = dict([(key,value[key] if isinstance(value[key],str) else json.dumps(value[key]))
+                              for key in value.keys()])
+                if all([value[key] == submodelElem.get(key) for key in value.keys()]):
+                    return "Submodel element value updated successfully", True, 204
+                _submodelElem = submodelElem
+                for key in value.keys():
+                    _submodelElem = _submodelElem.set(key,value[key])
+                if not AASMetaModelValidator(self.pyAAS).validateSubmodelElement(_submodelElem):
+                    return "The value of the Range is not valid", False, 400
+                for key in value.keys():
+                    aasElementObject.updateElement(key,value[key])
+            else:
+                return "The value only update is not supported for " + modelType, False, 400
+            return "Submodel element value updated successfully", True, 204
+        except Exception as E:
+            self.pyAAS.serviceLogger.info("Error at putSubmodelElemValue DB" + str(E))
+            return  "Internal Server Error", False,500
+
+    def toLangStrings(self,value):
+        """
+            Converts the value only serialization of a MultiLanguageProperty, [{"en": "text"}] or
+            {"en": "text"}, to the stored list of {"language": ..., "text": ...}. Language strings
+            in the stored form are kept. None if the value has neither form.
+        """
+        if isinstance(value,dict):
+            value = [value]
+        if not isinstance(value,list) or len(value) == 0:
+            return None
+        langStrings = []
+        for langString in value:
+            if not isinstance(langString,dict) or len(langString) == 0:
+                return None
+            if set(langString.keys()) == {"language","text"}:
+                langStrings.append({"language":langString["language"],"text":langString["text"]})
+            else:
+                for language,text in langString.items():
+                    langStrings.append({"language":language,"text":text})
+        return langStrings
+
     def deleteSubmodelElem(self,_idShortPath):
         try:
             if self.aasHashDict.__isKeyPresent__(_idShortPath):
-                _id = (self.aasHashDict.__getHashEntry__(_idShortPath).__getId__())
-                self.aasHashDict.__deleteHashEntry__(_idShortPath)
-                elem = (self.submodelHashDict.__getHashEntry__(_id)).getElement()
-                if (elem["modelType"] != "SubmodelElementCollection"):
-                    self.submodelHashDict.__deleteHashEntry__(_id)
-                else:
-                    self.deleteCollectionElems(elem)
+                self.deleteElemTree(_idShortPath)
                 return "Submodel element deleted successfully", True, 204
             else:
                 return "The Submodel element not found", False, 404
@@ -259,7 +503,7 @@ class AAS_Database_Server(object):
             else:
                 return _submodel,status,statuscode
         except Exception as E:
-            self.pyAAS.serviceLogger.info("Error at GetAllSubmodelElements DB" + str(E))            
+            self.pyAAS.serviceLogger.info("Error at GetAllSubmodelElements DB" + str(E))
             return  "Internal Server Error", False,500
 
     def PostSubmodelElement(self,data):
@@ -281,14 +525,14 @@ class AAS_Database_Server(object):
                         if self.aasHashDict.__isKeyPresent__(idShortPath):
                             return "The submodel element is already present please try put",False,400                   
                         else:
-                            aasSmParser = AASSubmodelParser(self.aasHashDict,self.submodelHashDict)
+                            aasSmParser = AASSubmodelParser(self.aasHashDict,self.submodelHashDict,self.semanticIdIndex,self.idShortPathTrie)
                             _newuuid = ""
                             if (_elemData["modelType"] == "SubmodelElementCollection"):
                                 _newuuid = aasSmParser.parseSubmodelCollection(_elemData, _submodelIdentifier)
                             else:
                                 _newuuid = aasSmParser.parseDataElement(_elemData, _submodelIdentifier)
                             _sid = (self.aasHashDict.__getHashEntry__(_submodelIdentifier).__getId__())
-                            (self.submodelHashDict.__getHashEntry__(_sid)).aasELement["submodelElements"].append(_newuuid)
+                            self.appendChildElem(_sid,"submodelElements",_newuuid)
                             return "Submodel element created successfully", True,201                                 
                     else:
                         return "The submodel is not found", True,404             
@@ -352,14 +596,9 @@ class AAS_Database_Server(object):
                                 _submodel_id = (self.aasHashDict.__getHashEntry__(_submodelIdentifier).__getId__())
                                 _submodel = (self.submodelHashDict.__getHashEntry__(_submodel_id)).getElement()
                                 _sumodelElemId =  (self.aasHashDict.__getHashEntry__(_submodelIdentifier+"."+data["idShortPath"]).__getId__())
-                                _submodelElem = (self.submodelHashDict.__getHashEntry__(_sumodelElemId)).getElement()
                                 if _sumodelElemId in _submodel["submodelElements"]:
-                                    _submodel["submodelElements"].remove(_sumodelElemId)
-                                    self.submodelHashDict.__getHashEntry__(_submodel_id).setElement(_submodel)
-                                    if (_submodelElem["modelType"] == "SubmodelElementCollection"):
-                                        self.deleteCollectionElems(_submodelElem)    
-                                    self.submodelHashDict.__deleteHashEntry__(_sumodelElemId)
-                                    self.aasHashDict.__deleteHashEntry__(_submodelIdentifier+"."+data["idShortPath"])
+                                    self.removeChildElem(_submodel_id,"submodelElements",_sumodelElemId)
+                                    self.deleteElemTree(_submodelIdentifier+"."+data["idShortPath"])
                                     return "Submodel element deleted successfully", True, 204
                                 else:
                                     return "THe Submodel element is not found in the submodel", False,404
@@ -370,13 +609,8 @@ class AAS_Database_Server(object):
                                     parentElement = (self.submodelHashDict.__getHashEntry__(_pid)).getElement()
                                     if (parentElement["modelType"] == "SubmodelElementCollection"):
                                         _sumodelElemId =  (self.aasHashDict.__getHashEntry__(_submodelIdentifier+"."+data["idShortPath"]).__getId__())
-                                        _submodelElem = (self.submodelHashDict.__getHashEntry__(_sumodelElemId)).getElement()
-                                        if (_submodelElem["modelType"] == "SubmodelElementCollection"):
-                                            self.deleteCollectionElems(_submodelElem)
-                                        self.submodelHashDict.__deleteHashEntry__(_sumodelElemId)
-                                        self.aasHashDict.__deleteHashEntry__(_submodelIdentifier+"."+data["idShortPath"])
-                                        parentElement["value"].remove(_sumodelElemId)
-                                        self.submodelHashDict.__getHashEntry__(_pid).setElement(parentElement)
+                                        self.deleteElemTree(_submodelIdentifier+"."+data["idShortPath"])
+                                        self.removeChildElem(_pid,"value",_sumodelElemId)
                                         return "Submodel element deleted successfully", True, 204                                    
                                     else:
                                         return "The submodel element is not valid at this location", False, 400
@@ -414,7 +648,7 @@ class AAS_Database_Server(object):
                             return "The submodel element is already present please try put",False,400
                         else:
                             idShortSplit = (data["idShortPath"]).split(".")
-                            aasSmParser = AASSubmodelParser(self.aasHashDict,self.submodelHashDict)
+                            aasSmParser = AASSubmodelParser(self.aasHashDict,self.submodelHashDict,self.semanticIdIndex,self.idShortPathTrie)
                             _newuuid = ""
                             if len(idShortSplit) == 1:
                                 if (_elemData["modelType"] == "SubmodelElementCollection"):
@@ -422,7 +656,7 @@ class AAS_Database_Server(object):
                                 else:
                                     _newuuid = aasSmParser.parseDataElement(_elemData, _submodelIdentifier)
                                 _sid = (self.aasHashDict.__getHashEntry__(_submodelIdentifier).__getId__())
-                                (self.submodelHashDict.__getHashEntry__(_sid)).aasELement["submodelElements"].append(_newuuid)
+                                self.appendChildElem(_sid,"submodelElements",_newuuid)
                                 return "Submodel element created successfully", True,201
                             else:
                                 _parentId = _submodelIdentifier +"." + data["idShortPath"]
@@ -435,7 +669,7 @@ class AAS_Database_Server(object):
                                             _newuuid = aasSmParser.parseSubmodelCollection(_elemData, _parentId)
                                         else:
                                             _newuuid = aasSmParser.parseDataElement(_elemData, _parentId)
-                                        (self.submodelHashDict.__getHashEntry__(_pid)).aasELement["value"].append(_newuuid)
+                                        self.appendChildElem(_pid,"value",_newuuid)
                                         return "Submodel element created successfully", True,201                                    
                                     else:
                                         return "The new element cannot be created at this place",False,400
@@ -480,7 +714,44 @@ class AAS_Database_Server(object):
             self.pyAAS.serviceLogger.info("Error at PutSubmodelElementByPath DB" + str(E))
             return  "Internal Server Error", False,500        
 
-    def GetSubmodelElementByPath_History(self,_shellId,_submodelIdentifier,idShortPath):
+    def PatchSubmodelElementByPath(self,data):
+        try:
+            _shellId = data["_shellId"]
+            _submodelIdentifier = data["submodelIdentifier"]
+            referencePresent = False
+            if self.aasHashDict.__isKeyPresent__(_shellId):
+                _id = (self.aasHashDict.__getHashEntry__(_shellId).__getId__())
+                _shell = (self.aasShellHashDict.__getHashEntry__(_id)).getElement()
+                for _reference in _shell["submodels"]:
+                    if _reference["keys"][0]["value"] == _submodelIdentifier:
+                        referencePresent = True
+                        break
+                if (referencePresent):
+                    return self.PatchSubmodelElementByPath_SRI(data)
+                else:
+                    return "The Asset administration shell does not refer to the submodel", False, 404
+            else:
+                return "The Asset administration shell not found", False, 404
+        except Exception as E:
+            self.pyAAS.serviceLogger.info("Error at PatchSubmodelElementByPath DB" + str(E))
+            return  "Internal Server Error", False,500
+
+    def PutSubmodelElementValueByPath(self,data):
+        try:
+            _shellId = data["_shellId"]
+            _submodelIdentifier = data["submodelIdentifier"]
+            if not self.aasHashDict.__isKeyPresent__(_shellId):
+                return "The Asset administration shell not found", False, 404
+            _id = (self.aasHashDict.__getHashEntry__(_shellId).__getId__())
+            _shell = (self.aasShellHashDict.__getHashEntry__(_id)).getElement()
+            if _submodelIdentifier not in [_reference["keys"][0]["value"] for _reference in _shell["submodels"]]:
+                return "The Asset administration shell does not refer to the submodel", False, 404
+            return self.PutSubmodelElementValueByPath_SRI(data)
+        except Exception as E:
+            self.pyAAS.serviceLogger.info("Error at PutSubmodelElementValueByPath DB" + str(E))
+            return  "Internal Server Error", False,500
+
+    def GetSubmodelElementByPath_History(self,_shellId,_submodelIdentifier,idShortPath,query=None):
         try:
             referencePresent = False
             if self.aasHashDict.__isKeyPresent__(_shellId):
@@ -495,23 +766,10 @@ class AAS_Database_Server(object):
                         _idSHortPath = _submodelIdentifier +"." +idShortPath
                         if self.aasHashDict.__isKeyPresent__(_idSHortPath):
                             _sid = (self.aasHashDict.__getHashEntry__(_idSHortPath).__getId__())
-                            historyObjects = (self.submodelHashDict.__getHashEntry__(_sid)).getHistory()
-                            historyData = {"values": [], "label" :[]}
-                            labels = []
-                            labels_dif = []
-                            if len(historyObjects) > 0:
-                                for hObject in historyObjects[-25:]:
-                                    labels.append(hObject.timestamp)
-                                    historyData["values"].append((hObject.aasElementValue))
-                                historyData["label"].append(0)
-                                labels_dif.append(0)
-                            for i in range(1,len(labels)):
-                                labels_dif.append((labels[i]-labels[i-1]).seconds)
-                                
-                            for i in range(0,len(labels_dif)-1):
-                                historyData["label"].append((labels_dif[i]+labels_dif[i+1]))                                
-                            
-                            print(historyData)
+                            history = (self.submodelHashDict.__getHashEntry__(_sid)).getHistory()
+                            historyData = self.pyAAS.historyStore.getHistoryData(_idSHortPath,history,query)
+                            if historyData is None:
+                                return "The history of the submodel element is not numeric",False,400
                             return historyData,True,200
                         else:
                             return "The submodel element not found",False,404   
@@ -566,6 +824,7 @@ class AAS_Database_Server(object):
                 if (submodelElem["modelType"] != "File"):
                     return "A file is not associated at the specified path", False,404
                 else:
+                    submodelElem = submodelElem.thaw()
                     filePath = (submodelElem["value"]).split("/")[:-1]
                     _newPathValue = "/".join(filePath) + "/" + data["elemData"]
                     submodelElem["value"] = _newPathValue
@@ -601,53 +860,29 @@ class AAS_Database_Server(object):
             self.pyAAS.serviceLogger.info("Error at GetAllConceptDescriptions DB" + str(E))
             return  "Internal Server Error", False,500
 
+    def getConceptDescriptionsByIndex(self,cdIndex,key):
+        _conceptDescriptions = []
+        for _id in cdIndex.__getEntries__(key):
+            _conceptDescriptions.append(self.cdHashDict.__getHashEntry__(_id).getElement())
+        return _conceptDescriptions
+
     def  GetAllConceptDescriptionsByIdShort(self,idShort):
         try:
-            _conceptDescriptions = []
-            for _id in self.cdHashDict._getKeys():
-                _cD = self.cdHashDict.__getHashEntry__(_id).getElement()
-                try:
-                    if idShort == _cD["idShort"]:
-                        _conceptDescriptions.append(_cD)
-                except:
-                    pass
-            return _conceptDescriptions,True,200
+            return self.getConceptDescriptionsByIndex(self.cdIdShortIndex,idShort),True,200
         except Exception as E:
             self.pyAAS.serviceLogger.info("Error at GetAllConceptDescriptionsByIdShort DB" + str(E))
             return  "Internal Server Error", False,500
 
     def  GetAllConceptDescriptionsByIsCaseOf(self,isCaseValue):
         try:
-            _conceptDescriptions = []
-            for _id in self.cdHashDict._getKeys():
-                _cD = self.cdHashDict.__getHashEntry__(_id).getElement()
-                try:    
-                    keys = []
-                    for _ref in _cD["isCaseOf"]:
-                        keys.extend([key["value"] for key in _ref["keys"]])
-                    if isCaseValue in keys:
-                        _conceptDescriptions.append(_cD)
-                except:
-                    pass
-            return _conceptDescriptions,True,200
+            return self.getConceptDescriptionsByIndex(self.cdIsCaseOfIndex,isCaseValue),True,200
         except Exception as E:
             self.pyAAS.serviceLogger.info("Error at GetAllConceptDescriptionsByIsCaseOf DB" + str(E))
             return  "Internal Server Error", False,500
 
     def  GetAllConceptDescriptionsByDataSpecificationReference(self,dataSpecificationRef):
         try:
-            _conceptDescriptions = []
-            for _id in self.cdHashDict._getKeys():
-                _cD = self.cdHashDict.__getHashEntry__(_id).getElement()
-                try:
-                    keys = []
-                    for _ref in _cD["dataSpecifications"]:
-                        keys.extend([key["value"] for key in _ref["keys"]])
-                    if dataSpecificationRef in keys:
-                        _conceptDescriptions.append(_cD)
-                except:
-                    pass
-            return _conceptDescriptions,True,200
+            return self.getConceptDescriptionsByIndex(self.cdDataSpecificationIndex,dataSpecificationRef),True,200
         except Exception as E:
             self.pyAAS.serviceLogger.info("Error at GetAllConceptDescriptionsByDataSpecificationReference DB" + str(E))
             return  "Internal Server Error", False,500
@@ -658,7 +893,7 @@ class AAS_Database_Server(object):
             if self.aasHashDict.__isKeyPresent__(_newId):
                 return "The conception already already exist please try put",False,400
             else:
-                cdParse = ConceptionDescriptionParser(self.aasHashDict,self.cdHashDict)
+                cdParse = ConceptionDescriptionParser(self.aasHashDict,self.cdHashDict,self.cdIdShortIndex,self.cdIsCaseOfIndex,self.cdDataSpecificationIndex)
                 cdParse.parse(data["_cd"])
             return "Concept Description created successfully",True,201
         except Exception as E:
@@ -680,9 +915,8 @@ class AAS_Database_Server(object):
     def DeleteConceptDescriptionById(self,_conceptDescriptionId):
         try:
             if self.aasHashDict.__isKeyPresent__(_conceptDescriptionId):
-                _id = (self.aasHashDict.__getHashEntry__(_conceptDescriptionId).__getId__())
-                self.cdHashDict.__deleteHashEntry__(_id)
-                self.aasHashDict.__deleteHashEntry__(_conceptDescriptionId)
+                cdParse = ConceptionDescriptionParser(self.aasHashDict,self.cdHashDict,self.cdIdShortIndex,self.cdIsCaseOfIndex,self.cdDataSpecificationIndex)
+                cdParse.unregisterElement(_conceptDescriptionId)
                 return "Concept Description deleted successfully", True,204
             else:
                 return "The Concept Description not found",False,404
@@ -784,12 +1018,10 @@ class AAS_Database_Server(object):
             else:
                 _submodelRef = data["_Reference"]
                 _id = self.aasHashDict.__getHashEntry__(_shellId).__getId__()
-                _aasShell = self.aasShellHashDict.__getHashEntry__(_id).getElement()
-                if "submodels" in list(_aasShell.keys()):
-                    _aasShell["submodels"].append(_submodelRef)
-                else:
-                    _aasShell["submodels"] = [_submodelRef]
-                self.aasShellHashDict.__getHashEntry__(_id).setElement(_aasShell)
+                _aasShellObject = self.aasShellHashDict.__getHashEntry__(_id)
+                _submodelRefs = list(_aasShellObject.getElement().get("submodels",[]))
+                _submodelRefs.append(_submodelRef)
+                _aasShellObject.updateElement("submodels",_submodelRefs)
                 return "Submodel reference created successfully", True,201
         except Exception as E:
             self.pyAAS.serviceLogger.info("Error at PostSubmodelReference DB" + str(E))
@@ -802,8 +1034,9 @@ class AAS_Database_Server(object):
                 _aasShell = self.aasShellHashDict.__getHashEntry__(_id).getElement()
                 for index, submodelRef in  enumerate(_aasShell["submodels"]):
                     if submodelRef["keys"][0]["value"] == data["submodelIdentifier"]:
-                        del _aasShell["submodels"][index]
-                        self.aasShellHashDict.__getHashEntry__(_id).setElement(_aasShell)
+                        _submodelRefs = list(_aasShell["submodels"])
+                        del _submodelRefs[index]
+                        self.aasShellHashDict.__getHashEntry__(_id).updateElement("submodels",_submodelRefs)
                         return "Submodel reference deleted successfully", True,204
                 return "The submodel reference not found",False,404
             else:
@@ -828,9 +1061,7 @@ class AAS_Database_Server(object):
         try:
             if self.aasHashDict.__isKeyPresent__(data["_shellId"]):
                 _id = self.aasHashDict.__getHashEntry__(data["_shellId"]).__getId__()
-                _aasShell = self.aasShellHashDict.__getHashEntry__(_id).getElement()
-                _aasShell["assetInformation"] = data["_assetInformation"]
-                self.aasShellHashDict.__getHashEntry__(_id).aasELement  = _aasShell
+                self.aasShellHashDict.__getHashEntry__(_id).updateElement("assetInformation",data["_assetInformation"])
                 return "Asset Information updated successfully",True,204
             else:
                 return "Asset Administration shell not found",False,404
@@ -915,7 +1146,7 @@ class AAS_Database_Server(object):
 
     def DeleteAssetAdministrationShellById(self,_shellId):
         try:
-            if _shellId not in self.aasHashDict._getKeys():
+            if not self.aasHashDict.__isKeyPresent__(_shellId):
                 return "The Asset administration shell not found", False, 404
             else:
                 _id = (self.aasHashDict.__getHashEntry__(_shellId).__getId__())
@@ -928,7 +1159,7 @@ class AAS_Database_Server(object):
 
     def DeleteAssetAdministrationShellByIdandSubmodels(self,_shellId):
         try:
-            if _shellId not in self.aasHashDict._getKeys():
+            if not self.aasHashDict.__isKeyPresent__(_shellId):
                 return "The Asset administration shell not found", False, 404
             else:
                 _id = (self.aasHashDict.__getHashEntry__(_shellId).__getId__())
@@ -963,18 +1194,11 @@ class AAS_Database_Server(object):
                     _submodelIdentifier = _reference["keys"][0]["value"]
                     if self.aasHashDict.__isKeyPresent__(_submodelIdentifier):
                         _id = (self.aasHashDict.__getHashEntry__(_submodelIdentifier).__getId__())
-                        _submodel = (self.submodelHashDict.__getHashEntry__(_id)).getElement() 
-                        i = 0
-                        if "submodelElements" in _submodel.keys():            
-                            for submodelElem in _submodel["submodelElements"]:
-                                _submodelid = (self.submodelHashDict.__getHashEntry__(submodelElem)).getIdShortPath()
-                                data, status,statuscode = self.getSubmodelElement(_submodelid)
-                                if (status):
-                                    _submodel["submodelElements"][i] = data
-                                    i = i + 1
-                                else:
-                                    return data, status,statuscode
-                            submodels.append(_submodel)
+                        entry,status,statuscode = self.assembleSubmodel(_id)
+                        if (status):
+                            submodels.append(self.submodelFromEntry(entry))
+                        else:
+                            return entry,status,statuscode
                     else:
                         return "The submodel is not found", False,404             
                 return submodels,True,200
@@ -986,7 +1210,7 @@ class AAS_Database_Server(object):
 
 #additional end
 
-    def GetSubmodel(self,_shellId,_submodelIdentifier):
+    def GetSubmodel(self,_shellId,_submodelIdentifier,serialized=False):
         try:
             referencePresent = False
             if self.aasHashDict.__isKeyPresent__(_shellId):
@@ -999,18 +1223,11 @@ class AAS_Database_Server(object):
                 if (referencePresent):
                     if self.aasHashDict.__isKeyPresent__(_submodelIdentifier):
                         _id = (self.aasHashDict.__getHashEntry__(_submodelIdentifier).__getId__())
-                        _submodel = (self.submodelHashDict.__getHashEntry__(_id)).getElement() 
-                        i = 0
-                        if "submodelElements" in _submodel.keys():                   
-                            for submodelElem in _submodel["submodelElements"]:
-                                _submodelid = (self.submodelHashDict.__getHashEntry__(submodelElem)).getIdShortPath()
-                                data, status,statuscode = self.getSubmodelElement(_submodelid)
-                                if (status):
-                                    _submodel["submodelElements"][i] = data
-                                    i = i + 1
-                                else:
-                                    return data, status,statuscode
-                        return _submodel, True,200   
+                        entry,status,statuscode = self.assembleSubmodel(_id)
+                        if (status):
+                            return self.submodelFromEntry(entry,serialized), True,200
+                        else:
+                            return entry,status,statuscode
                     else:
                         return "The submodel is not found", True,404             
                 else:
@@ -1033,13 +1250,7 @@ class AAS_Database_Server(object):
                     if _reference["keys"][0]["value"] == _submodelIdentifier:
                         referencePresent = True
                 if (referencePresent):
-                    data1,status1,statuscode1 =  self.DeleteSubmodelById(_submodelIdentifier)
-                    if status1:
-                        aasSmParser = AASSubmodelParser(self.aasHashDict,self.submodelHashDict)
-                        aasSmParser.parse(data["submodelData"])
-                        return "Submodel updated successfully", True,204
-                    else:
-                        return data1,status1,statuscode1
+                    return self.replaceSubmodel(_submodelIdentifier,data["submodelData"])
                 else:
                     return "The Asset administration shell does not refer to the submodel", False, 404
             else:
@@ -1047,24 +1258,65 @@ class AAS_Database_Server(object):
         except Exception as E:
             self.pyAAS.serviceLogger.info("Error at GetSubmodel DB" + str(E))
             return  "Internal Server Error", False,500
-        
-    def getSubmodel(self,_submodelid):
+
+    def PatchSubmodel(self,data):
+        try:
+            _shellId = data["_shellId"]
+            _submodelIdentifier = data["submodelIdentifier"]
+            referencePresent = False
+            if self.aasHashDict.__isKeyPresent__(_shellId):
+                _id = (self.aasHashDict.__getHashEntry__(_shellId).__getId__())
+                _shell = (self.aasShellHashDict.__getHashEntry__(_id)).getElement()
+                for _reference in _shell["submodels"]:
+                    if _reference["keys"][0]["value"] == _submodelIdentifier:
+                        referencePresent = True
+                        break
+                if (referencePresent):
+                    return self.PatchSubmodel_SRI(data)
+                else:
+                    return "The Asset administration shell does not refer to the submodel", False, 404
+            else:
+                return "The Asset administration shell not found", False, 404
+        except Exception as E:
+            self.pyAAS.serviceLogger.info("Error at PatchSubmodel DB" + str(E))
+            return  "Internal Server Error", False,500
+
+    def assembleSubmodel(self,_id):
+        _submodelObject = self.submodelHashDict.__getHashEntry__(_id)
+        _version = _submodelObject.version
+        entry = self.submodelCache.getEntry(_id,_version)
+        if entry is None:
+            _submodel = _submodelObject.getElement().thaw()
+            if "submodelElements" in _submodel.keys():
+                _submodelElements = []
+                for submodelElem in _submodel["submodelElements"]:
+                    _submodelid = (self.submodelHashDict.__getHashEntry__(submodelElem)).getIdShortPath()
+                    data, status,statuscode = self.getSubmodelElement(_submodelid)
+                    if (status):
+                        _submodelElements.append(data)
+                    else:
+                        return data, status,statuscode
+                _submodel["submodelElements"] = _submodelElements
+            entry = self.submodelCache.putEntry(_id,_version,_submodel)
+        return entry, True,200
+
+    def submodelFromEntry(self,entry,serialized=False):
+        if serialized:
+            return entry.serialized
+        _submodel = entry.element.thaw()
+        if "submodelElements" in _submodel.keys():
+            _submodel["submodelElements"] = _submodel["submodelElements"].thaw()
+        return _submodel
+
+    def getSubmodel(self,_submodelid,serialized=False):
         try:
             if self.aasHashDict.__isKeyPresent__(_submodelid):
-                _submodel = dict()
                 _id = (self.aasHashDict.__getHashEntry__(_submodelid).__getId__())
-                _submodel = (self.submodelHashDict.__getHashEntry__(_id)).getElement()
-                i = 0
-                if "submodelElements" in _submodel.keys():
-                    for submodelElem in _submodel["submodelElements"]:
-                        _submodelid = (self.submodelHashDict.__getHashEntry__(submodelElem)).getIdShortPath()
-                        data, status,statuscode = self.getSubmodelElement(_submodelid)
-                        if (status):
-                            _submodel["submodelElements"][i] = data
-                        else:
-                            return data, status,statuscode
-                        i = i + 1
-                return _submodel, True,200
+                entry,status,statuscode = self.assembleSubmodel(_id)
+                if (status):
+                    return self.submodelFromEntry(entry,serialized), True,200
+                else:
+                    return entry,status,statuscode
             else:
                 return "The submodel not found", False, 404
         except Exception as E:
@@ -1110,40 +1362,51 @@ class AAS_Database_Server(object):
     def GetAllSubmodelsBySemanticId(self,semanticId):
         try:
             _submodels = []
-            for _id in self.submodelHashDict._getKeys():
+            for _id in self.semanticIdIndex.__getEntries__(semanticId):
                 hashEntry = self.submodelHashDict.__getHashEntry__(_id)
                 if hashEntry.modelType == "Submodel":
-                    _submodelTemp = hashEntry.getElement()
-                    _keys = []
-                    for key in _submodelTemp["semanticId"]["keys"]:
-                        _keys.append(key["value"])
-                    if semanticId in _keys: 
-                        _submodelId = self.aasHashDict.__getkey__(_id)
-                        submodel,status,statuscode = self.getSubmodel(_submodelId)
-                        if status:
-                            _submodels.append(submodel)
-                        else:
-                            return submodel,status,statuscode
+                    _submodelId = self.aasHashDict.__getkey__(_id)
+                    submodel,status,statuscode = self.getSubmodel(_submodelId)
+                    if status:
+                        _submodels.append(submodel)
+                    else:
+                        return submodel,status,statuscode
             return _submodels, True,200
         except Exception as E:
             self.pyAAS.serviceLogger.info("Error at GetAllSubmodelsBySemanticId DB" + str(E))
             return  "Internal Server Error", False,500
 
+    def GetAllSubmodelElementsBySemanticId(self,semanticId):
+        try:
+            _submodelElements = []
+            for _id in self.semanticIdIndex.__getEntries__(semanticId):
+                hashEntry = self.submodelHashDict.__getHashEntry__(_id)
+                if hashEntry.modelType != "Submodel":
+                    data,status,statuscode = self.getSubmodelElement(hashEntry.getIdShortPath())
+                    if status:
+                        _submodelElements.append(data)
+                    else:
+                        return data,status,statuscode
+            return _submodelElements, True,200
+        except Exception as E:
+            self.pyAAS.serviceLogger.info("Error at GetAllSubmodelElementsBySemanticId DB" + str(E))
+            return  "Internal Server Error", False,500
+
     def PostSubmodel(self,submodelData):
         try:
             if self.aasHashDict.__isKeyPresent__(submodelData["_submodel"]["id"]):
                 return "The submodel is already present please try put",False,400
             else:
-                aasSmParser = AASSubmodelParser(self.aasHashDict,self.submodelHashDict)
+                aasSmParser = AASSubmodelParser(self.aasHashDict,self.submodelHashDict,self.semanticIdIndex,self.idShortPathTrie)
                 aasSmParser.parse(submodelData["_submodel"])
             return "Submodel created successfully",True,201
         except Exception as E:
             self.pyAAS.serviceLogger.info("Error at PostSubmodel DB" + str(E))
             return  "Internal Server Error", False,500     
 
-    def GetSubmodelById(self,submodelIdentifier):
+    def GetSubmodelById(self,submodelIdentifier,serialized=False):
         try:
-            submodel,status,statuscode = self.getSubmodel(submodelIdentifier)
+            submodel,status,statuscode = self.getSubmodel(submodelIdentifier,serialized)
             if status:
                 return submodel,status,statuscode
             else:   
@@ -1154,30 +1417,171 @@ class AAS_Database_Server(object):
 
     def PutSubmodelById(self,data):
         try:
-            msg,status,statuscode = self.DeleteSubmodelById(data["submodelIdentifier"])
+            msg,status,statuscode = self.replaceSubmodel(data["submodelIdentifier"],data["_submodel"])
             if (status):
-                msg1,status1,statuscode1 = self.PostSubmodel(data)
-                if status1:
-                    return  "Submodel updated successfully", True,201
-                else:
-                    return msg1,status1,statuscode1
+                return  "Submodel updated successfully", True,201
             else:
                 return msg,status,statuscode
         except Exception as E:
             self.pyAAS.serviceLogger.info("Error at PutSubmodelById DB" + str(E))
             return  "Internal Server Error", False,500
 
+    def mergeSubmodel(self,_submodel):
+        """
+            Applies the structural diff of the stored submodel and the new document. New elements
+            are parsed, changed ones updated in place and the ones missing from the document
+            deleted with their subtree. The unchanged elements keep their uuid, version, history
+            and subscribers.
+        """
+        _submodelId = _submodel["id"]
+        storedIds = [_key for _key,_uuid in self.idShortPathTrie.__getSubtree__(_submodelId)]
+        aasSmParser = AASSubmodelParser(self.aasHashDict,self.submodelHashDict,self.semanticIdIndex,self.idShortPathTrie)
+        aasSmParser.parse(_submodel,True)
+        for _key in storedIds:
+            if _key not in aasSmParser.parsedIds:
+                self.deleteElemTree(_key)
+
+    def replaceSubmodel(self,_submodelid,_submodel):
+        """
+            A submodel keeping its identifier is merged, otherwise it is deleted and the new one parsed.
+        """
+        if not self.aasHashDict.__isKeyPresent__(_submodelid):
+            return "Submodel not found", False,404
+        if _submodel["id"] == _submodelid:
+            self.mergeSubmodel(_submodel)
+        elif self.aasHashDict.__isKeyPresent__(_submodel["id"]):
+            return "The submodel is already present please try put",False,400
+        else:
+            self.deleteElemTree(_submodelid)
+            aasSmParser = AASSubmodelParser(self.aasHashDict,self.submodelHashDict,self.semanticIdIndex,self.idShortPathTrie)
+            aasSmParser.parse(_submodel)
+        return "Submodel updated successfully", True,204
+
+    def mergePatch(self,_target,_patch):
+        """
+            RFC 7386, members set to null are removed and arrays are replaced. The members the
+            patch does not touch stay the stored frozen instances.
+        """
+        if not isinstance(_patch,dict):
+            return _patch
+        _target = dict(_target) if isinstance(_target,dict) else dict()
+        for key,value in _patch.items():
+            if value is None:
+                _target.pop(key,None)
+            else:
+                _target[key] = self.mergePatch(_target.get(key),value)
+        return _target
+
+    def isValidFragment(self,aasValid,_element):
+        """
+            Validates the element without its child elements, they are validated where the patch touches them.
+        """
+        _fragment = dict(_element)
+        _fragment.pop(self.childMembers.get(_fragment["modelType"]),None)
+        if _fragment["modelType"] == "Submodel":
+            return aasValid.valitdateSubmodel(_fragment)
+        return aasValid.validateSubmodelElement(_fragment)
+
+    def resolvePatch(self,aasValid,_idShortPath,_patch,removedIds,replacedIds):
+        """
+            Returns the patched element of the idShortPath without modifying the stored one, or
+            the error message. The child elements of a submodel or collection are patched by
+            idShort when the patch gives an object keyed by idShort, a null removes a child and
+            an unknown idShort adds it. The children of a patched element are ("patch", element)
+            entries, new and replaced ones ("parse", element) entries and the others their uuids.
+        """
+        if not isinstance(_patch,dict):
+            return None,"The merge patch of an element has to be an object"
+        storedElem = (self.submodelHashDict.__getHashEntry__(self.aasHashDict.__getHashEntry__(_idShortPath).__getId__())).getElement()
+        for member in ("idShort","modelType","id"):
+            if member in _patch and _patch[member] != storedElem.get(member):
+                return None,"The " + member + " of an element can not be patched"
+        childMember = self.childMembers.get(storedElem["modelType"])
+        _element = self.mergePatch(storedElem,{key:value for key,value in _patch.items() if key != childMember})
+        if childMember is not None and childMember in _patch:
+            childPatch = _patch[childMember]
+            storedChildren = list(storedElem.get(childMember,[]))
+            childIds = {(self.submodelHashDict.__getHashEntry__(_uuid)).idShort:_uuid for _uuid in storedChildren}
+            if childPatch is None or isinstance(childPatch,list):
+                children = []
+                for _child in (childPatch or []):
+                    if not isinstance(_child,dict) or not aasValid.validateSubmodelElement(_child):
+                        return None,"The syntax of the passed Submodel element is not valid"
+                    children.append(("parse",_child))
+                    if _child["idShort"] in childIds:
+                        replacedIds.append(_idShortPath + "." + _child["idShort"])
+                listed = set([_child["idShort"] for _child in (childPatch or [])])
+                removedIds.extend([_idShortPath + "." + idShort for idShort in childIds if idShort not in listed])
+            elif isinstance(childPatch,dict):
+                children = storedChildren
+                for idShort,_childPatch in childPatch.items():
+                    _childPath = _idShortPath + "." + idShort
+                    if idShort in childIds:
+                        index = children.index(childIds[idShort])
+                        if _childPatch is None:
+                            del children[index]
+                            removedIds.append(_childPath)
+                        else:
+                            _child,msg = self.resolvePatch(aasValid,_childPath,_childPatch,removedIds,replacedIds)
+                            if _child is None:
+                                return None,msg
+                            children[index] = ("patch",_child)
+                    elif _childPatch is not None:
+                        _child = dict(_childPatch) if isinstance(_childPatch,dict) else None
+                        if _child is None or _child.setdefault("idShort",idShort) != idShort or not aasValid.validateSubmodelElement(_child):
+                            return None,"The syntax of the passed Submodel element " + idShort + " is not valid"
+                        children.append(("parse",_child))
+            else:
+                return None,"The " + childMember + " of a merge patch have to be an object keyed by idShort, a list or null"
+            _element[childMember] = children
+        if not self.isValidFragment(aasValid,_element):
+            return None,"The patched element " + _idShortPath + " is not valid"
+        return _element,""
+
+    def applyPatch(self,aasSmParser,_idShortPath,_element):
+        """
+            Stores a patched element from resolvePatch, the unchanged children keep their uuid.
+        """
+        childMember = self.childMembers.get(_element["modelType"])
+        childIds = None
+        if childMember is not None and isinstance(_element.get(childMember),list) and not isinstance(_element[childMember],FrozenList):
+            childIds = []
+            for _child in _element[childMember]:
+                if isinstance(_child,str):
+                    childIds.append(_child)
+                elif _child[0] == "patch":
+                    childIds.append(self.applyPatch(aasSmParser,_idShortPath + "." + _child[1]["idShort"],_child[1]))
+                elif (_child[1]["modelType"] == "SubmodelElementCollection"):
+                    childIds.append(aasSmParser.parseSubmodelCollection(_child[1],_idShortPath,True))
+                else:
+                    childIds.append(aasSmParser.parseDataElement(_child[1],_idShortPath,True))
+            _element[childMember] = childIds
+        _uuid = aasSmParser.updatePropertyElement(_element,_idShortPath)
+        if childIds is not None:
+            aasSmParser.adoptChildElements(_uuid,childIds)
+        return _uuid
+
+    def patchElement(self,_idShortPath,_patch):
+        """
+            Applies the merge patch in place, nothing is modified if a touched fragment is not valid.
+        """
+        removedIds,replacedIds = [],[]
+        _element,msg = self.resolvePatch(AASMetaModelValidator(self.pyAAS),_idShortPath,_patch,removedIds,replacedIds)
+        if _element is None:
+            return msg,False,400
+        storedIds = []
+        for _key in replacedIds:
+            storedIds.extend([_storedKey for _storedKey,_uuid in self.idShortPathTrie.__getSubtree__(_key)])
+        aasSmParser = AASSubmodelParser(self.aasHashDict,self.submodelHashDict,self.semanticIdIndex,self.idShortPathTrie)
+        self.applyPatch(aasSmParser,_idShortPath,_element)
+        for _key in removedIds + [_key for _key in storedIds if _key not in aasSmParser.parsedIds]:
+            self.deleteElemTree(_key)
+        return "Submodel element patched successfully" if _element["modelType"] != "Submodel" else "Submodel patched successfully", True,204
+
     def DeleteSubmodelById(self,_submodelid):
         try:
             if self.aasHashDict.__isKeyPresent__(_submodelid):
-                _id = (self.aasHashDict.__getHashEntry__(_submodelid).__getId__())
-                _submodel = (self.submodelHashDict.__getHashEntry__(_id)).getElement()
-                if "submodelElements" in _submodel.keys():
-                    for uuid in _submodel["submodelElements"]:
-                        _key = self.aasHashDict.__getkey__(uuid)
-                        self.deleteSubmodelElem(_key)
-                self.submodelHashDict.__deleteHashEntry__(_id)
-                self.aasHashDict.__deleteHashEntry__(_submodelid)
+                self.deleteElemTree(_submodelid)
                 return "Submodel deleted Successfully", True,204
             else:
                 return "Submodel not found", False,404
@@ -1185,22 +1589,15 @@ class AAS_Database_Server(object):
             self.pyAAS.serviceLogger.info("Error at DeleteSubmodelById DB" + str(E))
             return  "Internal Server Error", False,500    
 
-    def GetSubmodel_SRI(self,_submodelIdentifier):
+    def GetSubmodel_SRI(self,_submodelIdentifier,serialized=False):
         try:
             if self.aasHashDict.__isKeyPresent__(_submodelIdentifier):
                 _id = (self.aasHashDict.__getHashEntry__(_submodelIdentifier).__getId__())
-                _submodel = (self.submodelHashDict.__getHashEntry__(_id)).getElement() 
-                i = 0
-                if "submodelElements" in _submodel.keys():                   
-                    for submodelElem in _submodel["submodelElements"]:
-                        _submodelid = (self.submodelHashDict.__getHashEntry__(submodelElem)).getIdShortPath()
-                        data, status,statuscode = self.getSubmodelElement(_submodelid)
-                        if (status):
-                            _submodel["submodelElements"][i] = data
-                            i = i + 1
-                        else:
-                            return data, status,statuscode
-                return _submodel, True,200   
+                entry,status,statuscode = self.assembleSubmodel(_id)
+                if (status):
+                    return self.submodelFromEntry(entry,serialized), True,200
+                else:
+                    return entry,status,statuscode
             else:
                         return "The submodel is not found", True,404             
         except Exception as E:
@@ -1209,17 +1606,21 @@ class AAS_Database_Server(object):
 
     def PutSubmodel_SRI(self,data):
         try:
-            data1,status1,statuscode1 =  self.DeleteSubmodelById(data["submodelIdentifier"])
-            if status1:
-                aasSmParser = AASSubmodelParser(self.aasHashDict,self.submodelHashDict)
-                aasSmParser.parse(data["_submodel"])
-                return "Submodel updated successfully", True,204
-            else:
-                return data1,status1,statuscode1 
+            return self.replaceSubmodel(data["submodelIdentifier"],data["_submodel"])
         except Exception as E:
             self.pyAAS.serviceLogger.info("Error at PutSubmodel_SRI DB" + str(E))
             return  "Internal Server Error", False,500
 
+    def PatchSubmodel_SRI(self,data):
+        try:
+            if self.aasHashDict.__isKeyPresent__(data["submodelIdentifier"]):
+                return self.patchElement(data["submodelIdentifier"],data["patch"])
+            else:
+                return "The submodel is not found", False,404
+        except Exception as E:
+            self.pyAAS.serviceLogger.info("Error at PatchSubmodel_SRI DB" + str(E))
+            return  "Internal Server Error", False,500
+
     def GetAllSubmodelElements_SRI(self,data):
         try:
             if self.aasHashDict.__isKeyPresent__(data["submodelIdentifier"]):
@@ -1252,17 +1653,14 @@ class AAS_Database_Server(object):
                 if self.aasHashDict.__isKeyPresent__(idShortPath):
                     return "Submodel element is already present please try put",False,400
                 else:
-                    aasSmParser = AASSubmodelParser(self.aasHashDict,self.submodelHashDict)
+                    aasSmParser = AASSubmodelParser(self.aasHashDict,self.submodelHashDict,self.semanticIdIndex,self.idShortPathTrie)
                     _newuuid = ""
                     if (_elemData["modelType"] == "SubmodelElementCollection"):
                         _newuuid = aasSmParser.parseSubmodelCollection(_elemData, _submodelIdentifier)
                     else:
                         _newuuid = aasSmParser.parseDataElement(_elemData, _submodelIdentifier)
                     _sid = (self.aasHashDict.__getHashEntry__(_submodelIdentifier).__getId__())
-                    if "submodelElements" in list((self.submodelHashDict.__getHashEntry__(_sid)).aasELement.keys()):
-                        (self.submodelHashDict.__getHashEntry__(_sid)).aasELement["submodelElements"].append(_newuuid)
-                    else:
-                        (self.submodelHashDict.__getHashEntry__(_sid)).aasELement["submodelElements"] = [_newuuid]
+                    self.appendChildElem(_sid,"submodelElements",_newuuid)
                     return "Submodel Element is created Successfully",True,201
             else:
                 return "The submodel is not found", True,404             
@@ -1299,15 +1697,10 @@ class AAS_Database_Server(object):
                         _submodel_id = (self.aasHashDict.__getHashEntry__(_submodelIdentifier).__getId__())
                         _submodel = (self.submodelHashDict.__getHashEntry__(_submodel_id)).getElement()
                         _sumodelElemId =  (self.aasHashDict.__getHashEntry__(_submodelIdentifier+"."+data["idShortPath"]).__getId__())
-                        _submodelElem = (self.submodelHashDict.__getHashEntry__(_sumodelElemId)).getElement()
                         if "submodelElements" in _submodel.keys():
                             if _sumodelElemId in _submodel["submodelElements"]:
-                                _submodel["submodelElements"].remove(_sumodelElemId)
-                                self.submodelHashDict.__getHashEntry__(_submodel_id).setElement(_submodel)
-                                if (_submodelElem["modelType"] == "SubmodelElementCollection"):
-                                    self.deleteCollectionElems(_submodelElem)    
-                                self.submodelHashDict.__deleteHashEntry__(_sumodelElemId)
-                                self.aasHashDict.__deleteHashEntry__(_submodelIdentifier+"."+data["idShortPath"])
+                                self.removeChildElem(_submodel_id,"submodelElements",_sumodelElemId)
+                                self.deleteElemTree(_submodelIdentifier+"."+data["idShortPath"])
                                 return "Submodel element deleted successfully", True, 204
                             else:
                                 return "THe Submodel element is not found in the submodel", False,404
@@ -1320,13 +1713,8 @@ class AAS_Database_Server(object):
                             parentElement = (self.submodelHashDict.__getHashEntry__(_pid)).getElement()
                             if (parentElement["modelType"] == "SubmodelElementCollection"):
                                 _sumodelElemId =  (self.aasHashDict.__getHashEntry__(_submodelIdentifier+"."+data["idShortPath"]).__getId__())
-                                _submodelElem = (self.submodelHashDict.__getHashEntry__(_sumodelElemId)).getElement()
-                                if (_submodelElem["modelType"] == "SubmodelElementCollection"):
-                                    self.deleteCollectionElems(_submodelElem)
-                                parentElement["value"].remove(_sumodelElemId)
-                                self.submodelHashDict.__getHashEntry__(_pid).setElement(parentElement)
-                                self.submodelHashDict.__deleteHashEntry__(_sumodelElemId)
-                                self.aasHashDict.__deleteHashEntry__(_submodelIdentifier+"."+data["idShortPath"])
+                                self.removeChildElem(_pid,"value",_sumodelElemId)
+                                self.deleteElemTree(_submodelIdentifier+"."+data["idShortPath"])
                                 return "Submodel element deleted successfully", True, 204                                    
                             else:
                                 return "The submodel element is not valid at this location", False, 400                        
@@ -1351,7 +1739,7 @@ class AAS_Database_Server(object):
                     return "The submodel element is already present please try put",False,400
                 else:
                     idShortSplit = (_idSHortPath).split(".")
-                    aasSmParser = AASSubmodelParser(self.aasHashDict,self.submodelHashDict)
+                    aasSmParser = AASSubmodelParser(self.aasHashDict,self.submodelHashDict,self.semanticIdIndex,self.idShortPathTrie)
                     _newuuid = ""
                     if len(idShortSplit) == 1:
                         if (_elemData["modelType"] == "SubmodelElementCollection"):
@@ -1359,7 +1747,7 @@ class AAS_Database_Server(object):
                         else:
                             _newuuid = aasSmParser.parseDataElement(_elemData, _submodelIdentifier)
                         _sid = (self.aasHashDict.__getHashEntry__(_submodelIdentifier).__getId__())
-                        (self.submodelHashDict.__getHashEntry__(_sid)).aasELement["submodelElements"].append(_newuuid)
+                        self.appendChildElem(_sid,"submodelElements",_newuuid)
                         return "Submodel element created successfully", True,201
                     else:
                         _parentId = _submodelIdentifier +"." +data["idShortPath"]
@@ -1372,10 +1760,7 @@ class AAS_Database_Server(object):
                                     _newuuid = aasSmParser.parseSubmodelCollection(_elemData, _parentId)
                                 else:
                                     _newuuid = aasSmParser.parseDataElement(_elemData, _parentId)
-                                if ("value" in list(parentElement.keys())):
-                                    (self.submodelHashDict.__getHashEntry__(_pid)).aasELement["value"].append(_newuuid)
-                                else:
-                                    (self.submodelHashDict.__getHashEntry__(_pid)).aasELement["value"] = [_newuuid]
+                                self.appendChildElem(_pid,"value",_newuuid)
                                 return "Submodel element created successfully", True,201                                    
                             else:
                                 return "The new element cannot be created at this place",False,400                        
@@ -1415,6 +1800,132 @@ class AAS_Database_Server(object):
             self.pyAAS.serviceLogger.info("Error at PutSubmodelElementByPath_SRI DB" + str(E))
             return  "Internal Server Error", False,500        
 
+    def PatchSubmodelElementByPath_SRI(self,data):
+        try:
+            _submodelIdentifier = data["submodelIdentifier"]
+            if self.aasHashDict.__isKeyPresent__(_submodelIdentifier):
+                if self.aasHashDict.__isKeyPresent__(_submodelIdentifier+"."+data["idShortPath"]):
+                    return self.patchElement(_submodelIdentifier+"."+data["idShortPath"],data["patch"])
+                else:
+                    return "The submodel element is not found",False,404
+            else:
+                return "The submodel is not found", False,404
+        except Exception as E:
+            self.pyAAS.serviceLogger.info("Error at PatchSubmodelElementByPath_SRI DB" + str(E))
+            return  "Internal Server Error", False,500
+
+    def PutSubmodelElementValueByPath_SRI(self,data):
+        try:
+            _submodelIdentifier = data["submodelIdentifier"]
+            if not self.aasHashDict.__isKeyPresent__(_submodelIdentifier):
+                return "The submodel is not found", False,404
+            return self.putSubmodelElemValue(_submodelIdentifier + "." + data["idShortPath"],data["value"])
+        except Exception as E:
+            self.pyAAS.serviceLogger.info("Error at PutSubmodelElementValueByPath_SRI DB" + str(E))
+            return  "Internal Server Error", False,500
+
+    def checkBatch(self,_submodelIdentifier,operations):
+        """
+            Replays the operations of a batch on the idShortPaths only, without touching the
+            stored elements. Returns the index, message and status code of the first operation
+            that cannot be applied, None if all of them can.
+        """
+        overlay = {}
+        def modelType(key):
+            _key = key
+            while _key != _submodelIdentifier:
+                if _key in overlay:
+                    if _key == key or overlay[_key] is None:
+                        return overlay[_key]
+                    return None
+                _key = _key.rsplit(".",1)[0]
+            if self.aasHashDict.__isKeyPresent__(key):
+                _uuid = self.aasHashDict.__getHashEntry__(key).__getId__()
+                return self.submodelHashDict.__getHashEntry__(_uuid).getElement()["modelType"]
+            return None
+        def drop(key):
+            for _key in [_key for _key in overlay if _key.startswith(key+".")]:
+                del overlay[_key]
+        def add(key,elem):
+            drop(key)
+            overlay[key] = elem["modelType"]
+            if elem["modelType"] == "SubmodelElementCollection":
+                for child in elem.get("value",[]):
+                    add(key+"."+child["idShort"],child)
+        def remove(key):
+            drop(key)
+            overlay[key] = None
+        for index,operation in enumerate(operations):
+            idShortPath = operation.get("idShortPath","")
+            key = _submodelIdentifier+"."+idShortPath if idShortPath != "" else _submodelIdentifier
+            if operation["method"] in ("PUT","DELETE"):
+                if modelType(key) is None:
+                    return index,"The submodel element is not found",404
+                remove(key)
+                if operation["method"] == "DELETE":
+                    continue
+                key = key.rsplit(".",1)[0]
+            elif idShortPath != "" and modelType(key) is None:
+                return index,"The parent element does not exist",400
+            if key != _submodelIdentifier and modelType(key) != "SubmodelElementCollection":
+                return index,"The new element cannot be created at this place",400
+            elemKey = key+"."+operation["element"]["idShort"]
+            if modelType(elemKey) is not None:
+                return index,"The submodel element is already present please try put",400
+            add(elemKey,operation["element"])
+        return None
+
+    def PostSubmodelElementBatch_SRI(self,data):
+        """
+            Applies a list of PUT, POST and DELETE operations on the elements of one submodel in
+            order. If an operation fails the submodel is restored and none of them takes effect.
+            Returns the status of every operation.
+        """
+        try:
+            _submodelIdentifier = data["submodelIdentifier"]
+            if not self.aasHashDict.__isKeyPresent__(_submodelIdentifier):
+                return "The submodel is not found", False,404
+            _id = self.aasHashDict.__getHashEntry__(_submodelIdentifier).__getId__()
+            failed = self.checkBatch(_submodelIdentifier,data["operations"])
+            if failed is not None:
+                index,msg,statuscode = failed
+                results = []
+                for i,operation in enumerate(data["operations"]):
+                    results.append({"method":operation["method"],"idShortPath":operation.get("idShortPath",""),
+                                    "statusCode":statuscode if i == index else 424,
+                                    "message":msg if i == index else "Not executed, another operation of the batch cannot be applied"})
+                return results,False,statuscode
+            entry,status,statuscode = self.assembleSubmodel(_id)
+            if not status:
+                return entry,status,statuscode
+            results = []
+            for operation in data["operations"]:
+                _data = {"submodelIdentifier":_submodelIdentifier,"idShortPath":operation.get("idShortPath",""),
+                         "elemData":operation.get("element")}
+                if operation["method"] == "PUT":
+                    msg,status,statuscode = self.PutSubmodelElementByPath_SRI(_data)
+                elif operation["method"] == "DELETE":
+                    msg,status,statuscode = self.DeleteSubmodelElementByPath_SRI(_data)
+                elif _data["idShortPath"] == "":
+                    msg,status,statuscode = self.PostSubmodelElement_SRI(_data)
+                else:
+                    msg,status,statuscode = self.PostSubmodelElementByPath_SRI(_data)
+                results.append({"method":operation["method"],"idShortPath":operation.get("idShortPath",""),
+                                "statusCode":statuscode,"message":msg})
+                if not status or statuscode >= 400:
+                    self.replaceSubmodel(_submodelIdentifier,entry.element)
+                    for result in results[:-1]:
+                        result["statusCode"] = 424
+                        result["message"] = "Rolled back, a later operation of the batch failed"
+                    for operation in data["operations"][len(results):]:
+                        results.append({"method":operation["method"],"idShortPath":operation.get("idShortPath",""),
+                                        "statusCode":424,"message":"Not executed, an earlier operation of the batch failed"})
+                    return results,False,statuscode
+            return results,True,200
+        except Exception as E:
+            self.pyAAS.serviceLogger.info("Error at PostSubmodelElementBatch_SRI DB" + str(E))
+            return  "Internal Server Error", False,500
+
     def GetFileByPath_SRI(self,_submodelIdentifier,idShortPath):
         try:
             if self.aasHashDict.__isKeyPresent__(_submodelIdentifier):
@@ -1443,6 +1954,7 @@ class AAS_Database_Server(object):
                 if (submodelElem["modelType"] != "File"):
                     return "A file is not associated at the specified path", False,404
                 else:
+                    submodelElem = submodelElem.thaw()
                     filePath = (submodelElem["value"]).split("/")[:-1]
                     _newPathValue = "/".join(filePath) + "/" + data["elemData"]
                     submodelElem["value"] = _newPathValue
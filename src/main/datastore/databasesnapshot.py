@@ -0,0 +1,440 @@
+'''
+Copyright (c) 2021-2022 Otto-von-Guericke-Universiat Magdeburg, Lehrstuhl Integrierte Automation
+Author: Harish Kumar Pakala
+This source code is licensed under the Apache License 2.0 (see LICENSE.txt).
+This source code may use other Open Source software components (see LICENSE.txt).
+'''
+import base64
+import bisect
+import json
+
+
+class AAS_Database_Snapshot(object):
+    '''
+        Immutable root of the environment published after every committed DataManager batch.
+        Readers pin the current root and get a consistent view without queueing behind the
+        writes. A root shares the frozen shells, concept descriptions and assembled submodel
+        cache entries of its predecessor that were not modified by the batch.
+        The read methods mirror the ones of the database server, the submodel and submodel
+        element reads take the content (normal, value, metadata) and level (deep, core)
+        serialization modifiers. The collection reads are paged with limit and cursor.
+    '''
+    childMembers = {"Submodel": "submodelElements", "SubmodelElementCollection": "value",
+                    "SubmodelElementList": "value", "Entity": "statements",
+                    "AnnotatedRelationshipElement": "annotations"}
+    valueMembers = ("value", "valueId", "min", "max", "first", "second", "globalAssetId", "specificAssetIds",
+                    "submodelElements", "statements", "annotations")
+    noValueTypes = ("Operation", "Capability", "BasicEventElement")
+
+    def __init__(self, generation, etagPrefix, shells, submodels, conceptDescriptions):
+        self.generation = generation
+        self.etagPrefix = etagPrefix
+        self.shells = shells
+        self.submodels = submodels
+        self.conceptDescriptions = conceptDescriptions
+        self.sortedKeys = dict()
+
+    def encodeCursor(self, key) -> str:
+        return base64.urlsafe_b64encode(key.encode("utf-8")).decode("ascii")
+
+    def decodeCursor(self, cursor) -> str:
+        """
+            Raises ValueError for a cursor which was not issued by encodeCursor.
+        """
+        try:
+            return base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        except Exception as E:
+            raise ValueError("The cursor is not valid")
+
+    def getPageKeys(self, kind, collection, limit, cursor) -> tuple:
+        """
+            Returns the identifiers of the page after the cursor and the cursor of the next page,
+            None on the last page. The pages follow the identifier order, which stays stable while
+            elements are added or removed between the requests. The sorted identifiers are built
+            once per root.
+        """
+        keys = self.sortedKeys.get(kind)
+        if keys is None:
+            keys = self.sortedKeys.setdefault(kind, sorted(collection.keys()))
+        start = 0
+        if cursor is not None:
+            start = bisect.bisect_right(keys, self.decodeCursor(cursor))
+        return self.slicePage(keys, start, limit)
+
+    def slicePage(self, keys, start, limit) -> tuple:
+        end = len(keys) if limit is None else min(start + limit, len(keys))
+        page = keys[start:end]
+        if end < len(keys) and len(page) != 0:
+            return page, self.encodeCursor(page[-1])
+        return page, None
+
+    def getPagingMetadata(self, nextCursor) -> dict:
+        return {} if nextCursor is None else {"cursor": nextCursor}
+
+    def getPagedResult(self, result, nextCursor) -> dict:
+        return {"paging_metadata": self.getPagingMetadata(nextCursor), "result": result}
+
+    def serializeList(self, views, nextCursor, paged) -> bytes:
+        """
+            Joins the serialized elements to a JSON list, a paged list is wrapped with its paging metadata.
+        """
+        result = b"[" + b",".join([view.rstrip(b"\n") for view in views]) + b"]"
+        if paged:
+            result = (b'{"paging_metadata":' + json.dumps(self.getPagingMetadata(nextCursor)).encode("utf-8") +
+                      b',"result":' + result + b"}")
+        return result + b"\n"
+
+    def getShellReferences(self, _shellId) -> list:
+        return [_reference["keys"][0]["value"] for _reference in self.shells[_shellId][1].get("submodels", [])]
+
+    def submodelFromEntry(self, entry, serialized=False, content="normal", level="deep") -> object:
+        if serialized:
+            return self.getView(entry, "submodel", None, content, level)
+        if content != "normal" or level != "deep":
+            return self.project(entry.element, content, level)
+        _submodel = entry.element.thaw()
+        if "submodelElements" in _submodel.keys():
+            _submodel["submodelElements"] = _submodel["submodelElements"].thaw()
+        return _submodel
+
+    def getView(self, entry, kind, idShortPath, content, level) -> bytes:
+        """
+            Serialized projection of the submodel, of its element list or of the element at the
+            idShortPath. The projections are kept by the cache entry, so they are built once
+            per version of the submodel. None if the element does not exist.
+        """
+        if kind == "submodel" and content == "normal" and level == "deep":
+            return entry.serialized
+        def buildView(_submodel):
+            if kind == "submodel":
+                return self.project(_submodel, content, level)
+            if kind == "submodelElements":
+                return [self.projectElement(submodelElem, content, level)
+                        for submodelElem in _submodel.get("submodelElements", ())]
+            submodelElem = self.findElement(entry, idShortPath)
+            if submodelElem is None:
+                return None
+            return self.projectElement(submodelElem, content, level)
+        return entry.getView((kind, idShortPath, content, level), buildView)
+
+    def project(self, element, content, level) -> object:
+        if content == "metadata":
+            return self.getMetadata(element)
+        if level == "core":
+            element = self.getCore(element)
+        if content == "value":
+            return self.getValueOnly(element)
+        return element
+
+    def projectElement(self, submodelElem, content, level) -> object:
+        """
+            The value only serialization of a submodel element is keyed by its idShort.
+        """
+        if content == "value":
+            return {submodelElem["idShort"]: self.project(submodelElem, content, level)}
+        return self.project(submodelElem, content, level)
+
+    def getMetadata(self, element) -> dict:
+        """
+            The element without its value and its child elements.
+        """
+        return dict([(key, value) for key, value in element.items() if key not in self.valueMembers])
+
+    def getCore(self, element) -> dict:
+        """
+            The element with its direct children, the children of these are left out.
+        """
+        member = self.childMembers.get(element.get("modelType"))
+        if member is None or member not in element:
+            return element
+        children = []
+        for child in element[member]:
+            childMember = self.childMembers.get(child.get("modelType"))
+            if childMember is not None and childMember in child:
+                child = dict([(key, value) for key, value in child.items() if key != childMember])
+            children.append(child)
+        core = dict(element)
+        core[member] = children
+        return core
+
+    def findElement(self, entry, idShortPath) -> dict:
+        """
+            Walks the idShortPath through the assembled submodel, None if it does not exist.
+        """
+        submodelElem = None
+        submodelElements = entry.element.get("submodelElements", ())
+        for idShort in idShortPath.split("."):
+            submodelElem = None
+            for _submodelElem in submodelElements:
+                if _submodelElem["idShort"] == idShort:
+                    submodelElem = _submodelElem
+                    break
+            if submodelElem is None:
+                return None
+            if submodelElem["modelType"] == "SubmodelElementCollection":
+                submodelElements = submodelElem.get("value", ())
+            else:
+                submodelElements = ()
+        return submodelElem
+
+    def getValueOnly(self, element) -> object:
+        """
+            Value only serialization of a submodel or submodel element. Submodels and collections
+            map the idShorts of their children to the values of the children.
+        """
+        modelType = element.get("modelType")
+        if modelType in ("Submodel", "SubmodelElementCollection"):
+            return self.getChildValues(element.get(self.childMembers[modelType], ()))
+        if modelType == "SubmodelElementList":
+            return [self.getValueOnly(child) for child in element.get("value", ())
+                    if child["modelType"] not in self.noValueTypes]
+        if modelType == "Entity":
+            value = {"statements": self.getChildValues(element.get("statements", ())),
+                     "entityType": element.get("entityType")}
+            if "globalAssetId" in element:
+                value["globalAssetId"] = element["globalAssetId"]
+            return value
+        if modelType in ("RelationshipElement", "AnnotatedRelationshipElement"):
+            value = {"first": element.get("first"), "second": element.get("second")}
+            if modelType == "AnnotatedRelationshipElement":
+                value["annotations"] = self.getChildValues(element.get("annotations", ()))
+            return value
+        if modelType == "Range":
+            return {"min": element.get("min"), "max": element.get("max")}
+        if modelType in ("File", "Blob"):
+            return {"contentType": element.get("contentType"), "value": element.get("value")}
+        if modelType == "MultiLanguageProperty" and isinstance(element.get("value"), (list, tuple)):
+            return [{langString["language"]: langString["text"]} for langString in element["value"]]
+        return element.get("value")
+
+    def getChildValues(self, children) -> dict:
+        return dict([(child["idShort"], self.getValueOnly(child)) for child in children
+                     if child["modelType"] not in self.noValueTypes])
+
+    def splitIdShortPath(self, _idShortPath) -> tuple:
+        """
+            Splits submodelIdentifier.idShortPath, submodel identifiers may contain dots themselves.
+        """
+        index = _idShortPath.find(".")
+        while index != -1:
+            if _idShortPath[:index] in self.submodels:
+                return _idShortPath[:index], _idShortPath[index + 1:]
+            index = _idShortPath.find(".", index + 1)
+        return None, None
+
+    def getETag(self, *_identifiers) -> str:
+        """
+            Builds the entity tag of a resource from the versions of the shell, submodel or
+            submodel element identifiers it is addressed by. A submodel element carries the
+            version of its submodel. None if any is unknown.
+        """
+        versions = [self.etagPrefix]
+        for _identifier in _identifiers:
+            if _identifier in self.shells:
+                versions.append(str(self.shells[_identifier][0]))
+            elif _identifier in self.submodels:
+                versions.append(str(self.submodels[_identifier].version))
+            else:
+                _submodelIdentifier, idShortPath = self.splitIdShortPath(_identifier)
+                if _submodelIdentifier is None or self.findElement(self.submodels[_submodelIdentifier], idShortPath) is None:
+                    return None
+                versions.append(str(self.submodels[_submodelIdentifier].version))
+        return "-".join(versions)
+
+    def GetAllAssetAdministrationShells(self, limit=None, cursor=None):
+        if limit is None and cursor is None:
+            return [_aasShell for version, _aasShell in self.shells.values()], True, 200
+        try:
+            page, nextCursor = self.getPageKeys("shells", self.shells, limit, cursor)
+        except ValueError as E:
+            return str(E), False, 400
+        return self.getPagedResult([self.shells[_shellId][1] for _shellId in page], nextCursor), True, 200
+
+    def GetAssetAdministrationShellById(self, _shellId):
+        if _shellId not in self.shells:
+            return "The Asset administration shell not found", False, 404
+        return self.shells[_shellId][1], True, 200
+
+    def GetAssetAdministrationShell(self, _shellId):
+        return self.GetAssetAdministrationShellById(_shellId)
+
+    def GetAllSubmodelReferences(self, _shellId):
+        if _shellId not in self.shells:
+            return "The Asset administration shell not found", False, 404
+        return list(self.shells[_shellId][1]["submodels"]), True, 200
+
+    def GetAssetInformation(self, _shellId):
+        if _shellId not in self.shells:
+            return "Asset Administration shell not found", False, 404
+        return self.shells[_shellId][1]["assetInformation"], True, 200
+
+    def GetSubmodels_shell(self, _shellId):
+        if _shellId not in self.shells:
+            return "The Asset administration shell not found", False, 404
+        submodels = []
+        for _submodelIdentifier in self.getShellReferences(_shellId):
+            if _submodelIdentifier not in self.submodels:
+                return "The submodel is not found", False, 404
+            submodels.append(self.submodelFromEntry(self.submodels[_submodelIdentifier]))
+        return submodels, True, 200
+
+    def getShellSubmodel(self, _shellId, _submodelIdentifier) -> tuple:
+        if _shellId not in self.shells:
+            return "The Asset administration shell not found", False, 404
+        if _submodelIdentifier not in self.getShellReferences(_shellId):
+            return "The Asset administration shell does not refer to the submodel", False, 404
+        if _submodelIdentifier not in self.submodels:
+            return "The submodel is not found", False, 404
+        return self.submodels[_submodelIdentifier], True, 200
+
+    def GetSubmodel(self, _shellId, _submodelIdentifier, serialized=False, content="normal", level="deep"):
+        entry, status, statuscode = self.getShellSubmodel(_shellId, _submodelIdentifier)
+        if not status:
+            return entry, status, statuscode
+        return self.submodelFromEntry(entry, serialized, content, level), True, 200
+
+    def GetSubmodelById(self, _submodelIdentifier, serialized=False, content="normal", level="deep"):
+        if _submodelIdentifier not in self.submodels:
+            return "The submodel not found", False, 404
+        return self.submodelFromEntry(self.submodels[_submodelIdentifier], serialized, content, level), True, 200
+
+    def GetSubmodel_SRI(self, _submodelIdentifier, serialized=False, content="normal", level="deep"):
+        return self.GetSubmodelById(_submodelIdentifier, serialized, content, level)
+
+    def GetAllSubmodels(self, limit=None, cursor=None, serialized=False, content="normal", level="deep"):
+        paged = limit is not None or cursor is not None
+        nextCursor = None
+        if paged:
+            try:
+                page, nextCursor = self.getPageKeys("submodels", self.submodels, limit, cursor)
+            except ValueError as E:
+                return str(E), False, 400
+            entries = [self.submodels[_submodelIdentifier] for _submodelIdentifier in page]
+        else:
+            entries = list(self.submodels.values())
+        if serialized:
+            return self.serializeList([self.getView(entry, "submodel", None, content, level) for entry in entries],
+                                      nextCursor, paged), True, 200
+        submodels = [self.submodelFromEntry(entry, False, content, level) for entry in entries]
+        if paged:
+            return self.getPagedResult(submodels, nextCursor), True, 200
+        return submodels, True, 200
+
+    def submodelElementsFromEntry(self, entry, serialized=False, content="normal", level="deep",
+                                  limit=None, cursor=None) -> tuple:
+        """
+            The submodel elements are paged in the order of the submodel, the cursor is the idShort
+            of the last element of the previous page.
+        """
+        if limit is None and cursor is None:
+            if serialized:
+                return self.getView(entry, "submodelElements", None, content, level), True, 200
+            return [self.projectElement(submodelElem, content, level)
+                    for submodelElem in entry.element.get("submodelElements", [])], True, 200
+        submodelElements = entry.element.get("submodelElements", ())
+        idShorts = [submodelElem["idShort"] for submodelElem in submodelElements]
+        start = 0
+        try:
+            if cursor is not None:
+                start = idShorts.index(self.decodeCursor(cursor)) + 1
+        except ValueError as E:
+            return "The cursor is not valid", False, 400
+        page, nextCursor = self.slicePage(idShorts, start, limit)
+        if serialized:
+            return self.serializeList([self.getView(entry, "submodelElement", idShort, content, level) for idShort in page],
+                                      nextCursor, True), True, 200
+        return self.getPagedResult([self.projectElement(submodelElements[start + i], content, level)
+                                    for i in range(len(page))], nextCursor), True, 200
+
+    def GetAllSubmodelElements(self, _shellId, _submodelIdentifier, serialized=False, content="normal", level="deep",
+                               limit=None, cursor=None):
+        entry, status, statuscode = self.getShellSubmodel(_shellId, _submodelIdentifier)
+        if not status:
+            return entry, status, statuscode
+        return self.submodelElementsFromEntry(entry, serialized, content, level, limit, cursor)
+
+    def GetAllSubmodelElements_SRI(self, _submodelIdentifier, serialized=False, content="normal", level="deep",
+                                   limit=None, cursor=None):
+        if _submodelIdentifier not in self.submodels:
+            return "The submodel is not found", False, 404
+        return self.submodelElementsFromEntry(self.submodels[_submodelIdentifier], serialized, content, level,
+                                              limit, cursor)
+
+    def submodelElementsByPrefix(self, entry, prefix, serialized=False, content="normal", level="deep") -> tuple:
+        """
+            The elements below the parent of the idShortPath prefix whose idShort starts with its
+            last idShort, "Motor.Spindle" matches Motor.Spindle and Motor.SpindleSpeed, "Motor." all
+            children of Motor.
+        """
+        idShorts = prefix.split(".")
+        parentPath = ".".join(idShorts[:-1])
+        if parentPath == "":
+            submodelElements = entry.element.get("submodelElements", ())
+        else:
+            parentElem = self.findElement(entry, parentPath)
+            submodelElements = ()
+            if parentElem is not None and parentElem["modelType"] == "SubmodelElementCollection":
+                submodelElements = parentElem.get("value", ())
+        submodelElements = [submodelElem for submodelElem in submodelElements
+                            if submodelElem["idShort"].startswith(idShorts[-1])]
+        if serialized:
+            idShortPaths = [".".join(idShorts[:-1] + [submodelElem["idShort"]]) for submodelElem in submodelElements]
+            return self.serializeList([self.getView(entry, "submodelElement", idShortPath, content, level)
+                                       for idShortPath in idShortPaths], None, False), True, 200
+        return [self.projectElement(submodelElem, content, level) for submodelElem in submodelElements], True, 200
+
+    def GetSubmodelElementsByPrefix(self, _shellId, _submodelIdentifier, prefix, serialized=False,
+                                    content="normal", level="deep"):
+        entry, status, statuscode = self.getShellSubmodel(_shellId, _submodelIdentifier)
+        if not status:
+            return entry, status, statuscode
+        return self.submodelElementsByPrefix(entry, prefix, serialized, content, level)
+
+    def GetSubmodelElementsByPrefix_SRI(self, _submodelIdentifier, prefix, serialized=False,
+                                        content="normal", level="deep"):
+        if _submodelIdentifier not in self.submodels:
+            return "The submodel is not found", False, 404
+        return self.submodelElementsByPrefix(self.submodels[_submodelIdentifier], prefix, serialized, content, level)
+
+    def submodelElementFromEntry(self, entry, idShortPath, serialized=False, content="normal", level="deep") -> tuple:
+        submodelElem = self.findElement(entry, idShortPath)
+        if submodelElem is None:
+            return "The submodel element not found", False, 404
+        if serialized:
+            return self.getView(entry, "submodelElement", idShortPath, content, level), True, 200
+        return self.projectElement(submodelElem, content, level), True, 200
+
+    def GetSubmodelElementByPath(self, _shellId, _submodelIdentifier, idShortPath, serialized=False,
+                                 content="normal", level="deep"):
+        entry, status, statuscode = self.getShellSubmodel(_shellId, _submodelIdentifier)
+        if not status:
+            return entry, status, statuscode
+        return self.submodelElementFromEntry(entry, idShortPath, serialized, content, level)
+
+    def GetSubmodelElementByPath_SRI(self, _submodelIdentifier, idShortPath, serialized=False,
+                                     content="normal", level="deep"):
+        if _submodelIdentifier not in self.submodels:
+            return "The submodel is not found", False, 404
+        return self.submodelElementFromEntry(self.submodels[_submodelIdentifier], idShortPath, serialized,
+                                             content, level)
+
+    def getSubmodelElement(self, _idShortPath):
+        _submodelIdentifier, idShortPath = self.splitIdShortPath(_idShortPath)
+        if _submodelIdentifier is None:
+            return "The submodel element not found", False, 404
+        return self.GetSubmodelElementByPath_SRI(_submodelIdentifier, idShortPath)
+
+    def GetAllConceptDescriptions(self, limit=None, cursor=None):
+        if limit is None and cursor is None:
+            return list(self.conceptDescriptions.values()), True, 200
+        try:
+            page, nextCursor = self.getPageKeys("conceptDescriptions", self.conceptDescriptions, limit, cursor)
+        except ValueError as E:
+            return str(E), False, 400
+        return self.getPagedResult([self.conceptDescriptions[_conceptDescriptionId] for _conceptDescriptionId in page],
+                                   nextCursor), True, 200
+
+    def GetConceptDescriptionById(self, _conceptDescriptionId):
+        if _conceptDescriptionId not in self.conceptDescriptions:
+            return "The conception description is not found", False, 404
+        return self.conceptDescriptions[_conceptDescriptionId], True, 200
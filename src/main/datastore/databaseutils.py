@@ -19,6 +19,9 @@ class AAS_Database_UtilServer(object):
         self.AASRegistryDatabase = self.pyaas.aasConfigurer.dataBaseFile
         self.aasxDataQueue = Queue.Queue()
         self.dataFileDataQueue = Queue.Queue()
+        self.submodelDumps = dict()
+        self.snapshotStatistics = {"snapshots": 0, "lastDuration": 0.0, "lastLockDuration": 0.0,
+                                   "lastSize": 0, "lastDirtySubmodels": 0, "lastSubmodels": 0}
     
     def start(self): 
         self.POLL = True
@@ -84,16 +87,6 @@ class AAS_Database_UtilServer(object):
             pass
         return _environment
             
-    def saveToAASXFile(self,dataC) -> bool:
-        """
-        """
-        try:
-            with open(os.path.join(self.pyaas.repository,self.pyaas.aasConfigurer.base_file), 'w', encoding='utf-8') as databaseFile1:
-                json.dump(dataC, databaseFile1, ensure_ascii=False, indent=4)
-            return True
-        except Exception as E:
-            return  False
-         
     def savetoDataBaseFile(self,dataJ) -> bool:
         try:
             with open(os.path.join(self.pyaas.dataRepository,"database.json"), 'w', encoding='utf-8') as databaseFile2:
@@ -107,13 +100,72 @@ class AAS_Database_UtilServer(object):
         """
         pass
     
+    def snapshot_submodels(self,snapshot) -> list:
+        """
+            Returns the assembled submodel cache entries of the snapshot root and counts the
+            submodels whose version changed since the previous snapshot.
+        """
+        submodelDumps = dict()
+        dirtySubmodels = 0
+        for entry in snapshot.submodels.values():
+            _id = entry.element["id"]
+            previous = self.submodelDumps.get(_id)
+            if previous is None or previous.version != entry.version:
+                dirtySubmodels = dirtySubmodels + 1
+            submodelDumps[_id] = entry
+        self.submodelDumps = submodelDumps
+        self.snapshotStatistics["lastDirtySubmodels"] = dirtySubmodels
+        self.snapshotStatistics["lastSubmodels"] = len(submodelDumps)
+        return list(submodelDumps.values())
+
+    def compact(self) -> bool:
+        """
+            Writes a snapshot of the environment to the storage engine and drops the log segments
+            it covers. Only the rotation of the log happens under the apply lock, the last root
+            built by the DataManager contains every appended batch and is the environment at
+            that point. The published root may still lag behind a batch whose callbacks have
+            not run yet. The encoding and the write run concurrently with the DataManager.
+        """
+        startTime = time.time()
+        mutationLog = self.pyaas.mutationLog
+        with mutationLog.applyLock:
+            coveredSegment = mutationLog.rotate()
+            snapshot = self.pyaas.dba.latestSnapshot
+            if snapshot is None:
+                snapshot = self.pyaas.dba.getSnapshot()
+        lockDuration = time.time() - startTime
+        shells = [_aasShell for version,_aasShell in snapshot.shells.values()]
+        conceptDescriptions = list(snapshot.conceptDescriptions.values())
+        submodels = self.snapshot_submodels(snapshot)
+        storageEngine = self.pyaas.storageEngine
+        if storageEngine.saveSnapshot(shells,submodels,conceptDescriptions,coveredSegment):
+            mutationLog.truncate(coveredSegment)
+            self.snapshotStatistics["snapshots"] = self.snapshotStatistics["snapshots"] + 1
+            self.snapshotStatistics["lastDuration"] = time.time() - startTime
+            self.snapshotStatistics["lastLockDuration"] = lockDuration
+            self.snapshotStatistics["lastSize"] = storageEngine.lastSnapshotSize
+            self.pyaas.serviceLogger.info("Snapshot written " + json.dumps(self.snapshotStatistics))
+            return True
+        return False
+
+    def getStatistics(self) -> dict:
+        """
+        """
+        return dict(self.snapshotStatistics)
+
+    def stop(self) -> None:
+        self.POLL = False
+        self.pyaas.mutationLog.stop()
+        if self.pyaas.mutationLog.needsCompaction():
+            self.compact()
+        self.pyaas.storageEngine.stop()
+
     def saveToDatabase(self) -> bool:
         try:
             if (self.pyaas.AASXupdate):
-                if len(list((self.pyaas.dataManager.outBoundProcessingDict.keys()))) == 0:
-                    environment_data = self.serialize_environment()
-                    self.saveToAASXFile(environment_data)
+                if self.pyaas.mutationLog.needsCompaction():
                     self.pyaas.AASXupdate = False
+                    self.compact()
             if (self.pyaas.conversationUpdate):
                 pass
                 #conversations_data = self.deserialize_conversations()
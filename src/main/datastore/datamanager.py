@@ -9,11 +9,17 @@ try:
 except ImportError:
     import Queue as Queue
 from datetime import datetime,timedelta
+import collections
+import concurrent.futures
+import threading
 import time
 class DataManager(object):
     '''
     classdocs
     '''
+    shellMethods = ("PostSubmodelReference","DeleteSubmodelReference","PutAssetInformation",
+                    "PutAssetAdministrationShell","PutAssetAdministrationShellById")
+    exclusiveMethods = ("PostAssetAdministrationShell","DeleteAssetAdministrationShellByIdandSubmodels")
 
     def __init__(self, pyAAS):
         '''
@@ -22,7 +28,13 @@ class DataManager(object):
         self.pyAAS = pyAAS
        
         self.InBoundProcessingQueue = Queue.Queue()
-        self.outBoundProcessingDict = {}
+        self.maxBatchSize = 1024
+        self.stats_lock = threading.Lock()
+        self.operations = 0
+        self.batchSizeHistogram = dict()
+        self.operationsPerSecond = collections.deque(maxlen=61)
+        self.laneWorkers = 8
+        self.executor = None
     
     def pushInboundMessage(self,msg):
         self.InBoundProcessingQueue.put(msg)
@@ -33,18 +45,51 @@ class DataManager(object):
     def start(self):
         self.POLL = True
         self.pyAAS.serviceLogger.info('The Database manager is being started')
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.laneWorkers,
+                                                              thread_name_prefix="DataManager Lane")
         while self.POLL:
-            time.sleep(0.01)
-            if (self.InBoundProcessingQueue).qsize() != 0:
-                inMessage = self.InBoundProcessingQueue.get()
+            try:
+                batch = [self.InBoundProcessingQueue.get(timeout=1)]
+            except Queue.Empty:
+                continue
+            while len(batch) < self.maxBatchSize:
+                try:
+                    batch.append(self.InBoundProcessingQueue.get_nowait())
+                except Queue.Empty:
+                    break
+            self.processBatch(batch)
+        self.executor.shutdown(wait=True)
+        self.pyAAS.serviceLogger.info('The Database manager is started')
+
+    def processBatch(self,batch):
+        """
+            Applies all drained messages, the mutations of the batch share one group commit
+            of the mutation log and one AASXupdate flag flip. Methods are applied in lane groups
+            on the worker pool, methods without lanes act as a barrier between the groups.
+            The snapshot root of the batch is published once its records are durable.
+        """
+        mutationLog = self.pyAAS.mutationLog
+        records = []
+        modified = False
+        conversationsModified = False
+        modifiedLanes = set()
+        with mutationLog.applyLock:
+            phase = []
+            for inMessage in batch:
                 if inMessage["functionType"] == 1:
-                    dba = self.pyAAS.dba
-                    _dba_method = getattr(dba,inMessage['method'])
-                    if inMessage['data'] is not None:
-                        self.outBoundProcessingDict[inMessage["instanceid"]] = _dba_method(inMessage['data'])
+                    lanes = ([],[])
+                    if mutationLog.isMutation(inMessage['method']):
+                        lanes = self.getLanes(inMessage['method'],inMessage['data'])
+                        modified = True
+                    if lanes is None:
+                        modifiedLanes = None
+                        self.processPhase(phase,records)
+                        phase = []
+                        self.processGroup([inMessage],records)
                     else:
-                        self.outBoundProcessingDict[inMessage["instanceid"]] = _dba_method()
-                    self.pyAAS.AASXupdate = True
+                        if modifiedLanes is not None:
+                            modifiedLanes.update(lanes[0])
+                        phase.append(inMessage)
                 elif inMessage['functionType'] == 3:
                     dba = self.pyAAS.dba
                     entryTime = ((datetime.now()+ timedelta(hours=2)).strftime("%Y-%m-%d %H:%M:%S.%f"))[:-3]
@@ -55,9 +100,179 @@ class DataManager(object):
                                                          inMessage["message"],
                                                          entryTime,
                                                          inMessage["SenderAASID"])
-                    self.pyAAS.conversationUpdate = True
-        self.pyAAS.serviceLogger.info('The Database manager is started')
-        
+                    conversationsModified = True
+            self.processPhase(phase,records)
+            if len(records) != 0:
+                snapshot = self.pyAAS.dba.buildSnapshot(modifiedLanes)
+                records[0] = (records[0][0],self.getPublishCallback(snapshot,records[0][1]))
+                mutationLog.appendBatch(records)
+        if modified:
+            self.pyAAS.AASXupdate = True
+        if conversationsModified:
+            self.pyAAS.conversationUpdate = True
+        self.recordBatch(len(batch))
+
+    def getLanes(self,method,data) -> tuple:
+        """
+            Returns the lanes the method writes and reads, None for methods which have to run
+            alone. Shells, submodels and concept descriptions are keyed by their identifier,
+            the methods addressed through a shell read the shell lane as they check its
+            submodel references.
+        """
+        if method[0].islower() or method in self.exclusiveMethods:
+            return None
+        if isinstance(data,str):
+            return [data],[]
+        if not isinstance(data,dict):
+            return None
+        writeLanes = []
+        for key in ("submodelIdentifier","_conceptDescriptionId"):
+            if key in data:
+                writeLanes.append(data[key])
+        for key in ("_submodel","_cd","_aasShell"):
+            if isinstance(data.get(key),dict) and "id" in data[key]:
+                writeLanes.append(data[key]["id"])
+        readLanes = []
+        if "_shellId" in data:
+            if method in self.shellMethods:
+                writeLanes.append(data["_shellId"])
+            else:
+                readLanes.append(data["_shellId"])
+        if len(writeLanes) == 0 or not all([isinstance(lane,str) for lane in writeLanes + readLanes]):
+            return None
+        return writeLanes,readLanes
+
+    def getLaneGroups(self,messages) -> list:
+        """
+            Partitions the mutations into groups which share no written lane. A read lane only
+            joins the group of the lane's writers. The messages keep their order within a group.
+        """
+        messageLanes = []
+        writtenLanes = set()
+        for inMessage in messages:
+            writeLanes,readLanes = self.getLanes(inMessage['method'],inMessage['data'])
+            writtenLanes.update(writeLanes)
+            messageLanes.append((writeLanes,readLanes))
+        parents = dict()
+        def find(lane):
+            parents.setdefault(lane,lane)
+            while parents[lane] != lane:
+                parents[lane] = parents[parents[lane]]
+                lane = parents[lane]
+            return lane
+        for i,lanes in enumerate(messageLanes):
+            lanes = lanes[0] + [lane for lane in lanes[1] if lane in writtenLanes]
+            messageLanes[i] = lanes
+            root = find(lanes[0])
+            for lane in lanes[1:]:
+                parents[find(lane)] = root
+        groups = dict()
+        for inMessage,lanes in zip(messages,messageLanes):
+            groups.setdefault(find(lanes[0]),[]).append(inMessage)
+        return list(groups.values())
+
+    def processPhase(self,messages,records):
+        """
+            The mutations of the phase run in lane groups on the worker pool. The queued reads
+            are answered afterwards on the DataManager thread, they read the HashDicts the
+            groups write.
+        """
+        mutationLog = self.pyAAS.mutationLog
+        mutations = [inMessage for inMessage in messages if mutationLog.isMutation(inMessage['method'])]
+        reads = [inMessage for inMessage in messages if not mutationLog.isMutation(inMessage['method'])]
+        groups = self.getLaneGroups(mutations)
+        if len(groups) < 2:
+            for group in groups:
+                self.processGroup(group,records)
+        else:
+            groupRecords = [[] for group in groups]
+            for result in self.executor.map(self.processGroup,groups,groupRecords):
+                pass
+            for _records in groupRecords:
+                records.extend(_records)
+        self.processGroup(reads,records)
+
+    def processGroup(self,group,records):
+        for inMessage in group:
+            future = inMessage["future"]
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                self.processMethod(inMessage,future,records)
+            except Exception as E:
+                future.set_exception(E)
+
+    def processMethod(self,inMessage,future,records):
+        dba = self.pyAAS.dba
+        _dba_method = getattr(dba,inMessage['method'])
+        mutationLog = self.pyAAS.mutationLog
+        if mutationLog.isMutation(inMessage['method']):
+            record = mutationLog.serializeRecord(inMessage['method'],inMessage['data'])
+            response = self.applyMethod(_dba_method,inMessage['data'])
+            if response[1]:
+                records.append((record,self.getResponseCallback(future,response)))
+            else:
+                future.set_result(response)
+        else:
+            future.set_result(self.applyMethod(_dba_method,inMessage['data']))
+
+    def recordBatch(self,batchSize):
+        bucket = 1
+        while bucket < batchSize:
+            bucket = bucket * 2
+        now = int(time.time())
+        with self.stats_lock:
+            self.operations = self.operations + batchSize
+            self.batchSizeHistogram[bucket] = self.batchSizeHistogram.get(bucket,0) + 1
+            if len(self.operationsPerSecond) != 0 and self.operationsPerSecond[-1][0] == now:
+                self.operationsPerSecond[-1][1] = self.operationsPerSecond[-1][1] + batchSize
+            else:
+                self.operationsPerSecond.append([now,batchSize])
+
+    def getStatistics(self) -> dict:
+        """
+            Returns the processed operations, the ops/s histogram of the last minute and the
+            batch size histogram with power of two buckets.
+        """
+        now = int(time.time())
+        with self.stats_lock:
+            opsHistogram = dict()
+            for second,count in self.operationsPerSecond:
+                if now - second <= 60:
+                    bucket = 1
+                    while bucket < count:
+                        bucket = bucket * 2
+                    opsHistogram[bucket] = opsHistogram.get(bucket,0) + 1
+            lastMinute = sum([count for second,count in self.operationsPerSecond if 0 < now - second <= 60])
+            return {"operations": self.operations,
+                    "opsPerSecondLastMinute": lastMinute / 60.0,
+                    "opsPerSecondHistogram": dict(sorted(opsHistogram.items())),
+                    "batchSizeHistogram": dict(sorted(self.batchSizeHistogram.items()))}
+
+    def applyMethod(self,_dba_method,data):
+        if data is not None:
+            return _dba_method(data)
+        else:
+            return _dba_method()
+
+    def getPublishCallback(self,snapshot,callback):
+        def publish(error):
+            if error is None:
+                self.pyAAS.dba.publishSnapshot(snapshot)
+            callback(error)
+        return publish
+
+    def getResponseCallback(self,future,response):
+        """
+            The caller gets the response once its record is durable, the error if the log write failed.
+        """
+        def respond(error):
+            if error is None:
+                future.set_result(response)
+            else:
+                future.set_exception(error)
+        return respond
+
     def stop(self):
         self.pyAAS.serviceLogger.info('The Database manager is being stopped')
         self.POLL = False
@@ -0,0 +1,87 @@
+'''
+Copyright (c) 2021-2022 Otto-von-Guericke-Universiat Magdeburg, Lehrstuhl Integrierte Automation
+Author: Harish Kumar Pakala
+This source code is licensed under the Apache License 2.0 (see LICENSE.txt).
+This source code may use other Open Source software components (see LICENSE.txt).
+'''
+import hashlib
+import json
+import os
+
+try:
+    from abstract.storageengine import AASStorageEngine
+except ImportError:
+    from src.main.abstract.storageengine import AASStorageEngine
+
+
+class AAS_JSON_Storage(AASStorageEngine):
+    '''
+        Stores the environment in the AASX package JSON file. The file is replaced atomically,
+        a checkpoint with its sha256 digest records the log segments it covers.
+    '''
+    def __init__(self, pyAAS):
+        AASStorageEngine.__init__(self, pyAAS)
+        self.checkpointFile = os.path.join(self.pyAAS.dataRepository, "wal", "checkpoint.json")
+
+    def configure(self) -> bool:
+        return True
+
+    def getPackagePath(self) -> str:
+        return os.path.join(self.pyAAS.repository, self.pyAAS.aasConfigurer.base_file)
+
+    def loadEnvironment(self) -> dict:
+        """
+            The package file is already loaded by the configuration parser.
+        """
+        return None
+
+    def getCoveredSegment(self) -> int:
+        try:
+            with open(self.checkpointFile, encoding="utf-8") as checkpointFile:
+                checkpoint = json.load(checkpointFile)
+            with open(self.getPackagePath(), "rb") as packageFile:
+                if hashlib.sha256(packageFile.read()).hexdigest() == checkpoint["sha256"]:
+                    return checkpoint["segment"]
+        except Exception as E:
+            pass
+        return 0
+
+    def writeFile(self, _filePath, data) -> None:
+        with open(_filePath + ".tmp", "wb") as dataFile:
+            dataFile.write(data)
+            dataFile.flush()
+            os.fsync(dataFile.fileno())
+        os.replace(_filePath + ".tmp", _filePath)
+        self.syncDirectory(os.path.dirname(_filePath))
+
+    def syncDirectory(self, _path) -> None:
+        try:
+            _fd = os.open(_path, os.O_RDONLY)
+            try:
+                os.fsync(_fd)
+            finally:
+                os.close(_fd)
+        except OSError:
+            pass
+
+    def saveSnapshot(self, shells, submodels, conceptDescriptions, coveredSegment) -> bool:
+        """
+            Replaces the package file with the snapshot, a crash leaves either the old or the new
+            file in place. The checkpoint is only valid for the file with the matching digest.
+        """
+        try:
+            snapshot = b"".join([b'{"assetAdministrationShells":', json.dumps(shells).encode("utf-8"),
+                                 b',"submodels":[', b",".join([entry.serialized.rstrip(b"\n") for entry in submodels]),
+                                 b'],"conceptDescriptions":', json.dumps(conceptDescriptions).encode("utf-8"), b"}"])
+            os.makedirs(os.path.dirname(self.checkpointFile), exist_ok=True)
+            self.writeFile(self.checkpointFile, json.dumps({"segment": coveredSegment,
+                                                            "sha256": hashlib.sha256(snapshot).hexdigest()}).encode("utf-8"))
+            self.writeFile(self.getPackagePath(), snapshot)
+            self.lastSnapshotSize = len(snapshot)
+            return True
+        except Exception as E:
+            self.pyAAS.serviceLogger.info("Error at saveSnapshot JSON storage" + str(E))
+            return False
+
+    def stop(self) -> None:
+        pass
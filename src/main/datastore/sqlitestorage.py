@@ -0,0 +1,208 @@
+'''
+Copyright (c) 2021-2022 Otto-von-Guericke-Universiat Magdeburg, Lehrstuhl Integrierte Automation
+Author: Harish Kumar Pakala
+This source code is licensed under the Apache License 2.0 (see LICENSE.txt).
+This source code may use other Open Source software components (see LICENSE.txt).
+'''
+import json
+import os
+import sqlite3
+import threading
+
+try:
+    from abstract.storageengine import AASStorageEngine
+except ImportError:
+    from src.main.abstract.storageengine import AASStorageEngine
+
+try:
+    from datastore.jsonstorage import AAS_JSON_Storage
+except ImportError:
+    from src.main.datastore.jsonstorage import AAS_JSON_Storage
+
+
+class AAS_SQLite_Storage(AASStorageEngine):
+    '''
+        Stores the environment in an embedded SQLite database in WAL mode. Submodel elements
+        are rows keyed by their idShortPath, collections keep their children as rows with the
+        collection as parent. A snapshot only rewrites the rows of the modified submodels,
+        shells and concept descriptions and commits them with the covered log segment.
+    '''
+    def __init__(self, pyAAS, fileName="aasenvironment.sqlite3"):
+        AASStorageEngine.__init__(self, pyAAS)
+        self.databasePath = os.path.join(self.pyAAS.dataRepository, fileName)
+        self.db_lock = threading.Lock()
+        self.connection = None
+        self.writtenSubmodels = dict()
+        self.writtenShells = dict()
+        self.writtenConceptDescriptions = dict()
+
+    def configure(self) -> bool:
+        try:
+            self.connection = sqlite3.connect(self.databasePath, check_same_thread=False, isolation_level=None)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=FULL")
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS shells (id TEXT PRIMARY KEY, position INTEGER, element TEXT);
+                CREATE TABLE IF NOT EXISTS submodels (id TEXT PRIMARY KEY, idShort TEXT, semanticId TEXT,
+                                                      position INTEGER, element TEXT);
+                CREATE TABLE IF NOT EXISTS submodelElements (idShortPath TEXT PRIMARY KEY, submodelId TEXT,
+                                                             parentPath TEXT, position INTEGER, idShort TEXT,
+                                                             modelType TEXT, semanticId TEXT, element TEXT);
+                CREATE TABLE IF NOT EXISTS conceptDescriptions (id TEXT PRIMARY KEY, idShort TEXT,
+                                                                position INTEGER, element TEXT);
+                CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT);
+                CREATE INDEX IF NOT EXISTS submodels_semanticId ON submodels (semanticId);
+                CREATE INDEX IF NOT EXISTS submodels_idShort ON submodels (idShort);
+                CREATE INDEX IF NOT EXISTS submodelElements_submodelId ON submodelElements (submodelId);
+                CREATE INDEX IF NOT EXISTS submodelElements_semanticId ON submodelElements (semanticId);
+                CREATE INDEX IF NOT EXISTS submodelElements_idShort ON submodelElements (idShort);
+                CREATE INDEX IF NOT EXISTS conceptDescriptions_idShort ON conceptDescriptions (idShort);
+            """)
+            self.resetWrittenState()
+            return True
+        except Exception as E:
+            self.pyAAS.serviceLogger.info("Error configuring the SQLite storage" + str(E))
+            return False
+
+    def resetWrittenState(self) -> None:
+        """
+            Marks all stored rows as outdated so the next snapshot rewrites them.
+        """
+        self.writtenSubmodels = dict([(row[0], None) for row in self.connection.execute("SELECT id FROM submodels")])
+        self.writtenShells = dict([(row[0], None) for row in self.connection.execute("SELECT id FROM shells")])
+        self.writtenConceptDescriptions = dict([(row[0], None) for row in
+                                                self.connection.execute("SELECT id FROM conceptDescriptions")])
+
+    def getMetadata(self, key) -> str:
+        row = self.connection.execute("SELECT value FROM metadata WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return row[0]
+
+    def getSemanticId(self, element) -> str:
+        try:
+            return element["semanticId"]["keys"][0]["value"]
+        except (KeyError, IndexError, TypeError):
+            return None
+
+    def loadEnvironment(self) -> dict:
+        """
+            Rebuilds the environment from the rows, None before the first snapshot.
+        """
+        with self.db_lock:
+            if self.getMetadata("coveredSegment") is None:
+                return None
+            children = dict()
+            for idShortPath, parentPath, element in self.connection.execute(
+                    "SELECT idShortPath, parentPath, element FROM submodelElements ORDER BY parentPath, position"):
+                children.setdefault(parentPath, []).append((idShortPath, json.loads(element)))
+            submodels = []
+            for _id, element in self.connection.execute("SELECT id, element FROM submodels ORDER BY position"):
+                submodel = json.loads(element)
+                if "submodelElements" in submodel:
+                    submodel["submodelElements"] = [self.attachChildren(children, idShortPath, submodelElem)
+                                                    for idShortPath, submodelElem in children.get(_id, [])]
+                submodels.append(submodel)
+            return {"assetAdministrationShells": [json.loads(row[0]) for row in
+                                                  self.connection.execute("SELECT element FROM shells ORDER BY position")],
+                    "submodels": submodels,
+                    "conceptDescriptions": [json.loads(row[0]) for row in
+                                            self.connection.execute("SELECT element FROM conceptDescriptions ORDER BY position")]}
+
+    def attachChildren(self, children, _idShortPath, submodelElem) -> dict:
+        if submodelElem["modelType"] == "SubmodelElementCollection" and "value" in submodelElem:
+            submodelElem["value"] = [self.attachChildren(children, idShortPath, childElem)
+                                     for idShortPath, childElem in children.get(_idShortPath, [])]
+        return submodelElem
+
+    def getCoveredSegment(self) -> int:
+        """
+            Before the first snapshot the environment comes from the package file, so its checkpoint applies.
+        """
+        with self.db_lock:
+            coveredSegment = self.getMetadata("coveredSegment")
+        if coveredSegment is None:
+            return AAS_JSON_Storage(self.pyAAS).getCoveredSegment()
+        return int(coveredSegment)
+
+    def flattenElements(self, submodelId, parentPath, submodelElements, rows) -> None:
+        for position, submodelElem in enumerate(submodelElements):
+            _idShortPath = parentPath + "." + submodelElem["idShort"]
+            if submodelElem["modelType"] == "SubmodelElementCollection" and "value" in submodelElem:
+                self.flattenElements(submodelId, _idShortPath, submodelElem["value"], rows)
+                submodelElem = dict(submodelElem)
+                submodelElem["value"] = []
+            rows.append((_idShortPath, submodelId, parentPath, position, submodelElem["idShort"],
+                         submodelElem["modelType"], self.getSemanticId(submodelElem), json.dumps(submodelElem)))
+
+    def writeSubmodels(self, cursor, submodels) -> dict:
+        writtenSubmodels = dict()
+        for position, entry in enumerate(submodels):
+            submodel = entry.element
+            _id = submodel["id"]
+            if self.writtenSubmodels.get(_id) != entry.version:
+                rows = []
+                if "submodelElements" in submodel:
+                    self.flattenElements(_id, _id, submodel["submodelElements"], rows)
+                    submodel = dict(submodel)
+                    submodel["submodelElements"] = []
+                cursor.execute("DELETE FROM submodelElements WHERE submodelId = ?", (_id,))
+                cursor.executemany("INSERT INTO submodelElements VALUES (?,?,?,?,?,?,?,?)", rows)
+                cursor.execute("INSERT OR REPLACE INTO submodels VALUES (?,?,?,?,?)",
+                               (_id, submodel.get("idShort"), self.getSemanticId(submodel), position, json.dumps(submodel)))
+            else:
+                cursor.execute("UPDATE submodels SET position = ? WHERE id = ?", (position, _id))
+            writtenSubmodels[_id] = entry.version
+        for _id in self.writtenSubmodels.keys():
+            if _id not in writtenSubmodels:
+                cursor.execute("DELETE FROM submodelElements WHERE submodelId = ?", (_id,))
+                cursor.execute("DELETE FROM submodels WHERE id = ?", (_id,))
+        return writtenSubmodels
+
+    def writeElements(self, cursor, table, elements, writtenElements, columns) -> dict:
+        """
+            Elements are frozen, an element that is still the same object is unchanged.
+        """
+        written = dict()
+        for position, element in enumerate(elements):
+            _id = element["id"]
+            if writtenElements.get(_id) is not element:
+                values = [_id] + [element.get(column) for column in columns] + [position, json.dumps(element)]
+                cursor.execute("INSERT OR REPLACE INTO " + table + " VALUES (" + ",".join(["?"] * len(values)) + ")", values)
+            else:
+                cursor.execute("UPDATE " + table + " SET position = ? WHERE id = ?", (position, _id))
+            written[_id] = element
+        for _id in writtenElements.keys():
+            if _id not in written:
+                cursor.execute("DELETE FROM " + table + " WHERE id = ?", (_id,))
+        return written
+
+    def saveSnapshot(self, shells, submodels, conceptDescriptions, coveredSegment) -> bool:
+        with self.db_lock:
+            cursor = self.connection.cursor()
+            try:
+                cursor.execute("BEGIN")
+                writtenSubmodels = self.writeSubmodels(cursor, submodels)
+                writtenShells = self.writeElements(cursor, "shells", shells, self.writtenShells, [])
+                writtenConceptDescriptions = self.writeElements(cursor, "conceptDescriptions", conceptDescriptions,
+                                                                self.writtenConceptDescriptions, ["idShort"])
+                cursor.execute("INSERT OR REPLACE INTO metadata VALUES ('coveredSegment', ?)", (str(coveredSegment),))
+                cursor.execute("COMMIT")
+                self.writtenSubmodels = writtenSubmodels
+                self.writtenShells = writtenShells
+                self.writtenConceptDescriptions = writtenConceptDescriptions
+                self.lastSnapshotSize = (self.connection.execute("PRAGMA page_count").fetchone()[0] *
+                                         self.connection.execute("PRAGMA page_size").fetchone()[0])
+                return True
+            except Exception as E:
+                self.pyAAS.serviceLogger.info("Error at saveSnapshot SQLite storage" + str(E))
+                if self.connection.in_transaction:
+                    cursor.execute("ROLLBACK")
+                self.resetWrittenState()
+                return False
+
+    def stop(self) -> None:
+        with self.db_lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
@@ -6,21 +6,21 @@ This source code may use other Open Source software components (see LICENSE.txt)
 """
 
 try:
-    from utils.utils import ExecuteDBModifier, SubscriptionMessage, HistoryObject
+    from utils.utils import ExecuteDBModifier
 except ImportError:
-    from src.main.utils.utils import ExecuteDBModifier, SubscriptionMessage, HistoryObject
+    from src.main.utils.utils import ExecuteDBModifier
 
-from datetime import datetime
 import time
+import uuid
 
 
-def function(td_property,asset_access_handlers) -> None:
+def function(td_property,asset_access_handlers,pyaas) -> None:
     """
-
+        Polls the asset for the value of the property and writes it to the element with the
+        value only update, the element keeps its identity and the old value goes to its history.
     """
-    access_uri = td_property.hrefs
+    access_uri = td_property.href
     update_frequency = int(td_property.update_frequency)
-    aas_element = td_property.update_frequency.aasELement
     endpoint_type = ""
     if access_uri[0:8] == "opc.tcp:":
         endpoint_type = "OPCUA"
@@ -31,43 +31,20 @@ def function(td_property,asset_access_handlers) -> None:
     else:
         pass
 
+    edm = ExecuteDBModifier(pyaas)
     while True:
         time.sleep(update_frequency)
+        new_value = None
         if endpoint_type == "OPCUA":
             new_value = asset_access_handlers["OPCUA"].read(access_uri)
-            while not td_property.elem_lock:
-                td_property.elem_lock = True
-                _dt = datetime.now()
-                _ho = HistoryObject(aas_element["value"], _dt)
-                td_property.addhistoryElement(_ho)
-                td_property.aasELement["value"] = new_value
-                td_property.elem_lock = False
-                break
-                
         elif endpoint_type == "http":
             request_type = td_property.requestType
             if request_type == "get":
-                _referenceId = td_property._referenceId
                 new_value = str(asset_access_handlers["RESTAPI"].getData(access_uri))
                 if new_value == "error":
-                    pass
-                else:
-                    while not td_property.elem_lock:
-                        td_property.elem_lock = True
-                        _dt = datetime.now()
-                        _ho = HistoryObject(aas_element["value"], _dt)
-                        td_property.addhistoryElement(_ho)
-                        td_property.aasELement["value"] = new_value
-                        td_property.elem_lock = False
-                        break  
-                      
-                '''
-                if status:
-                    aasHashObject = pyaas.aasHashDict.__getHashEntry__(_referenceId)
-                    if len(aasHashObject.subscribers) > 0 :
-                        subForward = SubscriptionMessage(_referenceId,"dd",dataElement["modelType"]["name"],
-                        aasHashObject.subscribers,dataElement)
-                        subForward.subscriptiondata = dataElement["value"]
-                        pyaas.listnerSockets["AAS_PUBSUB"].subscription_forward_messages.put(subForward)
-    
-            '''
+                    new_value = None
+        if new_value is not None:
+            edm.execute({"data": {"submodelIdentifier": td_property.submodelIdentifier,
+                                  "idShortPath": td_property.idshort_path,
+                                  "value": new_value},
+                         "method": "PutSubmodelElementValueByPath_SRI", "instanceId": str(uuid.uuid1())})
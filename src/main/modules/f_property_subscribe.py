@@ -11,12 +11,12 @@ except ImportError:
     from main.assetaccessadapters.io_opcua import OPCUASubscriptionHandler,OPCUASubscription
 
 
-def function(td_property):
+def function(td_property,asset_access_handlers,pyaas):
     access_uri = td_property.href
     
     if access_uri[0:8] == "opc.tcp:":
         _handler = OPCUASubscriptionHandler()
-        _handler.set_property(td_property.elemObject)
+        _handler.set_property(td_property,pyaas)
         opcua_sub = OPCUASubscription(access_uri,_handler)
         asyncio.run(opcua_sub.subscribe())
     
@@ -32,6 +32,26 @@ try:
 except ImportError:
     from src.main.datastore.databaseutils import AAS_Database_UtilServer
 
+try:
+    from datastore.databaselog import AAS_Database_Log
+except ImportError:
+    from src.main.datastore.databaselog import AAS_Database_Log
+
+try:
+    from datastore.databasehistory import AAS_Database_History
+except ImportError:
+    from src.main.datastore.databasehistory import AAS_Database_History
+
+try:
+    from datastore.jsonstorage import AAS_JSON_Storage
+except ImportError:
+    from src.main.datastore.jsonstorage import AAS_JSON_Storage
+
+try:
+    from datastore.sqlitestorage import AAS_SQLite_Storage
+except ImportError:
+    from src.main.datastore.sqlitestorage import AAS_SQLite_Storage
+
 # try:
 #     from pubsub.pubsubmanager import PubSubManager
 # except ImportError:
@@ -58,9 +78,9 @@ except ImportError:
     from src.main.utils.aaslog import ServiceLogHandler, LogList
 
 try:
-    from utils.utils import HashDict, SecurityAccess
+    from utils.utils import HashDict, InvertedIndex, PathTrie, SecurityAccess, HistoryBuffer
 except ImportError:
-    from src.main.utils.utils import HashDict, SecurityAccess
+    from src.main.utils.utils import HashDict, InvertedIndex, PathTrie, SecurityAccess, HistoryBuffer
 
 
 class PyAASxServer:
@@ -83,6 +103,11 @@ class PyAASxServer:
         self.cfpHashDict = HashDict()
         self.aasShellHashDict = HashDict()
         self.assetHashDict = HashDict()
+        self.semanticIdIndex = InvertedIndex()
+        self.cdIdShortIndex = InvertedIndex()
+        self.cdIsCaseOfIndex = InvertedIndex()
+        self.cdDataSpecificationIndex = InvertedIndex()
+        self.idShortPathTrie = PathTrie()
         
         self.listenerSockets = dict()
 
@@ -235,8 +260,26 @@ class PyAASxServer:
             self.serviceLogger.info("Error configuring the AASX parser." + str(E))
             self.shutDown()
 
+    def configure_storage_engine(self) -> None:
+        try:
+            storageEngines = {"JSON": AAS_JSON_Storage, "SQLITE": AAS_SQLite_Storage}
+            self.storageEngine = storageEngines[self.lia_env_variable.get("LIA_STORAGE_ENGINE", "JSON").upper()](self)
+            if not self.storageEngine.configure():
+                self.serviceLogger.info("Error while configuring the storage engine. ")
+                self.shutDown()
+            environment = self.storageEngine.loadEnvironment()
+            if environment is not None:
+                self.aasConfigurer.jsonData = environment
+        except Exception as E:
+            self.serviceLogger.info(
+                "Error while configuring the storage engine. " + str(E)
+            )
+            self.shutDown()
+
     def configure_data_adaptor(self) -> None:
         try:
+            HistoryBuffer.defaultCapacity = int(self.lia_env_variable.get("LIA_HISTORY_MAX_POINTS", HistoryBuffer.defaultCapacity))
+            HistoryBuffer.defaultMaxAge = float(self.lia_env_variable.get("LIA_HISTORY_MAX_AGE", HistoryBuffer.defaultMaxAge))
             self.dba = AAS_Database_Server(self)
             self.utilsServer = AAS_Database_UtilServer(self)
             if not self.dba.dbServerStatus:
@@ -244,6 +287,10 @@ class PyAASxServer:
                     "Error while initializing the Database server. "
                 )
                 self.shutDown()
+            self.historyStore = AAS_Database_History(self)
+            self.mutationLog = AAS_Database_Log(self)
+            self.mutationLog.replay(self.storageEngine.getCoveredSegment())
+            self.dba.publishSnapshot(self.dba.buildSnapshot())
         except Exception as E:
             self.serviceLogger.info(
                 "Error while configuring the Database Server. " + str(E)
@@ -479,6 +526,14 @@ class PyAASxServer:
                 target=self.utilsServer.start, args=(), name="Data Utils Server"
             )
             dataUtilsServer.start()
+            mutationLogThread = threading.Thread(
+                target=self.mutationLog.start, args=(), name="Mutation Log"
+            )
+            mutationLogThread.start()
+            historyStoreThread = threading.Thread(
+                target=self.historyStore.start, args=(), name="History Store"
+            )
+            historyStoreThread.start()
             self.serviceLogger.info("The message handler started")
         except Exception as E:
             self.serviceLogger.info(
@@ -513,6 +568,7 @@ class PyAASxServer:
         self.serviceLogger.info("Configuration Parameters are Set.")
 
         self.configure_aas_configure_parser()
+        self.configure_storage_engine()
         self.configure_data_adaptor()
 
         self.configure_data_manager()
@@ -569,6 +625,8 @@ class PyAASxServer:
 
     def stop(self) -> None:
         self.scheduler.stop()
+        self.utilsServer.stop()
+        self.historyStore.stop()
         for module_name, cdrv in self.AASendPointHandles.items():
             cdrv.stop()
 
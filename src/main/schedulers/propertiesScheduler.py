@@ -34,10 +34,10 @@ class Scheduler:
                     for property_name,_property in _shellObject.asset_interface_description.properties.items():
                         if _property.update_frequency == "subscribe":
                             update_function = import_module("modules." + "f_property_subscribe").function
-                            self.jobs[property_name] = threading.Thread(target=update_function, args=(_property,))
+                            self.jobs[property_name] = threading.Thread(target=update_function, args=(_property,self.pyaas.asset_access_handlers,self.pyaas,))
                         elif str(_property.update_frequency) != "0":
                             update_function = import_module("modules." + "f_property_read").function
-                            self.jobs[property_name] = threading.Thread(target=update_function, args=(_property,self.pyaas.asset_access_handlers,))
+                            self.jobs[property_name] = threading.Thread(target=update_function, args=(_property,self.pyaas.asset_access_handlers,self.pyaas,))
         except SystemError as e:
             self.pyaas.servself.serviceLogger.info(
                 "Error configuring PyAAS Scheduler " + str(e)
@@ -74,11 +74,11 @@ class Scheduler:
         try:
             if aid_property.update_frequency == "subscribe":
                 update_function = import_module("modules." + "f_property_subscribe").function
-                th = threading.Thread(target=update_function, args=(aid_property,))
+                th = threading.Thread(target=update_function, args=(aid_property,self.pyaas.asset_access_handlers,self.pyaas,))
                 th.start()
             elif str(aid_property.update_frequency) != "0":
                 update_function = import_module("modules." + "f_property_read").function
-                th = threading.Thread(target=update_function, args=(aid_property,self.pyaas.asset_access_handlers,))
+                th = threading.Thread(target=update_function, args=(aid_property,self.pyaas.asset_access_handlers,self.pyaas,))
                 th.start()
             return True
         except SystemError as e:
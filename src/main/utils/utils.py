@@ -6,10 +6,20 @@ This source code may use other Open Source software components (see LICENSE.txt)
 """
 
 from copy import deepcopy
+from datetime import datetime
 from jsonschema import validate
+from jsonschema.validators import validator_for
 import base64
+import concurrent.futures
 import copy
+import itertools
+import sys
+import threading
+import time
 import uuid
+import weakref
+
+import numpy as np
 
 #from Cryptodome.PublicKey import RSA
 #from Cryptodome.IO import PEM
@@ -36,30 +46,39 @@ class Immutable:
             raise RuntimeError(key + " is immutable")
 
 
+DB_REQUEST_TIMEOUT = 30
+
+
 class ExecuteDBModifier(object):
     def __init__(self, pyaas):
         self.pyaas = pyaas
 
-    def execute(self, instance_data) -> tuple:
+    def submit(self, instance_data) -> concurrent.futures.Future:
+        """
+            Queues the database server method for the DataManager. The returned future is resolved
+            with the response, cancelling it before the DataManager picks it up skips the method.
+        """
+        future = concurrent.futures.Future()
+        self.pyaas.dataManager.pushInboundMessage({"functionType": 1, "instanceid": instance_data["instanceId"],
+                                                   "data": instance_data["data"],
+                                                   "method": instance_data["method"],
+                                                   "future": future})
+        return future
+
+    def execute(self, instance_data, timeout=DB_REQUEST_TIMEOUT) -> tuple:
         """
             Executes the database server method specific in the arguments and returns the response
         """
+        future = None
         try:
-            instance_id = instance_data["instanceId"]
-            self.pyaas.dataManager.pushInboundMessage({"functionType": 1, "instanceid": instance_id,
-                                                       "data": instance_data["data"],
-                                                       "method": instance_data["method"]})
-            pool = True
-            while pool:
-                if len(self.pyaas.dataManager.outBoundProcessingDict.keys()) != 0:
-                    if instance_id in list(self.pyaas.dataManager.outBoundProcessingDict.keys()):
-                        if self.pyaas.dataManager.outBoundProcessingDict[instance_id] != "":
-                            modifier_response = self.pyaas.dataManager.outBoundProcessingDict[instance_id]
-                            del self.pyaas.dataManager.outBoundProcessingDict[instance_id]
-                            pool = False
-                            return modifier_response
-        except SystemError as e:
-            self.serviceLogger.info(
+            future = self.submit(instance_data)
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            self.pyaas.serviceLogger.info("Timeout executing the database method " + instance_data["method"])
+            return "Service Unavailable", False, 503
+        except Exception as e:
+            self.pyaas.serviceLogger.info(
                 "Error executing the database method " + str(e)
             )
             return "Internal Server Error", False, 500
@@ -254,9 +273,23 @@ class AASDescriptor:
 
 
 class AASMetaModelValidator:
+    submodelElementValidators = dict()
+
     def __init__(self, pyaas):
         self.pyaas = pyaas
 
+    def getSubmodelElementValidator(self, modelType) -> object:
+        """
+            The schema of a submodel element type is compiled once and shared by all requests.
+        """
+        validator = self.submodelElementValidators.get(modelType)
+        if validator is None:
+            SubmodelElementJsonSchema = deepcopy(self.pyaas.aasConfigurer.aasJsonSchema)
+            SubmodelElementJsonSchema["allOf"][0]["$ref"] = "#/definitions/" + modelType
+            validator = validator_for(SubmodelElementJsonSchema)(SubmodelElementJsonSchema)
+            self.submodelElementValidators[modelType] = validator
+        return validator
+
     def validateAASShell(self, aasShellData) -> bool:
         """
         """        
@@ -329,12 +362,7 @@ class AASMetaModelValidator:
             if 'modelType' in list(SubmodelElementData.keys()):
                 modelType = SubmodelElementData['modelType']
                 if modelType not in ["Submodel", "AssetAdministrationShell", "ConceptDescription"]:
-                    SubmodelElementJsonSchema = deepcopy(self.pyaas.aasConfigurer.aasJsonSchema)
-                    SubmodelElementJsonSchema["allOf"][0]["$ref"] = "#/definitions/" + modelType
-                    if (not validate(instance=SubmodelElementData, schema=SubmodelElementJsonSchema)):
-                        return True
-                    else:
-                        return False
+                    return self.getSubmodelElementValidator(modelType).is_valid(SubmodelElementData)
                 else:
                     return False
             else:
@@ -363,20 +391,33 @@ class ExecuteDBRetriever:
         self.instanceId = str(uuid.uuid1())
         self.pyaas = pyaas
 
-    def execute(self, instanceData) -> (str,bool):
-        """
-        """
+    def execute(self, instanceData, timeout=DB_REQUEST_TIMEOUT) -> (str,bool):
+        """
+            Reads offered by the snapshot root are served from the pinned root without queueing,
+            the other methods are executed by the DataManager.
+        """
+        _snapshot_method = getattr(self.pyaas.dba.getSnapshot(), instanceData["method"], None)
+        if _snapshot_method is not None:
+            try:
+                if instanceData["data"] is not None:
+                    return _snapshot_method(instanceData["data"])
+                return _snapshot_method()
+            except Exception as e:
+                self.pyaas.serviceLogger.info("Error executing the database method " + str(e))
+                return "Error",False
+        future = concurrent.futures.Future()
         self.pyaas.dataManager.pushInboundMessage({"functionType": 1, "instanceid": self.instanceId,
                                                    "data": instanceData["data"],
-                                                   "method": instanceData["method"]})
-        vePool = True
+                                                   "method": instanceData["method"],
+                                                   "future": future})
         response = "Error",False
-        while (vePool):
-            if (len(self.pyaas.dataManager.outBoundProcessingDict.keys()) != 0):
-                if (self.pyaas.dataManager.outBoundProcessingDict[self.instanceId] != ""):
-                    response = self.pyaas.dataManager.outBoundProcessingDict[self.instanceId]
-                    del self.pyaas.dataManager.outBoundProcessingDict[self.instanceId]
-                    vePool = False
+        try:
+            response = future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            self.pyaas.serviceLogger.info("Timeout executing the database method " + instanceData["method"])
+        except Exception as e:
+            self.pyaas.serviceLogger.info("Error executing the database method " + str(e))
         return response
 
 
@@ -415,12 +456,23 @@ class HTTPResponse:
 
 
 class AASHashObject:
+    """
+        The subscriber set is only allocated for elements which get a subscriber.
+    """
+    __slots__ = ("_id", "_subscribers", "lastUpdateTime", "newUpdate")
+
     def __init__(self, _id):
         self._id = _id
-        self.subscribers = set()
+        self._subscribers = None
         self.lastUpdateTime = ""
         self.newUpdate = False
 
+    @property
+    def subscribers(self) -> set:
+        if self._subscribers is None:
+            self._subscribers = set()
+        return self._subscribers
+
     def __getId__(self) -> str:
         """
         """
@@ -442,60 +494,620 @@ class AASHashObject:
         return self.subscribers
     
 class HashDict:
-    def __init__(self):
+    """
+        Registry shared by the DataManager, REST, MQTT and skill threads. Readers do not
+        take a lock, writers serialise per key on one of the stripe locks.
+    """
+    def __init__(self, stripeCount=16):
         super().__init__()
         self.hashDict = dict()
+        self.reverseDict = dict()
         self.elementCount = 0
+        self.stripeLocks = tuple(threading.RLock() for _ in range(stripeCount))
+        self.snapshotLock = threading.Lock()
+        self.keySnapshot = None
+        self.generation = 0
 
     def getElementCount(self) -> int:
         """
         """
         return self.elementCount
 
+    def __getStripeLock__(self, key) -> object:
+        """
+        """
+        return self.stripeLocks[hash(key) % len(self.stripeLocks)]
+
+    def __modified__(self, countChange) -> None:
+        """
+        """
+        with self.snapshotLock:
+            self.elementCount = self.elementCount + countChange
+            self.generation = self.generation + 1
+            self.keySnapshot = None
+
     def __insertHashEntry__(self, key, hashObject) -> None:
         """
         """
-        self.elementCount = self.elementCount + 1
-        self.hashDict[key] = hashObject
+        with self.__getStripeLock__(key):
+            if key in self.hashDict:
+                self.__unindexEntry__(key, self.hashDict[key])
+            self.hashDict[key] = hashObject
+            if isinstance(hashObject, AASHashObject):
+                self.reverseDict[hashObject.__getId__()] = key
+            self.__modified__(1)
 
     def __deleteHashEntry__(self, key) -> None:
         """
         """
-        self.elementCount = self.elementCount - 1
-        del self.hashDict[key]
+        with self.__getStripeLock__(key):
+            self.__unindexEntry__(key, self.hashDict.pop(key))
+            self.__modified__(-1)
 
-    def __getHashEntry__(self, key) -> object:
+    def __deleteHashEntries__(self, keys) -> None:
         """
+            Deletes the keys under all stripe locks at once, a missing key raises KeyError
+            after the keys before it were deleted.
         """
-        return self.hashDict[key]
+        for stripeLock in self.stripeLocks:
+            stripeLock.acquire()
+        deleted = 0
+        try:
+            for key in keys:
+                self.__unindexEntry__(key, self.hashDict.pop(key))
+                deleted = deleted + 1
+        finally:
+            for stripeLock in self.stripeLocks:
+                stripeLock.release()
+            self.__modified__(-deleted)
 
-    def _getKeys(self) -> list:
+    def __unindexEntry__(self, key, hashObject) -> None:
         """
         """
-        return list(self.hashDict.keys())
+        if isinstance(hashObject, AASHashObject):
+            if self.reverseDict.get(hashObject.__getId__()) == key:
+                del self.reverseDict[hashObject.__getId__()]
+
+    def __getHashEntry__(self, key) -> object:
+        """
+        """
+        return self.hashDict[key]
+
+    def _getKeys(self) -> tuple:
+        """
+            Returns an immutable snapshot of the keys, it is only rebuilt after a modification.
+        """
+        with self.snapshotLock:
+            keySnapshot = self.keySnapshot
+            generation = self.generation
+        if keySnapshot is None:
+            for stripeLock in self.stripeLocks:
+                stripeLock.acquire()
+            try:
+                keySnapshot = tuple(self.hashDict)
+            finally:
+                for stripeLock in self.stripeLocks:
+                    stripeLock.release()
+            with self.snapshotLock:
+                if self.generation == generation:
+                    self.keySnapshot = keySnapshot
+        return keySnapshot
 
     def __getkey__(self, _value) -> str:
         """
         """
-        for key, value in self.hashDict.items():
-            if _value == value.__getId__():
-                return key
+        return self.reverseDict.get(_value)
 
     def __isKeyPresent__(self, key) -> bool:
         """
         """
-        if key in list(self.hashDict.keys()):
-            return True
+        return key in self.hashDict
+
+
+class InvertedIndex:
+    """
+        Maps a lookup value such as a semanticId to the uuids of the elements carrying it.
+    """
+    def __init__(self):
+        self.index = dict()
+        self.entryKeys = dict()
+        self.index_lock = threading.Lock()
+
+    def __insertEntry__(self, _uuid, keys) -> None:
+        """
+            Indexes the uuid under the given keys, keys from an earlier insert are replaced.
+        """
+        with self.index_lock:
+            self.__unindexEntry__(_uuid)
+            _keys = tuple(dict.fromkeys(keys))
+            for key in _keys:
+                self.index.setdefault(key, dict())[_uuid] = None
+            if len(_keys) > 0:
+                self.entryKeys[_uuid] = _keys
+
+    def __removeEntry__(self, _uuid) -> None:
+        """
+        """
+        with self.index_lock:
+            self.__unindexEntry__(_uuid)
+
+    def __removeEntries__(self, _uuids) -> None:
+        """
+        """
+        with self.index_lock:
+            for _uuid in _uuids:
+                self.__unindexEntry__(_uuid)
+
+    def __unindexEntry__(self, _uuid) -> None:
+        """
+        """
+        for key in self.entryKeys.pop(_uuid, ()):
+            _entries = self.index[key]
+            del _entries[_uuid]
+            if len(_entries) == 0:
+                del self.index[key]
+
+    def __getEntries__(self, key) -> tuple:
+        """
+            Returns the uuids indexed under the key in insertion order.
+        """
+        with self.index_lock:
+            return tuple(self.index.get(key, ()))
+
+    def __isEntryPresent__(self, key, _uuid) -> bool:
+        """
+        """
+        return _uuid in self.index.get(key, ())
+
+
+class PathTrieNode:
+    __slots__ = ("uuid", "children")
+
+    def __init__(self, _uuid=None):
+        self.uuid = _uuid
+        self.children = dict()
+
+
+class PathTrie:
+    """
+        Maps the idShortPaths of the submodel elements to their uuids, a root per submodel
+        identifier and a node per idShort below it. The children keep their insertion order.
+    """
+    def __init__(self):
+        self.roots = dict()
+        self.trie_lock = threading.Lock()
+
+    def splitKey(self, key) -> tuple:
+        """
+            Returns the submodel identifier and the idShorts of the key, (None, []) if the key is
+            not below a root. Submodel identifiers may contain dots, the longest root wins.
+        """
+        if key in self.roots:
+            return key, []
+        index = len(key)
+        while True:
+            index = key.rfind(".", 0, index)
+            if index == -1:
+                return None, []
+            if key[:index] in self.roots:
+                return key[:index], key[index + 1:].split(".")
+
+    def getNode(self, key, create=False) -> PathTrieNode:
+        _submodelId, idShorts = self.splitKey(key)
+        if _submodelId is None:
+            return None
+        node = self.roots[_submodelId]
+        for idShort in idShorts:
+            child = node.children.get(idShort)
+            if child is None:
+                if not create:
+                    return None
+                child = node.children[idShort] = PathTrieNode()
+            node = child
+        return node
+
+    def collectEntries(self, key, node) -> list:
+        """
+            Returns the (idShortPath, uuid) entries of the subtree in pre-order.
+        """
+        entries = []
+        stack = [(key, node)]
+        while stack:
+            key, node = stack.pop()
+            if node.uuid is not None:
+                entries.append((key, node.uuid))
+            stack.extend(reversed([(key + "." + idShort, child) for idShort, child in node.children.items()]))
+        return entries
+
+    def __insertRoot__(self, _submodelId, _uuid=None) -> None:
+        with self.trie_lock:
+            node = self.roots.setdefault(_submodelId, PathTrieNode())
+            if _uuid is not None:
+                node.uuid = _uuid
+
+    def __insertEntry__(self, key, _uuid) -> None:
+        """
+            Raises KeyError if the key is not below a submodel root.
+        """
+        with self.trie_lock:
+            node = self.getNode(key, create=True)
+            if node is None:
+                raise KeyError(key)
+            node.uuid = _uuid
+
+    def __getEntry__(self, key) -> str:
+        with self.trie_lock:
+            node = self.getNode(key)
+            return None if node is None else node.uuid
+
+    def __getSubtree__(self, key) -> list:
+        with self.trie_lock:
+            node = self.getNode(key)
+            return [] if node is None else self.collectEntries(key, node)
+
+    def __removeSubtree__(self, key) -> list:
+        """
+            Detaches the node of the key and returns the entries of its subtree, the other
+            nodes are not visited.
+        """
+        with self.trie_lock:
+            if key in self.roots:
+                return self.collectEntries(key, self.roots.pop(key))
+            parent = self.getNode(key.rsplit(".", 1)[0])
+            if parent is None:
+                return []
+            node = parent.children.pop(key.rsplit(".", 1)[1], None)
+            return [] if node is None else self.collectEntries(key, node)
+
+
+class FrozenDict(dict):
+    """
+        Read-only dictionary used as the stored representation of an AAS element.
+        New versions are derived with set() and share every untouched member.
+    """
+    def __immutable__(self, *args, **kwargs):
+        raise TypeError("The stored AAS element is immutable, use thaw() or set()")
+
+    __setitem__ = __delitem__ = __ior__ = __immutable__
+    clear = pop = popitem = setdefault = update = __immutable__
+
+    def __copy__(self) -> dict:
+        return dict(self)
+
+    def __deepcopy__(self, memo) -> dict:
+        return {key: copy.deepcopy(value, memo) for key, value in self.items()}
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+    def thaw(self) -> dict:
+        """
+        """
+        return dict(self)
+
+    def set(self, key, value) -> "FrozenDict":
+        """
+        """
+        _newVersion = dict(self)
+        _newVersion[key] = freeze(value)
+        return FrozenDict(_newVersion)
+
+
+class FrozenList(list):
+    """
+        Read-only list counterpart of FrozenDict.
+    """
+    def __immutable__(self, *args, **kwargs):
+        raise TypeError("The stored AAS element is immutable, use thaw()")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = __immutable__
+    append = extend = insert = remove = pop = clear = sort = reverse = __immutable__
+
+    def __copy__(self) -> list:
+        return list(self)
+
+    def __deepcopy__(self, memo) -> list:
+        return [copy.deepcopy(value, memo) for value in self]
+
+    def __reduce__(self):
+        return (FrozenList, (list(self),))
+
+    def thaw(self) -> list:
+        """
+        """
+        return list(self)
+
+
+internedMembers = frozenset(["modelType", "valueType", "type", "kind", "category", "contentType", "language"])
+
+
+def isReferenceKey(element) -> bool:
+    return len(element) == 2 and "type" in element and isinstance(element.get("value"), str)
+
+
+def internMember(key, value, referenceKey) -> object:
+    """
+        The enumeration like members and the values of reference keys (semanticIds, qualifier
+        types) repeat across all elements and are interned.
+    """
+    if isinstance(value, str) and (referenceKey or key in internedMembers):
+        return sys.intern(value)
+    return value
+
+
+def freeze(element) -> object:
+    """
+        Returns a read-only version of the element, already frozen sub trees are shared.
+        The member names and the members selected by internMember are interned.
+    """
+    if isinstance(element, (FrozenDict, FrozenList)):
+        return element
+    elif isinstance(element, dict):
+        referenceKey = isReferenceKey(element)
+        return FrozenDict({sys.intern(key): freeze(internMember(key, value, referenceKey))
+                           for key, value in element.items()})
+    elif isinstance(element, (list, tuple)):
+        return FrozenList([freeze(value) for value in element])
+    else:
+        return element
+
+
+class SubtreeTable:
+    """
+        Hash-consing table of the element trees. Structurally equal dicts and lists are frozen
+        bottom-up into one shared FrozenDict/FrozenList, so a repeated semanticId, qualifier or
+        description is stored once and equal subtrees are identical. The table only holds weak
+        references, a subtree is dropped with its last element.
+    """
+    def __init__(self):
+        self.subtrees = weakref.WeakValueDictionary()
+        self.table_lock = threading.Lock()
+
+    def isSame(self, candidate, members) -> bool:
+        if isinstance(candidate, FrozenDict):
+            if not isinstance(members, dict) or len(candidate) != len(members):
+                return False
+            pairs = zip(candidate.items(), members.items())
         else:
-            return False
+            if isinstance(members, dict) or len(candidate) != len(members):
+                return False
+            pairs = zip(enumerate(candidate), enumerate(members))
+        for (candidateKey, candidateValue), (key, value) in pairs:
+            if candidateKey != key or not (candidateValue is value or (
+                    type(candidateValue) is type(value) and not isinstance(value, (FrozenDict, FrozenList))
+                    and candidateValue == value)):
+                return False
+        return True
+
+    def share(self, element) -> object:
+        """
+            Returns the shared frozen instance of the element, it replaces freeze() in the parsers.
+        """
+        if isinstance(element, dict):
+            referenceKey = isReferenceKey(element)
+            members = dict()
+            markers = [FrozenDict]
+            for key, value in element.items():
+                key = sys.intern(key)
+                if isinstance(value, (dict, list, tuple)):
+                    value = self.share(value)
+                    markers.append(key)
+                    markers.append(id(value))
+                else:
+                    value = internMember(key, value, referenceKey)
+                    markers.append(key)
+                    markers.append(value)
+                members[key] = value
+        elif isinstance(element, (list, tuple)):
+            members = []
+            markers = [FrozenList]
+            for value in element:
+                if isinstance(value, (dict, list, tuple)):
+                    value = self.share(value)
+                    markers.append(id(value))
+                else:
+                    markers.append(value)
+                members.append(value)
+        else:
+            return element
+        signature = hash(tuple(markers))
+        candidate = self.subtrees.get(signature)
+        if candidate is not None and self.isSame(candidate, members):
+            return candidate
+        element = FrozenDict(members) if isinstance(members, dict) else FrozenList(members)
+        if candidate is None:
+            with self.table_lock:
+                self.subtrees.setdefault(signature, element)
+        return element
+
+
+sharedSubtrees = SubtreeTable()
 
 
 class HistoryObject:
+    __slots__ = ("timestamp", "aasElementValue")
+
     def __init__(self,aasElementValue ,timestamp):
         self.timestamp = timestamp
         self.aasElementValue = aasElementValue
 
 
+class HistoryBuffer:
+    """
+        Bounded ring buffer with the history of an element. The timestamps (seconds since the
+        epoch) and the numeric values are kept in float64 numpy columns, the history store
+        writes them to its segments as they are. valueType records whether the values were
+        given as strings, ints or floats and toValues converts them back. Once a value is not
+        numeric, is of another type or does not convert back to the same representation
+        ("1e3", "21.0") the values of the buffer are kept in a list. The oldest point is
+        overwritten when the capacity is reached and points older than maxAge seconds are
+        dropped, 0 keeps them.
+        The buffers of the elements are registered by idShortPath for the history store.
+    """
+    __slots__ = ("capacity", "maxAge", "timestamps", "values", "valueType", "size", "start", "length",
+                 "unpersisted", "buffer_lock", "__weakref__")
+    defaultCapacity = 1024
+    defaultMaxAge = 0
+    registry = weakref.WeakValueDictionary()
+
+    def __init__(self, capacity=None, maxAge=None):
+        self.capacity = HistoryBuffer.defaultCapacity if capacity is None else capacity
+        self.maxAge = HistoryBuffer.defaultMaxAge if maxAge is None else maxAge
+        self.timestamps = np.empty(0)
+        self.values = np.empty(0)
+        self.valueType = None
+        self.size = 0
+        self.start = 0
+        self.length = 0
+        self.unpersisted = 0
+        self.buffer_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.length
+
+    def append(self, value, timestamp) -> None:
+        """
+            The ring grows up to the capacity, the columns are allocated in doubling steps.
+            After that the ring is overwritten in place.
+        """
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.timestamp()
+        with self.buffer_lock:
+            if isinstance(self.values, np.ndarray):
+                number = self.toNumber(value)
+                if number is None:
+                    self.values = HistoryBuffer.toValues(self.values[:self.size], self.valueType)
+                else:
+                    value = number
+            if self.length < self.size:
+                index = (self.start + self.length) % self.size
+                self.timestamps[index] = timestamp
+                self.values[index] = value
+                self.length = self.length + 1
+            elif self.size < self.capacity:
+                if self.start != 0:
+                    self.timestamps[:self.size] = np.roll(self.timestamps[:self.size], -self.start)
+                    if isinstance(self.values, np.ndarray):
+                        self.values[:self.size] = np.roll(self.values[:self.size], -self.start)
+                    else:
+                        self.values = self.values[self.start:] + self.values[:self.start]
+                    self.start = 0
+                if self.size == len(self.timestamps):
+                    self.timestamps = self.grow(self.timestamps)
+                self.timestamps[self.size] = timestamp
+                if isinstance(self.values, np.ndarray):
+                    if self.size == len(self.values):
+                        self.values = self.grow(self.values)
+                    self.values[self.size] = value
+                else:
+                    self.values.append(value)
+                self.size = self.size + 1
+                self.length = self.length + 1
+            else:
+                self.timestamps[self.start] = timestamp
+                self.values[self.start] = value
+                self.start = (self.start + 1) % self.size
+            self.unpersisted = self.unpersisted + 1
+            if self.maxAge:
+                self.expire(timestamp - self.maxAge)
+
+    def grow(self, column) -> np.ndarray:
+        grown = np.empty(min(self.capacity, max(16, 2 * len(column))))
+        grown[:len(column)] = column
+        return grown
+
+    def toNumber(self, value) -> float:
+        """
+            The float of a value of the type of the buffer, None if it does not convert back
+            to the same value.
+        """
+        valueType = type(value).__name__
+        if valueType not in ("str", "int", "float") or self.valueType not in (None, valueType):
+            return None
+        try:
+            number = float(value)
+        except (TypeError, ValueError, OverflowError):
+            return None
+        if valueType != "float" and HistoryBuffer.toValue(number, valueType) != value:
+            return None
+        self.valueType = valueType
+        return number
+
+    @staticmethod
+    def toValue(number, valueType) -> object:
+        number = float(number)
+        if valueType == "str":
+            return str(int(number)) if number.is_integer() and abs(number) < 2 ** 53 else repr(number)
+        if valueType == "int":
+            return int(number)
+        return number
+
+    @staticmethod
+    def toValues(values, valueType) -> list:
+        """
+            The values of a numeric slice in the representation they were appended with.
+        """
+        if valueType in (None, "float"):
+            return [float(value) for value in values]
+        return [HistoryBuffer.toValue(value, valueType) for value in values]
+
+    def getValues(self, values) -> list:
+        """
+            The values of a window or drain of the buffer in the representation they were appended with.
+        """
+        if isinstance(values, np.ndarray):
+            return HistoryBuffer.toValues(values, self.valueType)
+        return list(values)
+
+    def expire(self, cutoff) -> None:
+        while self.length > 0 and self.timestamps[self.start] < cutoff:
+            self.start = (self.start + 1) % self.size
+            self.length = self.length - 1
+        if self.length == 0:
+            self.start = 0
+
+    def window(self, count=None) -> tuple:
+        """
+            Returns the timestamps and values of the last count points in chronological order,
+            all of them if count is None. Both are copies of the ring slices.
+        """
+        with self.buffer_lock:
+            if self.maxAge:
+                self.expire(time.time() - self.maxAge)
+            return self.slice(self.length if count is None else min(count, self.length))
+
+    def drain(self) -> tuple:
+        """
+            Returns the points appended since the last drain which are still in the buffer.
+        """
+        with self.buffer_lock:
+            count = min(self.unpersisted, self.length)
+            self.unpersisted = 0
+            return self.slice(count)
+
+    def slice(self, length) -> tuple:
+        size = self.size
+        first = (self.start + self.length - length) % size if size != 0 else 0
+        end = first + length
+        if end <= size:
+            return self.timestamps[first:end].copy(), self.values[first:end].copy()
+        if isinstance(self.values, np.ndarray):
+            values = np.concatenate((self.values[first:size], self.values[:end - size]))
+        else:
+            values = self.values[first:size] + self.values[:end - size]
+        return np.concatenate((self.timestamps[first:size], self.timestamps[:end - size])), values
+
+    def clear(self) -> None:
+        with self.buffer_lock:
+            self.timestamps = np.empty(0)
+            self.values = np.empty(0)
+            self.valueType = None
+            self.size = 0
+            self.start = 0
+            self.length = 0
+            self.unpersisted = 0
+
+
 class UUIDGenerator:
     def __init__(self):
         pass
@@ -506,11 +1118,24 @@ class UUIDGenerator:
         return str(uuid.uuid4())
 
 
+versionCounter = itertools.count(1)
+
+
 class AASElementObject:
+    """
+        Node of the in-memory element graph, the history buffer is allocated with the first
+        history point.
+    """
+    __slots__ = ("aasELement", "version", "parentObject", "elementIdList", "history", "idShortPath",
+                 "elementIndex", "modelType", "idShort", "elem_lock")
+    history_lock = threading.Lock()
+
     def __init__(self, aasElement, idShortPath, elemIndex=0):
-        self.aasELement = aasElement
-        self.elementIdList = []
-        self.history = []
+        self.aasELement = freeze(aasElement)
+        self.version = next(versionCounter)
+        self.parentObject = None
+        self.elementIdList = ()
+        self.history = None
         self.idShortPath = idShortPath
         self.elementIndex = elemIndex
         self.modelType = ""
@@ -520,28 +1145,31 @@ class AASElementObject:
     def addhistoryElement(self, historyObject: HistoryObject) -> None:
         """
         """
-        if (self.isPrimitive()):
-            self.history.append(historyObject)
-
-    def __clearHistory(self) -> None:
-        """
-        """
-        self.history.clear()
+        self.addHistory(historyObject.aasElementValue, historyObject.timestamp)
 
-    def __getHistory(self) -> object:
+    def addHistory(self, value, timestamp) -> None:
         """
+            The history buffer is only allocated for elements which get a history.
         """
-        return self.history
+        if (self.isPrimitive()):
+            if self.history is None:
+                with AASElementObject.history_lock:
+                    if self.history is None:
+                        self.history = HistoryBuffer()
+                        HistoryBuffer.registry[self.idShortPath] = self.history
+            self.history.append(value, timestamp)
 
-    def __getLatestHistory(self, topLen) -> list:
+    def clearHistory(self) -> None:
         """
         """
-        return self.history[-topLen:]
+        if self.history is not None:
+            self.history.clear()
 
-    def __getBottomHistory(self, bottomLen) -> list:
+    def getHistory(self) -> HistoryBuffer:
         """
+            None if the element has no history.
         """
-        return self.history[0:bottomLen]
+        return self.history
 
     def isPrimitive(self) -> bool:
         """
@@ -551,14 +1179,32 @@ class AASElementObject:
 
     def getElement(self) -> object:
         """
+            Returns the stored read-only element, use thaw() or copy.deepcopy() before modifying it.
         """
-        _tempElement = copy.deepcopy(self.aasELement)
-        return _tempElement
+        return self.aasELement
 
     def setElement(self, element) -> object:
         """
         """
-        self.aasELement = copy.deepcopy(element)
+        self.aasELement = freeze(element)
+        self.bumpVersion()
+
+    def updateElement(self, key, value) -> object:
+        """
+            Replaces a single member of the element, the remaining members are shared with the old version.
+        """
+        self.aasELement = self.aasELement.set(key, value)
+        self.bumpVersion()
+        return self.aasELement
+
+    def bumpVersion(self) -> None:
+        """
+            Gives the element and all of its ancestors a new version.
+        """
+        _elementObject = self
+        while _elementObject is not None:
+            _elementObject.version = next(versionCounter)
+            _elementObject = _elementObject.parentObject
 
     def getIdShortPath(self) -> object:
         """
@@ -658,6 +1304,8 @@ class AssetInterfaceDescription:
         return self.properties[td_property_name]
 
 class ShellObject(AASElementObject):
+    __slots__ = ("skills", "asset_interface_description", "productionStepList", "conversationIdList")
+
     def __init__(self,aasElement, idShortPath, elemIndex=0):
         AASElementObject.__init__(self, aasElement, idShortPath, elemIndex)
         self.skills = dict()
@@ -724,6 +1372,8 @@ class ShellObject(AASElementObject):
         self.conversationIdList.remove(conversationId)
     
 class SubscriptionMessage:
+    __slots__ = ("elementPath", "subscribers", "updateTime", "modelType", "subscriptiondata")
+
     def __init__(self, elementPath, updateTime, modelType, subscribers, subscriptiondata):
         self.elementPath = elementPath
         self.subscribers = subscribers
@@ -732,6 +1382,8 @@ class SubscriptionMessage:
         self.subscriptiondata = subscriptiondata
 
 class CarbonFootPrintObject:
+    __slots__ = ("_coversationId", "_uuid", "startTime", "endTime", "totalTime", "_cfp", "skillName")
+
     def __init__(self,_coversationId,_uuid):
         self._coversationId = _coversationId
         self._uuid = _uuid
@@ -776,6 +1428,8 @@ class CarbonFootPrintObject:
         return 0    
     
 class ConversationObject:
+    __slots__ = ("_coversationId", "messages", "sub_coversationIds")
+
     def __init__(self, _coversationId):
         self._coversationId = _coversationId
         self.messages = []
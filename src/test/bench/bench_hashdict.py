@@ -0,0 +1,102 @@
+'''
+Copyright (c) 2021-2022 Otto-von-Guericke-Universiat Magdeburg, Lehrstuhl Integrierte Automation
+Author: Harish Kumar Pakala
+This source code is licensed under the Apache License 2.0 (see LICENSE.txt).
+This source code may use other Open Source software components (see LICENSE.txt).
+
+Micro-benchmarks of the HashDict registry:
+    reverse     N __getkey__ lookups on a HashDict of N entries
+    scaling     GetAllSubmodels and DeleteSubmodelById of half the submodels, 10 elements per submodel
+    concurrent  readers looking up keys while writers insert and delete, 16 stripe locks against 1
+
+    python src/test/bench/bench_hashdict.py [reverse|scaling|concurrent ...]
+'''
+import sys
+import threading
+import time
+
+import benchenv
+
+from utils.utils import HashDict, AASHashObject
+
+
+def reverse(sizes=(1000, 10000, 100000)):
+    for size in sizes:
+        hashDict = HashDict()
+        for i in range(size):
+            hashDict.__insertHashEntry__("sm.path" + str(i), AASHashObject("uuid" + str(i)))
+        startTime = time.perf_counter()
+        for i in range(size):
+            hashDict.__getkey__("uuid" + str(i))
+        print("reverse     entries %7d  %d x __getkey__ %.4f s" % (size, size, time.perf_counter() - startTime))
+
+
+def createEnvironment(submodelCount, elementCount) -> dict:
+    jsonData = {"assetAdministrationShells": [], "submodels": [], "conceptDescriptions": []}
+    for i in range(submodelCount):
+        jsonData["submodels"].append({"id": "sm" + str(i), "idShort": "S" + str(i), "modelType": "Submodel",
+                                      "semanticId": {"type": "ExternalReference",
+                                                     "keys": [{"type": "GlobalReference", "value": "sem" + str(i % 7)}]},
+                                      "submodelElements": [{"idShort": "p" + str(j), "modelType": "Property",
+                                                            "valueType": "xs:string", "value": str(j)}
+                                                           for j in range(elementCount)]})
+    return jsonData
+
+
+def scaling(sizes=(1000, 10000, 100000)):
+    for size in sizes:
+        pyaas = benchenv.createServer(createEnvironment(size // 10, 10))
+        startTime = time.perf_counter()
+        pyaas.dba.GetAllSubmodels()
+        getAllDuration = time.perf_counter() - startTime
+        startTime = time.perf_counter()
+        for i in range(0, size // 10, 2):
+            pyaas.dba.DeleteSubmodelById("sm" + str(i))
+        deleteDuration = time.perf_counter() - startTime
+        print("scaling     elements %7d  GetAllSubmodels %.3f s  DeleteSubmodelById (half) %.3f s" %
+              (size, getAllDuration, deleteDuration))
+
+
+def concurrent(readers=4, writers=4, duration=2.0, size=10000):
+    for stripeCount in (16, 1):
+        try:
+            hashDict = HashDict(stripeCount)
+        except TypeError:
+            hashDict = HashDict()
+        for i in range(size):
+            hashDict.__insertHashEntry__("sm.path" + str(i), AASHashObject("uuid" + str(i)))
+        counts = [0] * (readers + writers)
+        running = [True]
+
+        def read(index):
+            i = 0
+            while running[0]:
+                hashDict.__isKeyPresent__("sm.path" + str(i % size))
+                i = i + 1
+            counts[index] = i
+
+        def write(index):
+            i = 0
+            while running[0]:
+                key = "w" + str(index) + "." + str(i % 1000)
+                hashDict.__insertHashEntry__(key, AASHashObject(key))
+                hashDict.__deleteHashEntry__(key)
+                i = i + 1
+            counts[index] = i
+
+        threads = ([threading.Thread(target=read, args=(i,)) for i in range(readers)] +
+                   [threading.Thread(target=write, args=(readers + i,)) for i in range(writers)])
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        running[0] = False
+        for thread in threads:
+            thread.join()
+        print("concurrent  stripes %2d  reads %9.0f/s  writes %9.0f/s" %
+              (stripeCount, sum(counts[:readers]) / duration, sum(counts[readers:]) / duration))
+
+
+if __name__ == "__main__":
+    benchmarks = {"reverse": reverse, "scaling": scaling, "concurrent": concurrent}
+    for name in sys.argv[1:] or list(benchmarks):
+        benchmarks[name]()
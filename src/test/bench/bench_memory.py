@@ -0,0 +1,80 @@
+'''
+Copyright (c) 2021-2022 Otto-von-Guericke-Universiat Magdeburg, Lehrstuhl Integrierte Automation
+Author: Harish Kumar Pakala
+This source code is licensed under the Apache License 2.0 (see LICENSE.txt).
+This source code may use other Open Source software components (see LICENSE.txt).
+
+Memory of the in-memory AAS graph. Loads Demonstrator.json replicated 100 times and reports the
+allocations traced while AAS_Database_Server parses it, per shell, submodel, element and
+concept description object, as well as the size of a hash and an element object.
+
+    python src/test/bench/bench_memory.py [replicas]
+'''
+import copy
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+import benchenv
+
+from datastore.databaseserver import AAS_Database_Server
+from utils.utils import AASHashObject, AASElementObject
+
+
+def replicate(jsonData, replicas) -> dict:
+    """
+        Copies of the shells, submodels and concept descriptions with the identifiers suffixed by the replica.
+    """
+    replicated = {"assetAdministrationShells": [], "submodels": [], "conceptDescriptions": []}
+    submodelIds = set([_submodel["id"] for _submodel in jsonData["submodels"]])
+    for replica in range(replicas):
+        suffix = "_" + str(replica)
+        for _aasShell in jsonData["assetAdministrationShells"]:
+            _aasShell = copy.deepcopy(_aasShell)
+            _aasShell["id"] = _aasShell["id"] + suffix
+            for _reference in _aasShell.get("submodels", []):
+                if _reference["keys"][0]["value"] in submodelIds:
+                    _reference["keys"][0]["value"] = _reference["keys"][0]["value"] + suffix
+            replicated["assetAdministrationShells"].append(_aasShell)
+        for _submodel in jsonData["submodels"]:
+            _submodel = copy.deepcopy(_submodel)
+            _submodel["id"] = _submodel["id"] + suffix
+            replicated["submodels"].append(_submodel)
+        for _cd in jsonData.get("conceptDescriptions", []):
+            _cd = copy.deepcopy(_cd)
+            _cd["id"] = _cd["id"] + suffix
+            replicated["conceptDescriptions"].append(_cd)
+    return replicated
+
+
+def objectSize(_object) -> int:
+    size = sys.getsizeof(_object)
+    if hasattr(_object, "__dict__"):
+        size = size + sys.getsizeof(_object.__dict__)
+    return size
+
+
+def measure(replicas=100):
+    pyaas = benchenv.createPyAAS(json.loads(json.dumps(replicate(benchenv.loadDemonstrator(), replicas))))
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    startTime = time.perf_counter()
+    pyaas.dba = AAS_Database_Server(pyaas)
+    loadDuration = time.perf_counter() - startTime
+    pyaas.aasConfigurer.jsonData = None
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    objects = (pyaas.submodelHashDict.getElementCount() + pyaas.aasShellHashDict.getElementCount() +
+               pyaas.cdHashDict.getElementCount())
+    print("replicas %d  objects %d  %.1f MB  %.0f bytes/element  load %.2f s" %
+          (replicas, objects, size / 1e6, size / objects, loadDuration))
+    print("hash object %d bytes  element object %d bytes" %
+          (objectSize(AASHashObject("uuid")), objectSize(AASElementObject({"idShort": "p"}, "sm.p"))))
+
+
+if __name__ == "__main__":
+    measure(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
@@ -0,0 +1,60 @@
+'''
+Copyright (c) 2021-2022 Otto-von-Guericke-Universiat Magdeburg, Lehrstuhl Integrierte Automation
+Author: Harish Kumar Pakala
+This source code is licensed under the Apache License 2.0 (see LICENSE.txt).
+This source code may use other Open Source software components (see LICENSE.txt).
+
+The benchmarks run against src/main of this tree. AAS_BENCH_SRC selects another src/main,
+e.g. of a git worktree of an older commit, to reproduce the numbers before a change:
+    git worktree add /tmp/before <commit>~1
+    AAS_BENCH_SRC=/tmp/before/src/main python src/test/bench/bench_hashdict.py
+'''
+import json
+import logging
+import os
+import sys
+import tempfile
+
+benchDirectory = os.path.dirname(os.path.realpath(__file__))
+sourceDirectory = os.path.realpath(os.environ.get("AAS_BENCH_SRC", os.path.join(benchDirectory, "..", "..", "main")))
+demonstratorFile = os.path.realpath(os.path.join(benchDirectory, "..", "..", "..", "config", "Demonstrator.json"))
+sys.path.insert(0, sourceDirectory)
+os.chdir(sourceDirectory)
+
+from pyaasxServer import PyAASxServer
+from datastore.databaseserver import AAS_Database_Server
+
+
+class BenchConfigurer(object):
+    def __init__(self, jsonData):
+        self.jsonData = jsonData
+        self.base_file = "Demonstrator.json"
+
+
+class BenchEndPoint(object):
+    def restart(self):
+        pass
+
+
+def loadDemonstrator() -> dict:
+    with open(demonstratorFile, "r", encoding="utf-8") as demonstrator:
+        return json.load(demonstrator)
+
+
+def createPyAAS(jsonData) -> PyAASxServer:
+    """
+        A server object with the configuration the database server needs, nothing is started.
+    """
+    pyaas = PyAASxServer()
+    pyaas.aasConfigurer = BenchConfigurer(jsonData)
+    pyaas.serviceLogger = logging.getLogger("bench")
+    pyaas.AASendPointHandles = {"MQTT": BenchEndPoint()}
+    pyaas.repository = tempfile.mkdtemp(prefix="aasbench")
+    pyaas.dataRepository = tempfile.mkdtemp(prefix="aasbench")
+    return pyaas
+
+
+def createServer(jsonData) -> PyAASxServer:
+    pyaas = createPyAAS(jsonData)
+    pyaas.dba = AAS_Database_Server(pyaas)
+    return pyaas